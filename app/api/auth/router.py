@@ -1,21 +1,24 @@
 
 # app/api/auth/router.py
 from fastapi import APIRouter, Depends, HTTPException, status, Header
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from ...db.database import get_db
+from ...db.database import get_async_db, get_db
 from ...schemas.user import UserLogin, TokenResponse, UserResponse, UserCreate, UserUpdate
+from ...core.hashing import HashingBusyError
 from ...models.user import User
+from ...services.async_services import AsyncAuthService
 from ...services.auth_service import AuthService
-from ..deps import get_current_user
+from ..deps import get_current_user, get_current_user_async
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Registra un nuevo usuario
@@ -28,13 +31,14 @@ def register(
     """
     try:
         print("user_data_router:", user_data)
-        auth_service = AuthService(db)
-        return auth_service.register(user_data)
+        return await AsyncAuthService(db).register(user_data)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HashingBusyError as e:
+        raise _busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -43,9 +47,9 @@ def register(
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     credentials: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Inicia sesión con email y contraseña
@@ -53,14 +57,15 @@ def login(
     Retorna un token JWT y la información del usuario
     """
     try:
-        auth_service = AuthService(db)
-        return auth_service.login(credentials)
+        return await AsyncAuthService(db).login(credentials)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HashingBusyError as e:
+        raise _busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -96,12 +101,20 @@ def logout(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(
-    current_user: User = Depends(get_current_user)
+async def get_me(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtiene información del usuario actual
     """
+    current_user = await AsyncAuthService(db).load_user(current_user)
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return UserResponse(
         id=current_user.id,
         email=current_user.email,
@@ -121,25 +134,23 @@ def refresh_token(
 ):
     """
     Refresca el token de acceso
-    Genera un nuevo token para el usuario actual
+    Genera un nuevo token (con su sesión) para el usuario actual
     """
-    from ...services.auth_service import AuthService
-    
     auth_service = AuthService(db)
-    access_token = auth_service._create_access_token(current_user.id)
-    
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        user=UserResponse(
-            id=current_user.id,
-            email=current_user.email,
-            name=current_user.name,
-            lastname=current_user.lastname,
-            role=current_user.role.value,
-            is_active=current_user.is_active,
-            avatar=current_user.avatar,
-            created_at=current_user.created_at
+    current_user = auth_service.load_user(current_user)
+    if current_user is None or not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-    )
+    return auth_service.refresh(current_user)
 
+
+def _busy(e: HashingBusyError) -> HTTPException:
+    """Cola de hashing llena: el cliente puede reintentar en breve"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
@@ -1,62 +1,172 @@
 
 # app/api/cms/router.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from ...db.database import get_db
+from datetime import datetime
+from ...db.database import get_async_read_db, get_db, get_read_db
+from ...core.conditional import is_not_modified, not_modified_response
+from ...core.compression import MIN_COMPRESS_SIZE, negotiate_encoding
+from ...core.json_patch import JsonPatchError
+from ...core.pagination import InvalidCursorError
+from ...core.snapshot_store import Snapshot
 from ...schemas.cms import (
+    ContentBulkUpdate,
     ContentUpdate,
     LandingDataResponse
 )
+from ...services.async_services import AsyncCMSService
 from ...services.cms_service import CMSService
+from ...services.fieldsets import LandingFieldSet
 
 router = APIRouter(prefix="/cms", tags=["CMS"])
 
 
+def _snapshot_response(request: Request, snapshot: Snapshot) -> Response:
+    """
+    Envía un snapshot en la codificación que acepta el cliente, o 304 si
+    ya tiene esa misma variante
+    Las variantes gzip/br ya están comprimidas en el snapshot; cada una
+    lleva su propio ETag
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if len(snapshot.body) < MIN_COMPRESS_SIZE:
+        encoding = None
+    validator = snapshot.validator.for_encoding(encoding)
+    if is_not_modified(request, validator):
+        return not_modified_response(validator, vary="Accept-Encoding")
+
+    headers = validator.headers()
+    headers["Vary"] = "Accept-Encoding"
+    body = snapshot.body
+    if encoding:
+        body = snapshot.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 
 #landing
 #SIRVE
 
 @router.get("/landing", response_model=LandingDataResponse)
-def get_landing_page(
+async def get_landing_page(
+    request: Request,
     slug: Optional[str] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(
+        None,
+        description="Campos de la página y de sus contenidos, p. ej. slug,seo_*,contents.data"
+    ),
+    include: Optional[str] = Query(
+        None,
+        description="Bloques adicionales a la página: site, media, meta"
+    ),
+    as_of: Optional[datetime] = Query(
+        None,
+        description="Fecha (ISO 8601): contenidos tal como estaban en ese momento"
+    ),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Obtiene todos los datos para renderizar la landing page
     
     - Sin slug: retorna la homepage
-    - Con slug: retorna la página específica
+    - Con slug: retorna la página específica (admite rutas anidadas padre/hijo)
+    - Con fields/include: retorna solo los campos pedidos
+    - Con as_of: el data de cada contenido reconstruido desde la auditoría
+      (precisión CMS_AS_OF_BUCKET_SECONDS; página, sitio y medios actuales)
+    
+    Soporta If-None-Match / If-Modified-Since (304)
     
     Endpoint público
     """
     try:
-        cms_service = CMSService(db)
-        return cms_service.get_landing_page(slug)
+        fieldset = LandingFieldSet.parse(fields, include)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    cms_service = AsyncCMSService(db)
+    if as_of is not None:
+        try:
+            body = await cms_service.serialize_landing(slug, fieldset=fieldset, as_of=as_of)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e)
+            )
+        return Response(content=body, media_type="application/json")
+
+    try:
+        # Bytes ya serializados: no pasan por el ORM ni por Pydantic
+        snapshot = await cms_service.get_landing_snapshot(slug, fieldset=fieldset)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
 
+    # ETag: hash del cuerpo, uno por codificación (304 si el cliente ya lo tiene)
+    return _snapshot_response(request, snapshot)
+
 
 # app/api/v1/cms.py
 #SIRVE
 @router.get("/sections/{section_id}/contents")
-def get_section_contents(
+async def get_section_contents(
     section_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Obtiene todos los contenidos de una sección para edición"""
     try:
-        cms_service = CMSService(db)
-        return cms_service.get_section_for_editing(section_id)
+        cms_service = AsyncCMSService(db)
+        snapshot = await cms_service.get_section_snapshot(section_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+
+    return _snapshot_response(request, snapshot)
+    
+# Declarada antes de /contents/{content_id} para que "bulk" no se tome como id
+@router.put("/contents/bulk")
+def bulk_update_contents(
+    bulk_update: ContentBulkUpdate,
+    db: Session = Depends(get_db),
+    author_id: Optional[int] = Query(None, description="ID del usuario que realiza el cambio")
+):
+    """
+    Actualiza varios contenidos en una sola transacción
     
+    Si algún contenido no existe no se aplica ningún cambio
+```json
+    {
+      "items": [
+        {"id": 1, "data": {"title": "Nuevo Título"}, "status": "published"},
+        {"id": 2, "data": {"description": "Nueva descripción"}}
+      ]
+    }
+```
+    """
+    try:
+        return CMSService(db).bulk_update_contents(bulk_update.items, author_id=author_id)
+    except JsonPatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
 # app/api/v1/cms.py
 #SIRVE
 @router.put("/contents/{content_id}")
@@ -81,10 +191,23 @@ def update_content(
       "status": "published"
     }
 ```
+
+    Cambios parciales: en lugar de `data` se puede enviar `patch`
+    (JSON Patch, RFC 6902) o `merge_patch` (JSON Merge Patch, RFC 7396).
+    En la auditoría se guarda solo el patch.
+```json
+    {"patch": [{"op": "replace", "path": "/title", "value": "Nuevo Título"}]}
+    {"merge_patch": {"title": "Nuevo Título", "ctaUrl": null}}
+```
     """
     try:
         return CMSService(db).update_content_data(content_id, content_update, author_id=author_id)
 
+    except JsonPatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,24 +217,46 @@ def update_content(
 #Auditoría
 
 @router.get("/contents/{content_id}/history")
-def get_content_history(
+async def get_content_history(
     content_id: int,
-    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
-    Historial
+    Historial paginado (más reciente primero), sin el `data` de cada versión
+    El documento de una versión se obtiene en /history/{log_id}
     """
     try:
-        return CMSService(db).get_content_history(content_id)
+        return await AsyncCMSService(db).get_content_history(content_id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
+@router.get("/contents/{content_id}/diff")
+def get_content_diff(
+    content_id: int,
+    from_id: int = Query(..., alias="from", description="ID del registro de auditoría de origen"),
+    to_id: Optional[int] = Query(None, alias="to", description="ID del registro de destino; sin él, el data actual"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Diff estructural (JSON Patch, RFC 6902) entre dos versiones de un contenido
+    """
+    try:
+        body = CMSService(db).get_content_diff(content_id, from_id, to_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/contents/{content_id}/history/{log_id}")
 def get_content_history_entry(
     content_id: int,
     log_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Detalle de un registro de auditoría
@@ -1,10 +1,12 @@
 # app/api/deps.py
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from ..db.database import get_db
+from ..db.database import get_async_db, get_db
 from ..models.user import User
+from ..services.async_services import AsyncAuthService
 from ..services.auth_service import AuthService
 
 security = HTTPBearer()
@@ -23,7 +25,19 @@ def get_current_user(
     auth_service = AuthService(db)
     
     user = auth_service.get_current_user(token)
-    
+    return _require_active(user)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Como get_current_user, para rutas async"""
+    user = await AsyncAuthService(db).get_current_user(credentials.credentials)
+    return _require_active(user)
+
+
+def _require_active(user: Optional[User]) -> User:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,15 +55,12 @@ def get_current_user(
 
 
 def get_current_admin(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ) -> User:
     """
     Verifica que el usuario actual sea ADMIN o MASTER
     """
-    auth_service = AuthService(db)
-    
-    if not auth_service.verify_admin(current_user):
+    if not AuthService.verify_admin(current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
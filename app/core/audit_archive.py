@@ -0,0 +1,162 @@
+# app/core/audit_archive.py
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class AuditArchive:
+    """
+    Archivo en frío del historial de auditoría
+
+    Cada segmento (`segment-<fecha>.jsonl.gz`) es una concatenación de
+    miembros gzip, uno por contenido, con sus registros en JSON Lines; un
+    archivo así sigue siendo un .gz válido. Junto a él, `<segmento>.idx`
+    guarda por contenido el offset y el tamaño de su miembro, así leer el
+    historial de un contenido es un seek y una descompresión pequeña.
+
+    Los registros de un segmento no cambian. El índice en memoria se
+    recarga cuando aparece un segmento nuevo (el job de archivado corre en
+    otro proceso): la lista de segmentos solo se vuelve a leer cuando
+    cambia el mtime del directorio.
+    """
+
+    # Un archivo creado en el mismo tic del reloj del sistema de archivos
+    # no cambia el mtime: mientras el directorio es así de reciente se relista
+    MTIME_SETTLE_NS = 2_000_000_000
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._loaded: frozenset = frozenset()
+        self._mtime_ns: Optional[int] = None
+        # content_id -> [(segmento, offset, tamaño, min_id, max_id)]
+        self._index: Dict[int, List[tuple]] = {}
+
+    # ==================== Lectura ====================
+
+    def get_content_records(self, content_id: int) -> List[dict]:
+        """Registros archivados de un contenido, ordenados por id"""
+        records = {}
+        for segment, offset, length, _, _ in self._entries().get(content_id, ()):
+            # Un archivado interrumpido puede haber dejado el mismo registro en dos segmentos
+            for record in self._read_member(segment, offset, length):
+                records[record["id"]] = record
+        return [records[log_id] for log_id in sorted(records)]
+
+    def find(self, log_id: int, content_id: Optional[int] = None) -> Optional[dict]:
+        """
+        Busca un registro por id. Con content_id se lee solo el miembro de
+        ese contenido (el índice lo localiza); sin él, los miembros cuyo
+        rango de ids lo incluye.
+        """
+        index = self._entries()
+        if content_id is not None:
+            candidates = index.get(content_id, ())
+        else:
+            candidates = (entry for entries in index.values() for entry in entries)
+
+        for segment, offset, length, min_id, max_id in candidates:
+            if min_id <= log_id <= max_id:
+                for record in self._read_member(segment, offset, length):
+                    if record["id"] == log_id:
+                        return record
+        return None
+
+    def has_content(self, content_id: int) -> bool:
+        return content_id in self._entries()
+
+    def _entries(self) -> Dict[int, List[tuple]]:
+        try:
+            mtime_ns = self.directory.stat().st_mtime_ns
+        except OSError:
+            return {}
+        if mtime_ns == self._mtime_ns and time.time_ns() - mtime_ns > self.MTIME_SETTLE_NS:
+            return self._index
+
+        names = frozenset(path.name for path in self.directory.glob("*.idx"))
+        with self._lock:
+            if names != self._loaded:
+                self._reload(names)
+            self._mtime_ns = mtime_ns
+        return self._index
+
+    def _reload(self, names: frozenset) -> None:
+        index: Dict[int, List[tuple]] = {}
+        for name in sorted(names):
+            try:
+                meta = json.loads((self.directory / name).read_bytes())
+            except (OSError, ValueError):
+                continue
+            segment = meta["segment"]
+            for content_id, (offset, length, min_id, max_id) in meta["contents"].items():
+                index.setdefault(int(content_id), []).append((segment, offset, length, min_id, max_id))
+        self._index = index
+        self._loaded = names
+
+    def _read_member(self, segment: str, offset: int, length: int) -> List[dict]:
+        with open(self.directory / segment, "rb") as f:
+            f.seek(offset)
+            raw = gzip.decompress(f.read(length))
+        return [json.loads(line) for line in raw.splitlines() if line]
+
+    # ==================== Escritura ====================
+
+    def write_segment(self, records_by_content: Dict[int, Iterable[dict]]) -> Optional[str]:
+        """
+        Escribe un segmento nuevo y su índice (primero el segmento: un
+        índice siempre apunta a datos completos)
+
+        Returns:
+            Nombre del segmento, o None si no había registros
+        """
+        if not records_by_content:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        segment = f"segment-{stamp}.jsonl.gz"
+
+        body, contents = bytearray(), {}
+        for content_id, records in sorted(records_by_content.items()):
+            records = list(records)
+            lines = b"".join(
+                json.dumps(record, separators=(",", ":"), default=_json_default).encode() + b"\n"
+                for record in records
+            )
+            member = gzip.compress(lines, compresslevel=9, mtime=0)
+            ids = [record["id"] for record in records]
+            contents[str(content_id)] = [len(body), len(member), min(ids), max(ids)]
+            body.extend(member)
+
+        self._atomic_write(self.directory / segment, bytes(body))
+        self._atomic_write(
+            self.directory / f"{segment}.idx",
+            json.dumps({"segment": segment, "contents": contents}).encode()
+        )
+        return segment
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Not serializable: {type(value)}")
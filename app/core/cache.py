@@ -0,0 +1,258 @@
+# app/core/cache.py
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class SnapshotCache:
+    """
+    Cache en memoria de snapshots con contador de versión
+
+    Cada escritura incrementa la versión (bump): los snapshots anteriores
+    dejan de ser frescos pero se conservan para servirlos mientras se
+    reconstruyen (stale-while-revalidate). Un snapshot construido con una
+    versión anterior no se guarda, así una lectura concurrente con una
+    escritura nunca deja datos viejos como frescos.
+
+    Con `shared_version` (una función que devuelve la versión compartida
+    por todos los procesos) la versión incluye también los cambios hechos
+    en otros workers, que no llaman a bump en este.
+    """
+
+    def __init__(self, max_entries: int = 256, shared_version: Optional[Callable[[], Hashable]] = None):
+        self.max_entries = max_entries
+        self._shared_version = shared_version
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+
+    @property
+    def version(self) -> Hashable:
+        if self._shared_version is None:
+            return self._version
+        return (self._version, self._shared_version())
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Snapshot de la versión actual o None"""
+        version = self.version
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """Último snapshot guardado, aunque sea de una versión anterior"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def set(self, key: Hashable, value: Any, version: Hashable) -> bool:
+        """Guarda el snapshot solo si fue construido con la versión actual"""
+        current = self.version
+        with self._lock:
+            if version != current:
+                return False
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def bump(self) -> None:
+        """Marca todos los snapshots como viejos e incrementa la versión"""
+        with self._lock:
+            self._version += 1
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave en una sola ejecución
+
+    La primera llamada ejecuta la función; las demás esperan su resultado
+    o, si traen un valor de respaldo (p. ej. el snapshot viejo), lo
+    reciben de inmediato sin esperar.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result: Any = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, "SingleFlight._Call"] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable[[], Any], fallback: Optional[Any] = None) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and fallback is not None:
+                return fallback
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    Como SingleFlight, para corrutinas de un mismo event loop
+
+    SingleFlight bloquea el hilo mientras espera: en el event loop
+    bloquearía también a la corrutina que está haciendo el trabajo.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], fallback: Optional[Any] = None) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            if fallback is not None:
+                return fallback
+            return await asyncio.shield(future)
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marcada como leída: si nadie esperaba, asyncio no la registra
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+
+class TTLCache:
+    """
+    Cache en memoria con expiración (TTL) e invalidación explícita
+
+    Pensada para datos que cambian muy poco (configuración del sitio,
+    medios): el TTL acota cuánto puede durar un dato modificado fuera
+    de la aplicación y la invalidación cubre los cambios propios.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        now = time.monotonic()
+        with self._lock:
+            found = {}
+            for key in keys:
+                value = self._get(key, now)
+                if value is not None:
+                    found[key] = value
+            return found
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: Hashable, now: float) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+
+class SizedLRUCache:
+    """
+    Cache LRU de bytes acotada por tamaño total (no por número de entradas)
+
+    Para valores inmutables de tamaño muy variable: se descartan los menos
+    usados hasta que la suma de tamaños vuelve a estar bajo max_bytes. Un
+    valor más grande que max_bytes no se guarda.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = 0
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,58 @@
+# app/core/compression.py
+
+import gzip
+from typing import List, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional, sin él solo se ofrece gzip
+    brotli = None
+
+# Por debajo de este tamaño comprimir no compensa
+MIN_COMPRESS_SIZE = 1024
+
+
+def available_encodings() -> List[str]:
+    """Codificaciones soportadas, en orden de preferencia del servidor"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Elige la codificación según Accept-Encoding (q-values incluidos)
+
+    Returns:
+        "br", "gzip" o None (identity)
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # mtime fijo: el mismo cuerpo siempre produce los mismos bytes
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=11)
+    raise ValueError(f"Unsupported encoding: {encoding}")
@@ -0,0 +1,81 @@
+# app/core/conditional.py
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+from fastapi import Request, Response, status
+
+
+class Validator:
+    """ETag / Last-Modified de un recurso"""
+
+    def __init__(self, etag: str, last_modified: Optional[datetime] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def for_encoding(self, encoding: Optional[str]) -> "Validator":
+        """Validador de la variante comprimida: otros bytes, otro ETag"""
+        if not encoding:
+            return self
+        return Validator(f'{self.etag[:-1]}-{encoding}"', self.last_modified)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def body_validator(body: bytes, last_modified: Optional[datetime] = None) -> Validator:
+    """
+    Validador débil de una representación ya serializada
+
+    El ETag es el hash del cuerpo: cambia con cualquier cambio de los
+    bytes, aunque dos escrituras caigan en el mismo segundo de updated_at.
+    """
+    digest = hashlib.sha1(body).hexdigest()[:32]
+
+    if last_modified:
+        # Las fechas de la BD son UTC naive; HTTP trabaja con segundos
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+
+    return Validator(f'W/"{digest}"', last_modified)
+
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    """
+    Evalúa If-None-Match / If-Modified-Since (RFC 9110)
+    If-None-Match tiene prioridad cuando viene en la petición
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {
+            tag.strip().removeprefix("W/")
+            for tag in if_none_match.split(",")
+        }
+        return validator.etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validator.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validator.last_modified <= since
+
+    return False
+
+
+def not_modified_response(validator: Validator, vary: Optional[str] = None) -> Response:
+    headers = validator.headers()
+    if vary:
+        headers["Vary"] = vary
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=headers
+    )
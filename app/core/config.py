@@ -35,11 +35,36 @@ class Settings(BaseSettings):
             f"{self.DATABASE_NAME}"
         )
 
+    # Engine async para las rutas async (opcional, requiere el driver)
+    DATABASE_ASYNC: bool = False
+    DATABASE_ASYNC_DRIVER: str = "aiomysql"
+
+    @property
+    def DATABASE_ASYNC_URL(self) -> str:
+        return self.to_async_url(self.DATABASE_URL)
+
+    def to_async_url(self, url: str) -> str:
+        return url.replace("mysql+pymysql://", f"mysql+{self.DATABASE_ASYNC_DRIVER}://", 1)
+
+    # Réplicas de lectura (URLs completas, mismo formato que DATABASE_URL)
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_STICKY_SECONDS: float = 5.0  # tras escribir, lecturas al primario (mayor que el lag de las réplicas)
+
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    AUTH_STATELESS: bool = False  # confiar en los claims del JWT, sin consultar la BD por petición
+    AUTH_REVOCATION_SYNC_INTERVAL: float = 30.0  # segundos entre sincronizaciones de la denylist
+    AUTH_CACHE_TTL: int = 60  # segundos que se reutiliza una sesión/usuario ya resueltos
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_BCRYPT_ROUNDS: int = 12  # al cambiarlo, los hashes se actualizan en el siguiente login
+    AUTH_HASH_WORKERS: int = 2  # procesos dedicados a bcrypt
+    AUTH_HASH_QUEUE_LIMIT: int = 32  # hashes en espera antes de responder 503
+    AUTH_MAX_SESSIONS_PER_USER: int = 10  # al superarlo se cierran las más antiguas (0 = sin límite)
+    AUTH_SESSION_SWEEP_INTERVAL: float = 300.0  # segundos entre barridos de sesiones expiradas (0 = desactivado)
+    AUTH_SESSION_SWEEP_BATCH_SIZE: int = 1000
     
     # Admin
     FIRST_ADMIN_EMAIL: str = "admin@example.com"
@@ -49,6 +74,22 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: List[str] = ["xlsx", "xls", "csv"]
     
+    # CMS
+    CMS_SNAPSHOT_DIR: str = "storage/cms_snapshots"
+    CMS_SITE_CACHE_TTL: int = 300  # segundos
+    CMS_VERSION_CHECK_INTERVAL: float = 0.1  # segundos entre lecturas de la versión compartida (cambios de otros workers)
+    CMS_FAST_SERIALIZATION: bool = True  # dict -> orjson sin validar con Pydantic
+    CMS_AUDIT_KEYFRAME_INTERVAL: int = 20  # versiones por snapshot completo en la auditoría
+    CMS_AUDIT_WRITE_BEHIND: bool = False  # auditoría encolada e insertada por lotes
+    CMS_AUDIT_SPOOL_DIR: str = "storage/audit_spool"
+    CMS_AUDIT_BATCH_SIZE: int = 500
+    CMS_AUDIT_FLUSH_INTERVAL: float = 1.0  # segundos
+    CMS_AUDIT_ARCHIVE_DIR: str = "storage/audit_archive"
+    CMS_AUDIT_ARCHIVE_AFTER_DAYS: int = 180
+    CMS_AS_OF_BUCKET_SECONDS: int = 60  # precisión de la landing "as of" (y clave de su cache)
+    CMS_AS_OF_CACHE_DELAY: float = 10.0  # segundos que espera un intervalo "as of" a la auditoría en vuelo antes de cachearse
+    CMS_DIFF_CACHE_BYTES: int = 16 * 1024 * 1024  # diffs entre versiones ya serializados
+    
     # External APIs (from original code)
     API_URL_FINANCE: str = ""
     API_URL_MARGARITA: str = ""
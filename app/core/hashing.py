@@ -0,0 +1,184 @@
+# app/core/hashing.py
+
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+from passlib.context import CryptContext
+from .config import settings
+
+
+def hash_token(token: str) -> str:
+    """
+    Huella de un token de sesión para guardarla y buscarla en sys_sessions
+
+    SHA-256 basta (no bcrypt): el token ya es un valor largo y aleatorio
+    firmado, no una contraseña que se pueda adivinar.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class HashingBusyError(RuntimeError):
+    """La cola de hashing está llena: la petición se rechaza sin esperar"""
+
+
+class PasswordHasher:
+    """
+    bcrypt en un pool de procesos propio y acotado
+
+    El hashing es CPU puro: en los hilos de las rutas síncronas ocupa el
+    threadpool de anyio y deja sin hilos al resto de endpoints. Las rutas
+    async usan hash_async / verify_and_update_async, que esperan al pool
+    sin ocupar ningún hilo. Cada llamada ocupa un hueco de
+    `workers + queue_limit`; sin hueco libre se lanza HashingBusyError en
+    vez de encolar sin límite.
+
+    El coste (rounds) es el configurado: un hash con otro coste se
+    considera desactualizado y verify_and_update devuelve el nuevo.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, queue_limit: int = 32):
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hash_total = 0.0
+        self._hash_max = 0.0
+
+    def hash(self, password: str) -> str:
+        return self._submit(_hash, password, self.rounds).result()[0]
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns:
+            (válida, hash nuevo si el guardado usa otro coste o esquema)
+        """
+        return self._submit(_verify_and_update, password, hashed, self.rounds).result()[0]
+
+    async def hash_async(self, password: str) -> str:
+        return (await asyncio.wrap_future(self._submit(_hash, password, self.rounds)))[0]
+
+    async def verify_and_update_async(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Como verify_and_update, sin bloquear el event loop"""
+        future = self._submit(_verify_and_update, password, hashed, self.rounds)
+        return (await asyncio.wrap_future(future))[0]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args) -> Future:
+        """
+        Encola fn en el pool; el Future da (resultado, inicio, duración).
+        El hueco se libera al terminar, se espere o no el resultado.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingBusyError("Password hashing queue is full")
+
+        with self._lock:
+            self._in_flight += 1
+        submitted = time.time()
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BaseException as e:
+            self._finish(None, submitted, e)
+            raise
+        future.add_done_callback(lambda done: self._finish(done, submitted))
+        return future
+
+    def _finish(self, future: Optional[Future], submitted: float, error: Optional[BaseException] = None) -> None:
+        if future is not None and not future.cancelled():
+            error = future.exception()
+        with self._lock:
+            self._in_flight -= 1
+            if isinstance(error, BrokenProcessPool):
+                # Un worker murió: el siguiente intento crea un pool nuevo
+                self._pool = None
+            elif future is not None and error is None and not future.cancelled():
+                _, started, elapsed = future.result()
+                wait = max(0.0, started - submitted)
+                self._completed += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+                self._hash_total += elapsed
+                self._hash_max = max(self._hash_max, elapsed)
+        self._slots.release()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: hacer fork de un proceso con hilos puede dejar locks tomados
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    # ==================== Métricas ====================
+
+    def metrics(self) -> dict:
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_seconds": round(self._wait_total / completed, 4),
+                "max_queue_wait_seconds": round(self._wait_max, 4),
+                "avg_hash_seconds": round(self._hash_total / completed, 4),
+                "max_hash_seconds": round(self._hash_max, 4),
+            }
+
+
+# ==================== Funciones de los workers ====================
+
+_contexts: Dict[int, CryptContext] = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    context = _contexts.get(rounds)
+    if context is None:
+        context = _contexts[rounds] = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+    return context
+
+
+def _hash(password: str, rounds: int):
+    started = time.time()
+    hashed = _context(rounds).hash(password)
+    return hashed, started, time.time() - started
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int):
+    started = time.time()
+    result = _context(rounds).verify_and_update(password, hashed)
+    return result, started, time.time() - started
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.AUTH_BCRYPT_ROUNDS,
+    workers=settings.AUTH_HASH_WORKERS,
+    queue_limit=settings.AUTH_HASH_QUEUE_LIMIT,
+)
@@ -0,0 +1,214 @@
+# app/core/json_patch.py
+
+import copy
+from typing import Any, List, Tuple
+
+
+class JsonPatchError(ValueError):
+    """Patch inválido o que no se puede aplicar sobre el documento"""
+
+
+# ==================== RFC 7396 (JSON Merge Patch) ====================
+
+def apply_merge_patch(target: Any, patch: Any, in_place: bool = False) -> Any:
+    """
+    Aplica un merge patch
+
+    Args:
+        in_place: modifica `target` en lugar de devolver una copia
+    """
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+
+    if not isinstance(target, dict):
+        target = {}
+    elif not in_place:
+        target = copy.deepcopy(target)
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = apply_merge_patch(target.get(key), value, in_place=True)
+    return target
+
+
+# ==================== RFC 6902 (JSON Patch) ====================
+
+def make_json_patch(source: Any, target: Any, path: str = "") -> List[dict]:
+    """
+    Operaciones JSON Patch que transforman `source` en `target`
+
+    Diff estructural: recorre objetos y listas y solo emite las hojas que
+    cambian; una lista que cambia de tamaño se ajusta por el final. Las
+    claves se recorren ordenadas: el resultado no depende del orden de
+    las claves de cada documento.
+    """
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = []
+        for key in sorted(source):
+            if key not in target:
+                operations.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key in sorted(target):
+            child = f"{path}/{_escape(key)}"
+            if key in source:
+                operations.extend(make_json_patch(source[key], target[key], child))
+            else:
+                operations.append({"op": "add", "path": child, "value": copy.deepcopy(target[key])})
+        return operations
+
+    if isinstance(source, list) and isinstance(target, list):
+        operations = []
+        for index, (old, new) in enumerate(zip(source, target)):
+            operations.extend(make_json_patch(old, new, f"{path}/{index}"))
+        # Quitar desde el final para que los índices sigan siendo válidos
+        for index in range(len(source) - 1, len(target) - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{index}"})
+        for value in target[len(source):]:
+            operations.append({"op": "add", "path": f"{path}/-", "value": copy.deepcopy(value)})
+        return operations
+
+    # type(): en Python 1 == True, pero en JSON son valores distintos
+    if type(source) is type(target) and source == target:
+        return []
+    return [{"op": "replace", "path": path, "value": copy.deepcopy(target)}]
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def apply_json_patch(document: Any, operations: List[dict], in_place: bool = False) -> Any:
+    """
+    Aplica una lista de operaciones JSON Patch
+
+    Args:
+        in_place: modifica `document` en lugar de devolver una copia; si
+            una operación falla el documento queda a medio aplicar
+
+    Raises:
+        JsonPatchError: Si alguna operación falla (sin in_place no se aplica ninguna)
+    """
+    result = document if in_place else copy.deepcopy(document)
+    for index, operation in enumerate(operations):
+        try:
+            result = _apply_operation(result, operation)
+        except JsonPatchError as e:
+            raise JsonPatchError(f"Operation {index} ({operation.get('op')}): {e}")
+    return result
+
+
+def _apply_operation(document: Any, operation: dict) -> Any:
+    op = operation.get("op")
+    path = operation.get("path")
+    if path is None:
+        raise JsonPatchError("missing 'path'")
+
+    if op in ("add", "replace", "test") and "value" not in operation:
+        raise JsonPatchError("missing 'value'")
+
+    if op == "add":
+        return _add(document, path, copy.deepcopy(operation["value"]))
+    if op == "remove":
+        document, _ = _remove(document, path)
+        return document
+    if op == "replace":
+        if path == "":
+            return copy.deepcopy(operation["value"])
+        document, _ = _remove(document, path)
+        return _add(document, path, copy.deepcopy(operation["value"]))
+    if op == "move":
+        from_path = _required_from(operation)
+        if path.startswith(from_path + "/"):
+            raise JsonPatchError("cannot move a value into one of its children")
+        document, value = _remove(document, from_path)
+        return _add(document, path, value)
+    if op == "copy":
+        value = _get(document, _required_from(operation))
+        return _add(document, path, copy.deepcopy(value))
+    if op == "test":
+        if _get(document, path) != operation["value"]:
+            raise JsonPatchError(f"test failed at '{path}'")
+        return document
+
+    raise JsonPatchError(f"unknown op '{op}'")
+
+
+def _required_from(operation: dict) -> str:
+    from_path = operation.get("from")
+    if from_path is None:
+        raise JsonPatchError("missing 'from'")
+    return from_path
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"invalid pointer '{pointer}'")
+    return [
+        token.replace("~1", "/").replace("~0", "~")
+        for token in pointer[1:].split("/")
+    ]
+
+
+def _array_index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"invalid array index '{token}'")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchError(f"array index {index} out of range")
+    return index
+
+
+def _resolve_parent(document: Any, pointer: str) -> Tuple[Any, str]:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("operation on the document root")
+    parent = document
+    for token in tokens[:-1]:
+        parent = _child(parent, token)
+    return parent, tokens[-1]
+
+
+def _child(container: Any, token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"path '{token}' not found")
+        return container[token]
+    if isinstance(container, list):
+        return container[_array_index(container, token)]
+    raise JsonPatchError(f"cannot traverse into '{token}'")
+
+
+def _get(document: Any, pointer: str) -> Any:
+    value = document
+    for token in _parse_pointer(pointer):
+        value = _child(value, token)
+    return value
+
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    if pointer == "":
+        return value
+    parent, token = _resolve_parent(document, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"cannot add into '{token}'")
+    return document
+
+
+def _remove(document: Any, pointer: str) -> Tuple[Any, Any]:
+    parent, token = _resolve_parent(document, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"path '{pointer}' not found")
+        return document, parent.pop(token)
+    if isinstance(parent, list):
+        return document, parent.pop(_array_index(parent, token))
+    raise JsonPatchError(f"cannot remove '{token}'")
@@ -0,0 +1,31 @@
+# app/core/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginación mal formado"""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Cursor opaco con la posición (created_at, id) del último registro devuelto"""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """
+    Raises:
+        InvalidCursorError: Si el cursor no viene de encode_cursor
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
@@ -0,0 +1,36 @@
+# app/core/serialization.py
+
+import enum
+import json
+from datetime import date, datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional, se usa json de la librería estándar
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serializa dicts/listas planos a JSON (bytes) sin pasar por Pydantic
+
+    Fechas en ISO 8601 y enums por su valor, igual que la salida de los
+    schemas. Usa orjson si está instalado.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode()
@@ -0,0 +1,148 @@
+# app/core/snapshot_store.py
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from .compression import compress
+from .conditional import Validator
+
+
+class Snapshot:
+    """Respuesta ya serializada (bytes) junto con su validador HTTP"""
+
+    def __init__(self, body: bytes, validator: Validator):
+        self.body = body
+        self.validator = validator
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """
+        Cuerpo comprimido con `encoding` (gzip / br)
+
+        Se comprime una sola vez por snapshot, es decir, por versión del
+        contenido; las peticiones siguientes reciben los bytes guardados.
+        """
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+
+class SnapshotStore:
+    """
+    Almacén en disco de snapshots serializados
+
+    Cada snapshot es un archivo `<nombre>.snapshot`: una línea JSON con el
+    ETag, el Last-Modified y la versión de la que se construyó, seguida del
+    cuerpo tal cual se envía. Las escrituras son atómicas (archivo temporal
+    + rename), así otros workers nunca leen un archivo a medio escribir.
+
+    El archivo VERSION guarda la versión del contenido compartida por todos
+    los procesos que usan el directorio: bump() la cambia y cada worker la
+    compara en sus lecturas para saber si otro proceso escribió. Un
+    snapshot de otra versión no se escribe ni se lee: una reconstrucción
+    lenta nunca deja en disco una landing anterior al último cambio.
+    """
+
+    VERSION_FILE = "VERSION"
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        # ((inodo, mtime), versión) de la última lectura de VERSION
+        self._version_cache = (None, "")
+
+    def version(self) -> str:
+        """
+        Versión compartida actual ("" si aún no hubo ningún bump)
+
+        Solo se relee el archivo si cambió: bump lo reemplaza con un
+        rename, así que cambia el inodo aunque el mtime no avance.
+        """
+        path = self.directory / self.VERSION_FILE
+        try:
+            stat = path.stat()
+            key = (stat.st_ino, stat.st_mtime_ns)
+            cached_key, version = self._version_cache
+            if key != cached_key:
+                version = path.read_text()
+                self._version_cache = (key, version)
+            return version
+        except OSError:
+            return ""
+
+    def bump(self) -> str:
+        """Nueva versión compartida: deja viejas las caches de todos los procesos"""
+        version = f"{time.time_ns()}-{uuid.uuid4().hex[:12]}"
+        self._atomic_write(self.directory / self.VERSION_FILE, version.encode())
+        return version
+
+    @staticmethod
+    def changed_at(version: str) -> float:
+        """Instante (time.time()) en que se generó `version` con bump; 0 si no se sabe"""
+        try:
+            return int(version.split("-", 1)[0]) / 1e9
+        except ValueError:
+            return 0.0
+
+    def _path(self, key: str) -> Path:
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return self.directory / f"{name}.snapshot"
+
+    def read(self, key: str) -> Optional[Snapshot]:
+        """Snapshot de la versión actual o None"""
+        try:
+            header, body = self._path(key).read_bytes().split(b"\n", 1)
+            meta = json.loads(header)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != self.version():
+            return None
+
+        last_modified = meta.get("last_modified")
+        return Snapshot(
+            body,
+            Validator(
+                meta["etag"],
+                datetime.fromisoformat(last_modified) if last_modified else None
+            )
+        )
+
+    def write(self, key: str, snapshot: Snapshot, version: str) -> bool:
+        """Guarda el snapshot solo si fue construido con la versión actual"""
+        if version != self.version():
+            return False
+        validator = snapshot.validator
+        meta = {
+            "key": key,
+            "version": version,
+            "etag": validator.etag,
+            "last_modified": validator.last_modified.isoformat() if validator.last_modified else None,
+        }
+        self._atomic_write(self._path(key), json.dumps(meta).encode() + b"\n" + snapshot.body)
+        return True
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        if not self.directory.is_dir():
+            return
+        for path in self.directory.glob("*.snapshot"):
+            path.unlink(missing_ok=True)
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -1,7 +1,11 @@
+from itertools import count
+from typing import AsyncIterator, Union
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.db import routing
 
 # Crear engine
 engine = create_engine(
@@ -17,6 +21,36 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Réplicas de lectura (DATABASE_REPLICA_URLS): solo para rutas de lectura,
+# ver get_read_db. Se reparten por turnos.
+replica_engines = [
+    create_engine(url, pool_pre_ping=True, pool_recycle=3600)
+    for url in settings.DATABASE_REPLICA_URLS
+]
+_replica_turn = count()
+
+# Engine async (DATABASE_ASYNC): mismo esquema con un driver async
+# (aiomysql; aiosqlite para pruebas locales). Sin él, las rutas async
+# usan sesiones síncronas en el threadpool.
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        settings.DATABASE_ASYNC_URL,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+    )
+    async_replica_engines = [
+        create_async_engine(settings.to_async_url(url), pool_pre_ping=True, pool_recycle=3600)
+        for url in settings.DATABASE_REPLICA_URLS
+    ]
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 
 try:
     with engine.connect() as conn:
@@ -34,3 +68,58 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Session:
+    """
+    Sesión para rutas de solo lectura: una réplica si hay, salvo que toque
+    leer del primario (read-your-writes, ver routing.prefers_primary)
+    """
+    db = _read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[Union[AsyncSession, Session]]:
+    """
+    Sesión para rutas async: AsyncSession con DATABASE_ASYNC; si no, una
+    Session síncrona que los servicios async usan desde el threadpool
+    """
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncIterator[Union[AsyncSession, Session]]:
+    """Como get_async_db, con el criterio de réplicas de get_read_db"""
+    if AsyncSessionLocal is None:
+        db = _read_session()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+
+    replica = _pick_replica(async_replica_engines)
+    async with (AsyncSessionLocal(bind=replica, info={routing.REPLICA: True}) if replica else AsyncSessionLocal()) as db:
+        yield db
+
+
+def _read_session() -> Session:
+    replica = _pick_replica(replica_engines)
+    return SessionLocal(bind=replica, info={routing.REPLICA: True}) if replica else SessionLocal()
+
+
+def _pick_replica(engines: list):
+    if not engines or routing.prefers_primary():
+        return None
+    return engines[next(_replica_turn) % len(engines)]
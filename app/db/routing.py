@@ -0,0 +1,70 @@
+# app/db/routing.py
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+# Cookie con el instante (epoch) hasta el que el cliente lee del primario
+STICKY_COOKIE = "db_primary_until"
+
+# Clave de Session.info en las sesiones abiertas contra una réplica
+REPLICA = "db_replica"
+
+# Estado de la petición en curso: {"primary": bool, "wrote": bool}
+_request_state: ContextVar[Optional[dict]] = ContextVar("db_request_state", default=None)
+
+# Último cambio del CMS conocido por este proceso, propio o de otro worker (time.time())
+_changed_at = 0.0
+
+
+def begin_request(cookie: Optional[str]) -> Token:
+    """Abre el estado de la petición a partir de la cookie de read-your-writes"""
+    try:
+        primary_until = float(cookie) if cookie else 0.0
+    except ValueError:
+        primary_until = 0.0
+    return _request_state.set({"primary": primary_until > time.time(), "wrote": False})
+
+
+def end_request(token: Token) -> dict:
+    state = _request_state.get()
+    _request_state.reset(token)
+    return state
+
+
+def prefers_primary() -> bool:
+    """
+    La lectura debe ir al primario: el cliente cambió el CMS hace menos de
+    DATABASE_STICKY_SECONDS (cookie). Los demás clientes siguen leyendo de
+    las réplicas.
+    """
+    state = _request_state.get()
+    return state is not None and state["primary"]
+
+
+def sticky_until() -> float:
+    return time.time() + settings.DATABASE_STICKY_SECONDS
+
+
+def mark_write() -> None:
+    """La petición en curso confirmó cambios que sus siguientes lecturas deben ver"""
+    state = _request_state.get()
+    if state is not None:
+        state["wrote"] = True
+
+
+def note_change(changed_at: float) -> None:
+    global _changed_at
+    _changed_at = max(_changed_at, changed_at)
+
+
+def can_fill_caches(session: Session) -> bool:
+    """
+    Lo leído de una réplica justo después de un cambio puede ser anterior a
+    él: se sirve, pero no se guarda en las caches del proceso, que solo se
+    invalidan con el siguiente cambio
+    """
+    if not session.info.get(REPLICA):
+        return True
+    return time.time() - _changed_at >= settings.DATABASE_STICKY_SECONDS
@@ -1,11 +1,16 @@
 # app/main.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from .core.config import settings
+from .core.hashing import password_hasher
+from .db import routing
 from .api.auth.router import router as auth_router
 from .api.cms.router import router as cms_router
+from .services.audit_writer import audit_writer
+from .services.session_sweeper import session_sweeper
+from .services.token_denylist import token_denylist
 
 print("--- EL SERVIDOR ESTÁ ARRANCANDO ---")
 # Crear instancia de FastAPI
@@ -27,6 +32,29 @@ app.add_middleware(
 )
 
 
+# Read-your-writes con réplicas: tras cambiar el CMS, el cliente lee del
+# primario durante DATABASE_STICKY_SECONDS (cookie, vale entre workers)
+async def database_routing(request: Request, call_next):
+    token = routing.begin_request(request.cookies.get(routing.STICKY_COOKIE))
+    try:
+        response = await call_next(request)
+    finally:
+        state = routing.end_request(token)
+    if state["wrote"]:
+        response.set_cookie(
+            routing.STICKY_COOKIE,
+            f"{routing.sticky_until():.3f}",
+            max_age=int(settings.DATABASE_STICKY_SECONDS) + 1,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+if settings.DATABASE_REPLICA_URLS:
+    app.middleware("http")(database_routing)
+
+
 # Health check
 @app.get("/health")
 async def health_check():
@@ -37,6 +65,17 @@ async def health_check():
     }
 
 
+# Métricas internas
+@app.get("/metrics")
+async def metrics():
+    return {
+        "audit_writer": audit_writer.metrics(),
+        "token_denylist": token_denylist.metrics(),
+        "password_hasher": password_hasher.metrics(),
+        "session_sweeper": session_sweeper.metrics(),
+    }
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -69,9 +108,18 @@ async def global_exception_handler(request, exc):
 async def startup_event():
     print(f"🚀 Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     print(f"📖 API Docs: http://localhost:8000{settings.API_V1_PREFIX}/docs")
+    if settings.CMS_AUDIT_WRITE_BEHIND:
+        audit_writer.start()
+    if settings.AUTH_STATELESS:
+        token_denylist.start()
+    session_sweeper.start()
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
+    audit_writer.stop()
+    token_denylist.stop()
+    session_sweeper.stop()
+    password_hasher.shutdown()
     print(f"👋 Shutting down {settings.PROJECT_NAME}")
\ No newline at end of file
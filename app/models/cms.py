@@ -1,5 +1,5 @@
 # app/models/cms.py
-from sqlalchemy import Column, BigInteger, String, DateTime, Enum as SQLEnum, Boolean, JSON, Text, Integer, ForeignKey
+from sqlalchemy import Column, BigInteger, String, DateTime, Enum as SQLEnum, Boolean, JSON, Text, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -17,6 +17,12 @@ class PageStatus(enum.Enum):
     PUBLISHED = "published"
 
 
+class AuditChangeType(enum.Enum):
+    SNAPSHOT = "snapshot"
+    JSON_PATCH = "json_patch"
+    MERGE_PATCH = "merge_patch"
+
+
 class MessageStatus(enum.Enum):
     UNREAD = "unread"
     READ = "read"
@@ -158,12 +164,21 @@ class Content(Base):
 
 class Auditory(Base):
     __tablename__ = "cms_auditory_logs"
+    __table_args__ = (
+        # Historial por contenido paginado por (created_at, id)
+        Index("ix_cms_auditory_logs_content_created_id", "content_id", "created_at", "id"),
+    )
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     content_id = Column(BigInteger, ForeignKey("cms_contents.id"), nullable=True)
     title = Column(String(255), nullable=False)
     author_id = Column(BigInteger, ForeignKey("sys_users.id"), nullable=True)
-    data = Column(JSON, nullable=False)
+    data = Column(JSON, nullable=False, comment="Snapshot completo o el patch aplicado, según change_type")
+    change_type = Column(
+        SQLEnum(AuditChangeType, name="auditchangetype", native_enum=False, length=20,
+        values_callable=lambda e: [x.value for x in e]),
+        default=AuditChangeType.SNAPSHOT, server_default=AuditChangeType.SNAPSHOT.value, nullable=False
+    )
     is_visible = Column(Boolean, default=True)
     
     created_at = Column(DateTime, default=func.now(), nullable=False)
@@ -38,11 +38,29 @@ class Session(Base):
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, nullable=False, index=True)
-    token = Column(String(500), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True, comment="SHA-256 (hex) del token, ver core/hashing.hash_token")
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     
     def __repr__(self):
         return f"<Session {self.id} - User {self.user_id}>"
+
+
+class TokenRevocation(Base):
+    """
+    Tokens revocados antes de expirar, para el modo de autenticación sin
+    estado (AUTH_STATELESS): con `jti` se revoca un token; sin él, todos los
+    del usuario emitidos hasta created_at
+    """
+    __tablename__ = "sys_token_revocations"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    jti = Column(String(64), nullable=True, index=True)
+    user_id = Column(BigInteger, nullable=True, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True, comment="Desde aquí ya no hace falta recordarla")
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<TokenRevocation {self.jti or f'user {self.user_id}'}>"
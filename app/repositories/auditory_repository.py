@@ -1,7 +1,14 @@
 # app/repositories/auditory_repository.py
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..models.cms import Auditory
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import insert, select, func, and_, or_, case
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..core.audit_archive import AuditArchive
+from ..core.config import settings
+from ..models.cms import Auditory, AuditChangeType
+
+# Historial antiguo, movido fuera de la tabla por services/audit_archiver.py
+audit_archive = AuditArchive(settings.CMS_AUDIT_ARCHIVE_DIR)
 
 
 class AuditoryRepository:
@@ -9,25 +16,314 @@ class AuditoryRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_log( self, content_id: int, data_snapshot: dict, author_id: Optional[int] = None, title: str = "", ) -> Auditory:
+    def create_log( self, content_id: int, data_snapshot: dict, author_id: Optional[int] = None, title: str = "", change_type: AuditChangeType = AuditChangeType.SNAPSHOT, ) -> Auditory:
         log = Auditory(
             content_id=content_id,
             title=title,
             author_id=author_id,
             data=data_snapshot,
+            change_type=change_type,
             is_visible=True,
         )
         self.db.add(log)
         self.db.flush()
         return log
 
+    def create_logs(self, entries: List[dict]) -> None:
+        """
+        Inserta varios registros en un solo INSERT multi-fila
+
+        Args:
+            entries: dicts con content_id, data_snapshot, author_id, title
+                y opcionalmente change_type (snapshot por defecto)
+        """
+        if not entries:
+            return
+        self.db.execute(
+            insert(Auditory).values([
+                {
+                    "content_id": entry["content_id"],
+                    "title": entry.get("title", ""),
+                    "author_id": entry.get("author_id"),
+                    "data": entry["data_snapshot"],
+                    "change_type": entry.get("change_type", AuditChangeType.SNAPSHOT),
+                    "is_visible": True,
+                }
+                for entry in entries
+            ])
+        )
+
     def get_by_content_id(self, content_id: int) -> List[Auditory]:
-        return (
+        """Historial completo, incluido el archivado"""
+        logs = (
             self.db.query(Auditory)
             .filter(Auditory.content_id == content_id)
             .order_by(Auditory.created_at.desc())
             .all()
         )
+        archived = self._get_archived(content_id)
+        if archived:
+            logs = _merge_newest_first(logs, archived)
+        return logs
+
+    def get_history_page(
+        self,
+        content_id: int,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List:
+        """
+        Resumen del historial (sin `data`), del más reciente al más antiguo
+
+        Paginación por keyset: `before` es el (created_at, id) del último
+        registro de la página anterior. Recorre el índice
+        (content_id, created_at, id) sin OFFSET.
+        """
+        query = (
+            select(
+                Auditory.id,
+                Auditory.content_id,
+                Auditory.title,
+                Auditory.author_id,
+                Auditory.change_type,
+                Auditory.is_visible,
+                Auditory.created_at,
+                Auditory.updated_at,
+            )
+            .where(Auditory.content_id == content_id)
+            .order_by(Auditory.created_at.desc(), Auditory.id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            created_at, log_id = before
+            query = query.where(or_(
+                Auditory.created_at < created_at,
+                and_(Auditory.created_at == created_at, Auditory.id < log_id)
+            ))
+        rows = self.db.execute(query).all()
+
+        # Lo archivado es anterior a todo lo que queda en la tabla:
+        # solo hace falta cuando la tabla no llena la página
+        if len(rows) < limit:
+            archived = [
+                log for log in self._get_archived(content_id)
+                if before is None or (log.created_at, log.id) < before
+            ]
+            if archived:
+                rows = _merge_newest_first(rows, archived)[:limit]
+        return rows
+
+    def get_by_id(self, log_id: int, content_id: Optional[int] = None) -> Optional[Auditory]:
+        """content_id, si se conoce, localiza el registro archivado por el índice"""
+        log = self.db.query(Auditory).filter(Auditory.id == log_id).first()
+        if log is None:
+            record = audit_archive.find(log_id, content_id)
+            if record is not None:
+                log = _from_archive(record)
+        return log
+
+    def get_chain_depths(self, content_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Registros posteriores al último snapshot completo de cada contenido
+
+        Los contenidos sin ningún snapshot no aparecen en el resultado.
+        """
+        content_ids = set(content_ids)
+        if not content_ids:
+            return {}
+        keyframes = (
+            select(
+                Auditory.content_id.label("content_id"),
+                func.max(Auditory.id).label("keyframe_id")
+            )
+            .where(
+                Auditory.content_id.in_(content_ids),
+                Auditory.change_type == AuditChangeType.SNAPSHOT
+            )
+            .group_by(Auditory.content_id)
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(keyframes.c.content_id, func.count(Auditory.id))
+            .select_from(keyframes)
+            .outerjoin(
+                Auditory,
+                (Auditory.content_id == keyframes.c.content_id)
+                & (Auditory.id > keyframes.c.keyframe_id)
+            )
+            .group_by(keyframes.c.content_id)
+        )
+        return {content_id: depth for content_id, depth in rows}
+
+    def get_content_ids_with_logs(self, after_id: int = 0, limit: int = 100) -> List[int]:
+        return list(self.db.scalars(
+            select(Auditory.content_id)
+            .where(Auditory.content_id > after_id)
+            .distinct()
+            .order_by(Auditory.content_id)
+            .limit(limit)
+        ))
+
+    def get_all_by_content_id(self, content_id: int) -> List[Auditory]:
+        """Historial completo en orden de escritura"""
+        return (
+            self.db.query(Auditory)
+            .filter(Auditory.content_id == content_id)
+            .order_by(Auditory.id)
+            .all()
+        )
+
+    def get_replay_chain(self, content_id: int, log_id: int) -> List[Auditory]:
+        """
+        Registros necesarios para reconstruir la versión `log_id`: el último
+        snapshot completo anterior (o igual) y los patches que le siguen
+
+        El archivado corta siempre justo antes de un snapshot, así que la
+        cadena está entera en la tabla o entera en el archivo.
+        """
+        keyframe_id = (
+            select(func.max(Auditory.id))
+            .where(
+                Auditory.content_id == content_id,
+                Auditory.id <= log_id,
+                Auditory.change_type == AuditChangeType.SNAPSHOT
+            )
+            .scalar_subquery()
+        )
+        chain = (
+            self.db.query(Auditory)
+            .filter(
+                Auditory.content_id == content_id,
+                Auditory.id >= keyframe_id,
+                Auditory.id <= log_id
+            )
+            .order_by(Auditory.id)
+            .all()
+        )
+        if chain and chain[-1].id == log_id:
+            return chain
+
+        archived = [log for log in self._get_archived(content_id) if log.id <= log_id]
+        if not archived or archived[-1].id != log_id:
+            return chain
+        start = max(
+            (index for index, log in enumerate(archived) if log.change_type == AuditChangeType.SNAPSHOT),
+            default=0
+        )
+        return archived[start:]
+
+    def get_chains_as_of(self, content_ids: Iterable[int], as_of: datetime) -> Dict[int, List[Auditory]]:
+        """
+        Cadena de cada contenido en el momento `as_of`: su último snapshot
+        hasta esa fecha y los patches posteriores (también hasta esa fecha)
+
+        Una sola consulta para todos los contenidos: una función ventana
+        calcula por contenido el último snapshot. Los contenidos que no
+        tienen registros en la tabla se buscan en el archivo.
+        """
+        content_ids = set(content_ids)
+        if not content_ids:
+            return {}
+
+        windowed = (
+            select(
+                Auditory,
+                func.max(
+                    case((Auditory.change_type == AuditChangeType.SNAPSHOT, Auditory.id))
+                ).over(partition_by=Auditory.content_id).label("keyframe_id")
+            )
+            .where(Auditory.content_id.in_(content_ids), Auditory.created_at <= as_of)
+            .subquery()
+        )
+        log = aliased(Auditory, windowed)
+        rows = self.db.scalars(
+            select(log)
+            .where(windowed.c.id >= windowed.c.keyframe_id)
+            .order_by(windowed.c.content_id, windowed.c.id)
+        )
+        chains: Dict[int, List[Auditory]] = {}
+        for row in rows:
+            chains.setdefault(row.content_id, []).append(row)
+
+        for content_id in content_ids - chains.keys():
+            archived = [log for log in self._get_archived(content_id) if log.created_at <= as_of]
+            start = max(
+                (index for index, log in enumerate(archived) if log.change_type == AuditChangeType.SNAPSHOT),
+                default=None
+            )
+            if start is not None:
+                chains[content_id] = archived[start:]
+        return chains
+
+    def get_logged_content_ids(self, content_ids: Iterable[int]) -> Set[int]:
+        """Contenidos (de los dados) con algún registro, en la tabla o archivado"""
+        content_ids = set(content_ids)
+        if not content_ids:
+            return set()
+        logged = set(self.db.scalars(
+            select(Auditory.content_id).where(Auditory.content_id.in_(content_ids)).distinct()
+        ))
+        logged.update(content_id for content_id in content_ids - logged if audit_archive.has_content(content_id))
+        return logged
+
+    def get_archivable(self, cutoff: datetime, after_content_id: int = 0, limit: int = 100) -> Dict[int, int]:
+        """
+        Por contenido, el último snapshot anterior a `cutoff`: todo lo que
+        va antes de él se puede archivar sin romper ninguna cadena de patches
+
+        Returns:
+            content_id -> id del snapshot que queda como inicio de la tabla
+        """
+        rows = self.db.execute(
+            select(Auditory.content_id, func.max(Auditory.id))
+            .where(
+                Auditory.content_id > after_content_id,
+                Auditory.change_type == AuditChangeType.SNAPSHOT,
+                Auditory.created_at < cutoff
+            )
+            .group_by(Auditory.content_id)
+            .order_by(Auditory.content_id)
+            .limit(limit)
+        )
+        return {content_id: keyframe_id for content_id, keyframe_id in rows}
+
+    def get_before(self, content_id: int, log_id: int) -> List[Auditory]:
+        return (
+            self.db.query(Auditory)
+            .filter(Auditory.content_id == content_id, Auditory.id < log_id)
+            .order_by(Auditory.id)
+            .all()
+        )
+
+    def delete_before(self, content_id: int, log_id: int) -> int:
+        return (
+            self.db.query(Auditory)
+            .filter(Auditory.content_id == content_id, Auditory.id < log_id)
+            .delete(synchronize_session=False)
+        )
+
+    def _get_archived(self, content_id: int) -> List[Auditory]:
+        """Registros archivados como instancias sin sesión (solo lectura), por id"""
+        return [_from_archive(record) for record in audit_archive.get_content_records(content_id)]
+
+
+def _from_archive(record: dict) -> Auditory:
+    return Auditory(
+        id=record["id"],
+        content_id=record["content_id"],
+        title=record["title"],
+        author_id=record["author_id"],
+        data=record["data"],
+        change_type=AuditChangeType(record["change_type"]),
+        is_visible=record["is_visible"],
+        created_at=datetime.fromisoformat(record["created_at"]),
+        updated_at=datetime.fromisoformat(record["updated_at"]),
+    )
+
 
-    def get_by_id(self, log_id: int) -> Optional[Auditory]:
-        return self.db.query(Auditory).filter(Auditory.id == log_id).first()
\ No newline at end of file
+def _merge_newest_first(rows: list, archived: List[Auditory]) -> list:
+    """Une tabla y archivo por (created_at, id) descendente; ante un id repetido gana la tabla"""
+    hot_ids = {row.id for row in rows}
+    merged = list(rows) + [log for log in archived if log.id not in hot_ids]
+    merged.sort(key=lambda log: (log.created_at, log.id), reverse=True)
+    return merged
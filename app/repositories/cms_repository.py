@@ -1,23 +1,46 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, desc
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy import select, and_, or_, func
+from sqlalchemy.orm import selectinload, load_only
+from typing import Dict, Iterable, List, Optional, Sequence
 from datetime import datetime
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..db.routing import can_fill_caches
 from ..models.cms import ( Page, Section, Media, 
 PageStatus, Site, SectionContent, Content)
 
+# Sitio y medios cambian muy poco: se cachean como instancias desacopladas
+# de la sesión (solo lectura). La invalidación está en services/cms_cache.py
+site_settings_cache = TTLCache(ttl=settings.CMS_SITE_CACHE_TTL, max_entries=16)
+media_cache = TTLCache(ttl=settings.CMS_SITE_CACHE_TTL)
+
 
 class CMSRepository:
 
     def __init__(self, db: Session):
         self.db = db
 
-    def get_site_settings(self, site_key: str = "main"):
-        return (
+    def get_site_settings(self, site_key: str = "main") -> Optional[Site]:
+        """
+        Configuración del sitio, cacheada con TTL
+
+        La instancia devuelta está desacoplada de la sesión: es de solo
+        lectura. Para modificarla hay que cargarla con una consulta propia.
+        """
+        site = site_settings_cache.get(site_key)
+        if site is not None:
+            return site
+
+        site = (
             self.db.query(Site)
             .filter(Site.site_key == site_key)
             .first()
         )
+        if site is not None:
+            self.db.expunge(site)
+            if can_fill_caches(self.db):
+                site_settings_cache.set(site_key, site)
+        return site
 
     def get_contents_by_page_id(self, page_id: int) -> List[Content]:
         result = self.db.execute(
@@ -34,7 +57,6 @@ class CMSRepository:
     def get_homepage(self) -> Optional[Page]:
         result = self.db.execute(
             select(Page)
-            .options(selectinload(Page.sections))
             .where(
                 and_(
                     Page.is_homepage == True,
@@ -45,6 +67,117 @@ class CMSRepository:
         )
         return result.scalar_one_or_none()
 
+    def get_page_tree_rows(self):
+        """Id, slug, padre y estado de todas las páginas no borradas"""
+        result = self.db.execute(
+            select(
+                Page.id,
+                Page.slug,
+                Page.parent_id,
+                (Page.status == PageStatus.PUBLISHED).label("is_published"),
+            )
+            .where(Page.deleted_at.is_(None))
+        )
+        return result.all()
+
+    def get_published_page_with_contents(
+        self,
+        slug: Optional[str] = None,
+        page_id: Optional[int] = None,
+        page_columns: Optional[Sequence[str]] = None,
+        content_columns: Optional[Sequence[str]] = None,
+        with_contents: bool = True
+    ) -> Optional[Page]:
+        """
+        Página publicada (por id, por slug o la homepage) con sus contenidos
+        visibles precargados: dos consultas en total
+
+        Args:
+            page_columns / content_columns: Si se indican, solo se cargan esas
+                columnas (más las claves necesarias para ordenar y relacionar,
+                y updated_at para el Last-Modified)
+            with_contents: False para no cargar los contenidos
+        """
+        stmt = select(Page).where(self._published_page_filter(slug, page_id))
+
+        if page_columns is not None:
+            stmt = stmt.options(
+                load_only(Page.id, Page.updated_at, *(getattr(Page, name) for name in page_columns))
+            )
+
+        if with_contents:
+            contents_loader = selectinload(
+                Page.contents.and_(
+                    Content.deleted_at.is_(None),
+                    Content.is_visible == True
+                )
+            )
+            if content_columns is not None:
+                contents_loader = contents_loader.load_only(
+                    Content.page_id,
+                    Content.sort_order,
+                    Content.is_visible,
+                    Content.updated_at,
+                    *(getattr(Content, name) for name in content_columns)
+                )
+            stmt = stmt.options(contents_loader)
+
+        result = self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    def get_page_contents_as_of(self, page_id: int, as_of: datetime) -> List[Content]:
+        """
+        Contenidos visibles de la página que existían en `as_of`: creados
+        antes y no borrados todavía (o borrados después)
+        """
+        stmt = (
+            select(Content)
+            .where(
+                Content.page_id == page_id,
+                Content.is_visible == True,
+                or_(Content.created_at.is_(None), Content.created_at <= as_of),
+                or_(Content.deleted_at.is_(None), Content.deleted_at > as_of)
+            )
+            .order_by(Content.sort_order)
+        )
+        return list(self.db.scalars(stmt))
+
+    def get_section_validator_row(self, section_id: int):
+        """Fechas de última modificación de una sección y sus contenidos"""
+        links_updated_at = (
+            select(func.max(SectionContent.updated_at))
+            .where(SectionContent.section_id == Section.id)
+            .scalar_subquery()
+        )
+        links_count = (
+            select(func.count(SectionContent.id))
+            .where(SectionContent.section_id == Section.id)
+            .scalar_subquery()
+        )
+        contents_updated_at = (
+            select(func.max(Content.updated_at))
+            .join(SectionContent, SectionContent.content_id == Content.id)
+            .where(SectionContent.section_id == Section.id)
+            .scalar_subquery()
+        )
+
+        result = self.db.execute(
+            select(
+                Section.id,
+                Section.updated_at,
+                links_updated_at.label("links_updated_at"),
+                links_count.label("links_count"),
+                contents_updated_at.label("contents_updated_at"),
+            )
+            .where(
+                and_(
+                    Section.id == section_id,
+                    Section.deleted_at.is_(None)
+                )
+            )
+        )
+        return result.one_or_none()
+
     def get_media_by_id(self, media_id: int) -> Optional[Media]:
         result = self.db.execute(
             select(Media)
@@ -57,6 +190,34 @@ class CMSRepository:
         )
         return result.scalar_one_or_none()
 
+    def get_media_by_ids(self, media_ids: Iterable[int]) -> Dict[int, Media]:
+        """
+        Resuelve varios medios en una sola consulta; los ya cacheados no
+        vuelven a la BD. Las instancias son de solo lectura (desacopladas).
+        """
+        ids = {media_id for media_id in media_ids if media_id is not None}
+        found = media_cache.get_many(ids)
+
+        missing = ids - found.keys()
+        if missing:
+            result = self.db.execute(
+                select(Media)
+                .where(
+                    and_(
+                        Media.id.in_(missing),
+                        Media.deleted_at.is_(None)
+                    )
+                )
+            )
+            fill = can_fill_caches(self.db)
+            for media in result.scalars().all():
+                self.db.expunge(media)
+                if fill:
+                    media_cache.set(media.id, media)
+                found[media.id] = media
+
+        return found
+
     def get_section_with_contents(self, section_id: int) -> Optional[Section]:
         result = self.db.execute(
             select(Section)
@@ -73,8 +234,14 @@ class CMSRepository:
         )
         return result.scalar_one_or_none()
 
-    def get_content_by_id(self, content_id: int) -> Optional[Content]:
-        result = self.db.execute(
+    def get_content_by_id(self, content_id: int, for_update: bool = False) -> Optional[Content]:
+        """
+        Args:
+            for_update: Bloquea la fila (SELECT ... FOR UPDATE) hasta el fin
+                de la transacción, para leer-modificar-escribir sin perder
+                ediciones concurrentes
+        """
+        stmt = (
             select(Content)
             .where(
                 and_(
@@ -83,8 +250,27 @@ class CMSRepository:
                 )
             )
         )
+        if for_update:
+            stmt = self._for_update(stmt)
+        result = self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    def get_contents_by_ids(self, content_ids: Iterable[int], for_update: bool = False) -> List[Content]:
+        """Ver get_content_by_id. Con for_update se bloquean en orden de id (sin interbloqueos)"""
+        stmt = (
+            select(Content)
+            .where(
+                and_(
+                    Content.id.in_(set(content_ids)),
+                    Content.deleted_at.is_(None)
+                )
+            )
+        )
+        if for_update:
+            stmt = self._for_update(stmt).order_by(Content.id)
+        result = self.db.execute(stmt)
+        return list(result.scalars().all())
+
     def update_content(self, content_id: int, update_data: dict) -> Optional[Content]:
         content = self.get_content_by_id(content_id)
         if content:
@@ -94,4 +280,28 @@ class CMSRepository:
             content.updated_at = datetime.utcnow()
             self.db.flush()
             self.db.refresh(content)
-        return content
\ No newline at end of file
+        return content
+
+    @staticmethod
+    def _for_update(stmt):
+        # populate_existing: si la fila ya estaba en la sesión, se usa la
+        # versión leída con el bloqueo y no la anterior
+        return stmt.with_for_update().execution_options(populate_existing=True)
+
+    def _published_page_filter(self, slug: Optional[str] = None, page_id: Optional[int] = None):
+        """
+        Página publicada por id, por slug o la homepage. Por slug solo las
+        de primer nivel: una subpágina se pide por su ruta (ver PagePathResolver)
+        """
+        criteria = [
+            Page.status == PageStatus.PUBLISHED,
+            Page.deleted_at.is_(None)
+        ]
+        if page_id is not None:
+            criteria.append(Page.id == page_id)
+        elif slug is not None:
+            criteria.append(Page.slug == slug)
+            criteria.append(Page.parent_id.is_(None))
+        else:
+            criteria.append(Page.is_homepage == True)
+        return and_(*criteria)
@@ -1,9 +1,18 @@
 # app/repositories/user_repository.py
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
-from typing import Optional
-from datetime import datetime
-from ..models.user import User, Session as UserSession
+from sqlalchemy import delete, select, and_
+from typing import List, Optional
+from datetime import datetime, timedelta
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.hashing import hash_token
+from ..models.user import User, Session as UserSession, TokenRevocation
+
+# Sesión (clave: hash del token) y usuario resueltos en cada petición
+# autenticada, como instancias desacopladas (solo lectura). La invalidación
+# está en services/auth_cache.py
+session_cache = TTLCache(ttl=settings.AUTH_CACHE_TTL, max_entries=settings.AUTH_CACHE_MAX_ENTRIES)
+user_cache = TTLCache(ttl=settings.AUTH_CACHE_TTL, max_entries=settings.AUTH_CACHE_MAX_ENTRIES)
 
 
 class UserRepository:
@@ -38,6 +47,23 @@ class UserRepository:
         )
         return result.scalar_one_or_none()
     
+    def get_cached_by_id(self, user_id: int) -> Optional[User]:
+        """
+        Como get_by_id, cacheado con TTL
+
+        La instancia devuelta está desacoplada de la sesión: es de solo
+        lectura. Para modificarla hay que usar get_by_id.
+        """
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+
+        user = self.get_by_id(user_id)
+        if user is not None:
+            self.db.expunge(user)
+            user_cache.set(user_id, user)
+        return user
+    
     def create(self, user_data: dict) -> User:
         """Crea un nuevo usuario"""
         print("Creating user with data-REPOSITORY:", user_data)
@@ -63,9 +89,13 @@ class UserRepository:
         """Actualiza un usuario"""
         user = self.get_by_id(user_id)
         if user:
+            claims = (user.role, user.is_active)
             for key, value in update_data.items():
                 if hasattr(user, key) and value is not None:
                     setattr(user, key, value)
+            if (user.role, user.is_active) != claims:
+                # Los tokens emitidos llevan el rol y el estado anteriores
+                self.revoke_user_tokens(user_id)
             self.db.flush()
             self.db.refresh(user)
         return user
@@ -76,6 +106,7 @@ class UserRepository:
         if user:
             user.deleted_at = datetime.utcnow()
             user.is_active = False
+            self.revoke_user_tokens(user_id)
             self.db.flush()
             return True
         return False
@@ -83,7 +114,9 @@ class UserRepository:
     # ==================== SESSIONS ====================
     
     def create_session(self, session_data: dict) -> UserSession:
-        """Crea una nueva sesión"""
+        """Crea una nueva sesión; del token (`token`) solo se guarda su hash"""
+        session_data = dict(session_data)
+        session_data["token_hash"] = hash_token(session_data.pop("token"))
         session = UserSession(**session_data)
         self.db.add(session)
         self.db.flush()
@@ -94,10 +127,23 @@ class UserRepository:
         """Obtiene sesión por token"""
         result = self.db.execute(
             select(UserSession)
-            .where(UserSession.token == token)
+            .where(UserSession.token_hash == hash_token(token))
         )
         return result.scalar_one_or_none()
     
+    def get_cached_session_by_token(self, token: str) -> Optional[UserSession]:
+        """Como get_session_by_token, cacheado con TTL (instancia de solo lectura)"""
+        token_hash = hash_token(token)
+        session = session_cache.get(token_hash)
+        if session is not None:
+            return session
+
+        session = self.get_session_by_token(token)
+        if session is not None:
+            self.db.expunge(session)
+            session_cache.set(token_hash, session)
+        return session
+    
     def delete_session(self, token: str) -> bool:
         """Elimina una sesión"""
         session = self.get_session_by_token(token)
@@ -106,3 +152,72 @@ class UserRepository:
             self.db.flush()
             return True
         return False
+
+    def delete_expired_sessions(self, now: datetime, limit: int) -> int:
+        """
+        Borra hasta `limit` sesiones expiradas (recorre el índice de
+        expires_at). Sin pasar por la sesión ORM: una sesión expirada que
+        siga en cache se rechaza igual por su expires_at.
+        """
+        ids = list(self.db.scalars(
+            select(UserSession.id)
+            .where(UserSession.expires_at < now)
+            .order_by(UserSession.expires_at)
+            .limit(limit)
+        ))
+        if not ids:
+            return 0
+        self.db.execute(delete(UserSession).where(UserSession.id.in_(ids)))
+        return len(ids)
+
+    def delete_oldest_sessions(self, user_id: int, keep: int) -> int:
+        """Deja al usuario solo sus `keep` sesiones más recientes"""
+        result = self.db.execute(
+            select(UserSession)
+            .where(UserSession.user_id == user_id)
+            .order_by(UserSession.id.desc())
+            .offset(keep)
+        )
+        # Una a una por la sesión ORM: así se invalidan en la cache de sesiones
+        sessions = list(result.scalars())
+        for session in sessions:
+            self.db.delete(session)
+        if sessions:
+            self.db.flush()
+        return len(sessions)
+    
+    # ==================== REVOCACIONES ====================
+
+    def create_revocation(self, revocation_data: dict) -> TokenRevocation:
+        """Registra la revocación de un token (jti) o de todos los de un usuario"""
+        revocation = TokenRevocation(**revocation_data)
+        self.db.add(revocation)
+        self.db.flush()
+        return revocation
+
+    def revoke_user_tokens(self, user_id: int) -> TokenRevocation:
+        """
+        Revoca todos los tokens emitidos hasta ahora para el usuario en modo
+        sin estado (AUTH_STATELESS). Sus sesiones se conservan: con estado,
+        cada petición recarga el usuario (rol, is_active, deleted_at)
+        """
+        now = datetime.utcnow()
+        return self.create_revocation({
+            "user_id": user_id,
+            "created_at": now,
+            "expires_at": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        })
+
+    def get_revocations(self, after_id: int, now: datetime) -> List[TokenRevocation]:
+        """Revocaciones aún vigentes con id mayor que `after_id`, por id"""
+        result = self.db.execute(
+            select(TokenRevocation)
+            .where(
+                and_(
+                    TokenRevocation.id > after_id,
+                    TokenRevocation.expires_at > now
+                )
+            )
+            .order_by(TokenRevocation.id)
+        )
+        return list(result.scalars())
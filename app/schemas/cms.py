@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 
@@ -61,10 +61,48 @@ class ContentResponse(ContentBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class JsonPatchOperation(BaseModel):
+    """Operación RFC 6902"""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(None, alias="from")
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class ContentUpdate(BaseModel):
-    data: Dict[str, Any]
+    """
+    Exactamente uno de:
+    - data: el documento completo
+    - patch: operaciones JSON Patch (RFC 6902)
+    - merge_patch: JSON Merge Patch (RFC 7396)
+    """
+    data: Optional[Dict[str, Any]] = None
+    patch: Optional[List[JsonPatchOperation]] = None
+    merge_patch: Optional[Dict[str, Any]] = None
     status: Optional[str] = None
 
+    @model_validator(mode="after")
+    def _one_change(self):
+        given = [name for name in ("data", "patch", "merge_patch") if getattr(self, name) is not None]
+        if len(given) != 1:
+            raise ValueError("Send exactly one of: data, patch, merge_patch")
+        return self
+
+    def patch_operations(self) -> List[dict]:
+        # exclude_unset: "value": null explícito no es lo mismo que sin value
+        return [op.model_dump(by_alias=True, exclude_unset=True) for op in self.patch]
+
+
+class ContentBulkUpdateItem(ContentUpdate):
+    id: int
+    # Validado aquí: un estado inválido es un 422, no un contenido inexistente
+    status: Optional[Literal["draft", "published"]] = None
+
+
+class ContentBulkUpdate(BaseModel):
+    items: List[ContentBulkUpdateItem] = Field(..., min_length=1)
+
 
 class PageWithContents(PageResponse):
     contents: List[ContentResponse] = []
@@ -96,9 +134,22 @@ class SectionResponse(SectionBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# ==================== MEDIA SCHEMAS ====================
+class MediaResponse(BaseModel):
+    id: int
+    url: str
+    mime_type: str
+    alt_text: Optional[str] = None
+    caption: Optional[str] = None
+    meta: Optional[Dict[str, Any]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # ==================== LANDING PAGE SCHEMAS ====================
 class LandingDataResponse(BaseModel):
     page: PageWithContents
     site: Optional[SiteResponse] = None
+    media: Dict[int, MediaResponse] = {}
     meta: Optional[Dict[str, Any]] = None
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,36 @@
+# app/scripts/archive_audit_logs.py
+"""
+Archiva el historial de auditoría antiguo en segmentos comprimidos
+
+Uso:
+    python -m app.scripts.archive_audit_logs [--older-than-days 180]
+"""
+import argparse
+from ..core.config import settings
+from ..db.database import SessionLocal
+from ..services.audit_archiver import archive_audit_logs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--older-than-days", type=int, default=settings.CMS_AUDIT_ARCHIVE_AFTER_DAYS,
+        help="Antigüedad mínima de lo que se archiva"
+    )
+    parser.add_argument("--batch-size", type=int, default=100, help="Contenidos por segmento")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = archive_audit_logs(db, older_than_days=args.older_than_days, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(
+        f"Contenidos: {stats['contents']} · registros archivados: {stats['archived']} · "
+        f"segmentos: {stats['segments']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
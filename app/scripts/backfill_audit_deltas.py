@@ -0,0 +1,48 @@
+# app/scripts/backfill_audit_deltas.py
+"""
+Recodifica cms_auditory_logs como diffs con un snapshot cada N versiones
+
+Antes aplica migrate_audit_logs si falta la columna change_type (también
+con --dry-run: sin ella el historial no se puede leer).
+
+Uso:
+    python -m app.scripts.backfill_audit_deltas [--interval 20] [--dry-run]
+"""
+import argparse
+from ..core.config import settings
+from ..db.database import SessionLocal, engine
+from ..services.audit_history import backfill_audit_deltas
+from .migrate_audit_logs import migrate_audit_logs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--interval", type=int, default=settings.CMS_AUDIT_KEYFRAME_INTERVAL,
+        help="Versiones por snapshot completo"
+    )
+    parser.add_argument("--batch-size", type=int, default=100, help="Contenidos por lote")
+    parser.add_argument("--dry-run", action="store_true", help="No guarda cambios")
+    args = parser.parse_args()
+
+    migrate_audit_logs(engine)
+
+    db = SessionLocal()
+    try:
+        stats = backfill_audit_deltas(
+            db,
+            interval=args.interval,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run
+        )
+    finally:
+        db.close()
+
+    print(
+        f"Contenidos: {stats['contents']} · registros: {stats['logs']} · "
+        f"reescritos: {stats['rewritten']}{' (dry run)' if args.dry_run else ''}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# app/scripts/migrate_audit_logs.py
+"""
+Migra cms_auditory_logs al historial por diffs (columna change_type) y
+a la paginación por cursor del historial
+
+Pasos, cada uno idempotente (se puede relanzar si se corta):
+    1. Añade change_type NOT NULL con 'snapshot' por defecto: todo lo que
+       ya hay guardado es un documento completo
+    2. Índice (content_id, created_at, id) para el historial por contenido
+
+Se ejecuta con la aplicación parada, antes de arrancar la versión que lee
+change_type. backfill_audit_deltas lo lanza antes de recodificar.
+
+Uso:
+    python -m app.scripts.migrate_audit_logs
+"""
+import argparse
+from sqlalchemy import BigInteger, Column, DateTime, Index, MetaData, Table, inspect, text
+from sqlalchemy.schema import CreateIndex
+from ..db.database import engine as default_engine
+
+TABLE = "cms_auditory_logs"
+INDEX = "ix_cms_auditory_logs_content_created_id"
+
+# Solo las columnas del índice
+auditory_logs = Table(
+    TABLE, MetaData(),
+    Column("id", BigInteger, primary_key=True),
+    Column("content_id", BigInteger),
+    Column("created_at", DateTime),
+)
+
+
+def migrate_audit_logs(engine) -> dict:
+    stats = {"added_change_type": False, "created_index": False}
+
+    with engine.begin() as conn:
+        if "change_type" not in _columns(conn):
+            conn.execute(text(
+                f"ALTER TABLE {TABLE} ADD COLUMN change_type VARCHAR(20) NOT NULL DEFAULT 'snapshot'"
+            ))
+            stats["added_change_type"] = True
+
+    with engine.begin() as conn:
+        indexes = {index["name"] for index in inspect(conn).get_indexes(TABLE)}
+        if INDEX not in indexes:
+            c = auditory_logs.c
+            conn.execute(CreateIndex(Index(INDEX, c.content_id, c.created_at, c.id)))
+            stats["created_index"] = True
+
+    return stats
+
+
+def _columns(conn) -> set:
+    return {col["name"] for col in inspect(conn).get_columns(TABLE)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+
+    stats = migrate_audit_logs(default_engine)
+    print(
+        f"change_type añadida: {'sí' if stats['added_change_type'] else 'ya existía'} · "
+        f"índice {INDEX}: {'creado' if stats['created_index'] else 'ya existía'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# app/scripts/migrate_session_tokens.py
+"""
+Migra sys_sessions de token en claro (String(500)) a token_hash (SHA-256)
+
+Pasos, cada uno idempotente (se puede relanzar si se corta):
+    1. Añade token_hash (nullable)
+    2. Lo rellena por lotes con el hash de token
+    3. Borra sesiones duplicadas (el índice de token no era único)
+    4. Índice único en token_hash; elimina token y su índice; NOT NULL
+    5. Índice en expires_at, para el barrido de sesiones caducadas
+
+Se ejecuta con la aplicación parada, antes de arrancar la versión que usa
+token_hash: la versión anterior escribe en token.
+
+Uso:
+    python -m app.scripts.migrate_session_tokens [--batch-size 1000]
+"""
+import argparse
+from sqlalchemy import BigInteger, Column, DateTime, Index, MetaData, String, Table, bindparam, func, inspect, select, text
+from sqlalchemy.schema import CreateIndex, DropIndex
+from ..core.hashing import hash_token
+from ..db.database import engine as default_engine
+
+TABLE = "sys_sessions"
+INDEX = "ix_sys_sessions_token_hash"
+OLD_INDEX = "ix_sys_sessions_token"
+EXPIRES_INDEX = "ix_sys_sessions_expires_at"
+
+# Las dos versiones de la tabla a la vez: solo las columnas que usa la migración
+sessions = Table(
+    TABLE, MetaData(),
+    Column("id", BigInteger, primary_key=True),
+    Column("token", String(500)),
+    Column("token_hash", String(64)),
+    Column("expires_at", DateTime),
+)
+
+
+def migrate_session_tokens(engine, batch_size: int = 1000) -> dict:
+    stats = {"hashed": 0, "duplicates": 0}
+
+    with engine.begin() as conn:
+        columns = _columns(conn)
+        if "token_hash" not in columns:
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN token_hash VARCHAR(64) NULL"))
+
+    if "token" in columns:
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(
+                    select(sessions.c.id, sessions.c.token)
+                    .where(sessions.c.token_hash.is_(None))
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                # Un solo UPDATE por lote (executemany)
+                conn.execute(
+                    sessions.update()
+                    .where(sessions.c.id == bindparam("session_id"))
+                    .values(token_hash=bindparam("hashed")),
+                    [{"session_id": session_id, "hashed": hash_token(token)} for session_id, token in rows]
+                )
+                stats["hashed"] += len(rows)
+
+    with engine.begin() as conn:
+        # Mismo token en varias filas: se conserva la más reciente
+        duplicated = conn.execute(
+            select(sessions.c.token_hash, func.max(sessions.c.id))
+            .group_by(sessions.c.token_hash)
+            .having(func.count() > 1)
+        ).all()
+        for token_hash, keep_id in duplicated:
+            result = conn.execute(
+                sessions.delete()
+                .where(sessions.c.token_hash == token_hash, sessions.c.id != keep_id)
+            )
+            stats["duplicates"] += result.rowcount
+
+    with engine.begin() as conn:
+        indexes = {index["name"] for index in inspect(conn).get_indexes(TABLE)}
+        if INDEX not in indexes:
+            conn.execute(CreateIndex(Index(INDEX, sessions.c.token_hash, unique=True)))
+        if OLD_INDEX in indexes:
+            conn.execute(DropIndex(Index(OLD_INDEX, sessions.c.token)))
+        if "token" in _columns(conn):
+            conn.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN token"))
+        # SQLite no permite cambiar la nulabilidad (solo se usa en local)
+        if conn.dialect.name == "mysql":
+            conn.execute(text(f"ALTER TABLE {TABLE} MODIFY token_hash VARCHAR(64) NOT NULL"))
+
+    with engine.begin() as conn:
+        if EXPIRES_INDEX not in {index["name"] for index in inspect(conn).get_indexes(TABLE)}:
+            conn.execute(CreateIndex(Index(EXPIRES_INDEX, sessions.c.expires_at)))
+
+    return stats
+
+
+def _columns(conn) -> set:
+    return {col["name"] for col in inspect(conn).get_columns(TABLE)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000, help="Sesiones por transacción")
+    args = parser.parse_args()
+
+    stats = migrate_session_tokens(default_engine, batch_size=args.batch_size)
+    print(f"Sesiones migradas: {stats['hashed']} · duplicadas eliminadas: {stats['duplicates']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# app/scripts/migrate_token_revocations.py
+"""
+Crea sys_token_revocations (revocaciones del modo AUTH_STATELESS)
+
+Pasos, cada uno idempotente (se puede relanzar si se corta):
+    1. Crea la tabla con sus índices (jti, user_id, expires_at) si no existe
+
+Se ejecuta antes de arrancar la versión que registra revocaciones: logout,
+UserRepository.update y soft_delete escriben en ella en cualquier modo.
+
+Uso:
+    python -m app.scripts.migrate_token_revocations
+"""
+import argparse
+from sqlalchemy import inspect
+from ..db.database import engine as default_engine
+from ..models.user import TokenRevocation
+
+TABLE = TokenRevocation.__tablename__
+
+
+def migrate_token_revocations(engine) -> dict:
+    stats = {"created_table": False}
+
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(TABLE):
+            TokenRevocation.__table__.create(conn)
+            stats["created_table"] = True
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+
+    stats = migrate_token_revocations(default_engine)
+    print(f"{TABLE}: {'creada' if stats['created_table'] else 'ya existía'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# app/services/async_services.py
+from datetime import datetime
+from typing import Any, Callable, Optional, Union
+from anyio import to_thread
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..core.hashing import password_hasher
+from ..core.snapshot_store import Snapshot
+from ..models.user import User
+from ..schemas.user import TokenResponse, UserCreate, UserLogin
+from .auth_service import AuthService
+from .cms_cache import landing_async_flights, landing_cache, section_cache
+from .cms_service import CMSService
+from .fieldsets import LandingFieldSet
+
+
+class AsyncService:
+    """
+    Variante async de un servicio síncrono
+
+    Con una AsyncSession, el servicio síncrono (y sus repositorios, con
+    las mismas consultas) corre con AsyncSession.run_sync: la E/S de la BD
+    pasa por el driver async sin ocupar un hilo. Con una Session síncrona
+    (sin DATABASE_ASYNC) corre en el threadpool, como una ruta `def`.
+
+    Lo que se resuelve en memoria (caches) se atiende directamente en el
+    event loop, sin salto a otro hilo.
+    """
+
+    service_class: type = None
+
+    def __init__(self, db: Union[AsyncSession, Session]):
+        self.db = db
+
+    async def call(self, fn: Callable[[Any], Any]) -> Any:
+        """Ejecuta fn(servicio síncrono) sobre la sesión"""
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(lambda session: fn(self.service_class(session)))
+        return await to_thread.run_sync(lambda: fn(self.service_class(self.db)))
+
+
+class AsyncCMSService(AsyncService):
+
+    service_class = CMSService
+
+    async def get_landing_snapshot(
+        self,
+        slug: str = None,
+        site_key: str = "main",
+        fieldset: Optional[LandingFieldSet] = None
+    ) -> Snapshot:
+        """
+        Ver CMSService.get_landing_snapshot. La reconstrucción se agrupa
+        con AsyncSingleFlight: el SingleFlight de hilos bloquearía el loop.
+        """
+        cache_key = self._landing_cache_key(slug, site_key, fieldset)
+        cached = landing_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        slug = CMSService._normalize_slug(slug)
+        return await landing_async_flights.do(
+            (cache_key, landing_cache.version),
+            lambda: self.call(lambda service: service._load_landing_snapshot(slug, site_key, fieldset)),
+            fallback=landing_cache.get_stale(cache_key)
+        )
+
+    async def serialize_landing(
+        self,
+        slug: str = None,
+        site_key: str = "main",
+        fieldset: Optional[LandingFieldSet] = None,
+        as_of: Optional[datetime] = None
+    ) -> bytes:
+        return await self.call(lambda service: service.serialize_landing(slug, site_key, fieldset, as_of))
+
+    async def get_section_snapshot(self, section_id: int) -> Snapshot:
+        cached = section_cache.get(("section", section_id))
+        if cached is not None:
+            return cached
+        return await self.call(lambda service: service.get_section_snapshot(section_id))
+
+    async def get_content_history(self, content_id: int, limit: int = 50, cursor: Optional[str] = None) -> dict:
+        return await self.call(lambda service: service.get_content_history(content_id, limit, cursor))
+
+    def _landing_cache_key(self, slug: Optional[str], site_key: str, fieldset: Optional[LandingFieldSet]) -> tuple:
+        return CMSService._landing_cache_key(CMSService._normalize_slug(slug), site_key, fieldset)
+
+
+class AsyncAuthService(AsyncService):
+
+    service_class = AuthService
+
+    async def register(self, user_data: UserCreate) -> TokenResponse:
+        """Ver AuthService.register; el hash se espera sin ocupar un hilo"""
+        await self.call(lambda service: service._check_email_available(user_data.email))
+        hashed_password = await password_hasher.hash_async(user_data.password)
+        return await self.call(lambda service: service._create_user(user_data, hashed_password))
+
+    async def login(self, credentials: UserLogin) -> TokenResponse:
+        """Ver AuthService.login"""
+        user = await self.call(lambda service: service._get_login_user(credentials.email))
+        valid, new_hash = await password_hasher.verify_and_update_async(credentials.password, user.password)
+        return await self.call(lambda service: service._complete_login(user, valid, new_hash))
+
+    async def get_current_user(self, token: str) -> Optional[User]:
+        return await self.call(lambda service: service.get_current_user(token))
+
+    async def load_user(self, user: User) -> Optional[User]:
+        return await self.call(lambda service: service.load_user(user))
@@ -0,0 +1,69 @@
+# app/services/audit_archiver.py
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.cms import Auditory
+from ..repositories.auditory_repository import AuditoryRepository, audit_archive
+
+
+def archive_audit_logs(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: int = 100
+) -> Dict[str, int]:
+    """
+    Mueve a segmentos comprimidos el historial anterior a `older_than_days`
+
+    Por contenido se archiva todo lo anterior al último snapshot más viejo
+    que el corte; ese snapshot queda en la tabla como inicio de la cadena.
+    Cada lote de contenidos es un segmento: primero se escribe el segmento
+    y después se borran las filas. Si algo falla entre medias, el registro
+    queda en los dos sitios y las lecturas se quedan con el de la tabla.
+
+    Returns:
+        Conteo de contenidos, registros archivados y segmentos escritos
+    """
+    days = older_than_days if older_than_days is not None else settings.CMS_AUDIT_ARCHIVE_AFTER_DAYS
+    # Las fechas de la BD son UTC naive
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    repository = AuditoryRepository(db)
+    stats = {"contents": 0, "archived": 0, "segments": 0}
+    last_content_id = 0
+
+    while True:
+        boundaries = repository.get_archivable(cutoff, after_content_id=last_content_id, limit=batch_size)
+        if not boundaries:
+            break
+
+        records = {}
+        for content_id, keyframe_id in boundaries.items():
+            logs = repository.get_before(content_id, keyframe_id)
+            if logs:
+                records[content_id] = [_to_record(log) for log in logs]
+
+        if records:
+            audit_archive.write_segment(records)
+            for content_id in records:
+                stats["archived"] += repository.delete_before(content_id, boundaries[content_id])
+            db.commit()
+            stats["contents"] += len(records)
+            stats["segments"] += 1
+        db.expunge_all()
+        last_content_id = max(boundaries)
+
+    return stats
+
+
+def _to_record(log: Auditory) -> dict:
+    return {
+        "id": log.id,
+        "content_id": log.content_id,
+        "title": log.title,
+        "author_id": log.author_id,
+        "data": log.data,
+        "change_type": log.change_type,
+        "is_visible": log.is_visible,
+        "created_at": log.created_at,
+        "updated_at": log.updated_at,
+    }
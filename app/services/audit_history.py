@@ -0,0 +1,138 @@
+# app/services/audit_history.py
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.json_patch import JsonPatchError, apply_json_patch, apply_merge_patch, make_json_patch
+from ..models.cms import Auditory, AuditChangeType
+from ..repositories.auditory_repository import AuditoryRepository
+
+
+def is_keyframe_due(depth: Optional[int], interval: Optional[int] = None) -> bool:
+    """
+    Indica si la siguiente versión debe guardarse completa
+
+    Args:
+        depth: registros desde el último snapshot (None: no hay ninguno)
+        interval: versiones por snapshot; 1 guarda siempre el documento entero
+    """
+    interval = interval or settings.CMS_AUDIT_KEYFRAME_INTERVAL
+    return depth is None or depth + 1 >= interval
+
+
+def encode_version(
+    previous: Any,
+    current: Any,
+    depth: Optional[int],
+    interval: Optional[int] = None
+) -> Tuple[AuditChangeType, Any]:
+    """
+    Registro de auditoría de una versión: snapshot completo cada `interval`
+    versiones y, entre medias, el diff estructural contra la anterior
+    """
+    if previous is None or is_keyframe_due(depth, interval):
+        return AuditChangeType.SNAPSHOT, current
+    return AuditChangeType.JSON_PATCH, make_json_patch(previous, current)
+
+
+def replay_history(logs: List[Auditory]) -> Dict[int, Any]:
+    """
+    Documento completo de cada versión, aplicando los patches en orden
+    sobre el último snapshot. `logs` debe venir ordenado por id.
+    Las versiones que no se pueden reconstruir no aparecen.
+    """
+    versions, current = {}, None
+    for log in logs:
+        try:
+            if log.change_type == AuditChangeType.JSON_PATCH:
+                current = None if current is None else apply_json_patch(current, log.data)
+            elif log.change_type == AuditChangeType.MERGE_PATCH:
+                current = None if current is None else apply_merge_patch(current, log.data)
+            else:
+                current = log.data
+        except JsonPatchError:
+            current = None
+        if current is not None:
+            versions[log.id] = current
+    return versions
+
+
+def reconstruct_version(logs: List[Auditory]) -> Optional[Any]:
+    """
+    Documento de la última versión de `logs` (ordenado por id, desde un
+    snapshot). Copia el snapshot una sola vez y aplica los patches sobre
+    esa copia, así el coste crece con el tamaño de los patches y no con
+    documento × profundidad.
+
+    Returns:
+        None si la versión no se puede reconstruir
+    """
+    current = None
+    for log in logs:
+        try:
+            if log.change_type == AuditChangeType.JSON_PATCH:
+                if current is not None:
+                    current = apply_json_patch(current, log.data, in_place=True)
+            elif log.change_type == AuditChangeType.MERGE_PATCH:
+                if current is not None:
+                    current = apply_merge_patch(current, log.data, in_place=True)
+            else:
+                current = copy.deepcopy(log.data)
+        except JsonPatchError:
+            current = None
+    return current
+
+
+def backfill_audit_deltas(
+    db: Session,
+    interval: Optional[int] = None,
+    batch_size: int = 100,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Recodifica el historial existente: snapshot cada `interval` versiones y
+    diffs entre medias. Es idempotente y hace un commit por contenido.
+
+    Las versiones que no se pueden reconstruir se dejan como están y
+    la siguiente versión legible pasa a ser snapshot.
+
+    Returns:
+        Conteo de contenidos, registros revisados y registros reescritos
+    """
+    repository = AuditoryRepository(db)
+    stats = {"contents": 0, "logs": 0, "rewritten": 0}
+    last_content_id = 0
+
+    while True:
+        content_ids = repository.get_content_ids_with_logs(after_id=last_content_id, limit=batch_size)
+        if not content_ids:
+            break
+
+        for content_id in content_ids:
+            logs = repository.get_all_by_content_id(content_id)
+            versions = replay_history(logs)
+            previous, depth = None, None
+            for log in logs:
+                stats["logs"] += 1
+                current = versions.get(log.id)
+                if current is None:
+                    previous, depth = None, None
+                    continue
+
+                change_type, data = encode_version(previous, current, depth, interval)
+                if change_type != log.change_type or data != log.data:
+                    log.change_type, log.data = change_type, data
+                    stats["rewritten"] += 1
+                depth = 0 if change_type == AuditChangeType.SNAPSHOT else depth + 1
+                previous = current
+
+            stats["contents"] += 1
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            db.expunge_all()
+
+        last_content_id = content_ids[-1]
+
+    return stats
@@ -0,0 +1,447 @@
+# app/services/audit_writer.py
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.cms import AuditChangeType, Content
+from ..repositories.auditory_repository import AuditoryRepository
+
+logger = logging.getLogger(__name__)
+
+# session.info: {writer: registros} pendientes del próximo commit
+_STAGED = "audit_staged"
+# session.info: {writer: (tx_id, registros)} ya escritos en el spool
+_PREPARED = "audit_prepared"
+
+
+class AuditWriteBehind:
+    """
+    Auditoría write-behind: las peticiones dejan los registros en la sesión
+    (stage) y un hilo los inserta por lotes en cms_auditory_logs
+
+    Spool local por proceso (JSON Lines, solo append), en dos fases:
+        - antes del commit de la edición: {"tx", "entries"} con fsync
+        - tras el commit: {"commit": tx}, y el registro pasa a la cola
+        - si la transacción falla: {"abort": tx}
+        - tras insertarlo en la BD: {"done": [tx, ...]}
+    Cuando no queda nada pendiente el spool vuelve a empezar.
+
+    Si el proceso muere, otro (o el siguiente arranque) recupera su spool
+    e inserta las transacciones confirmadas que no llegaron a la BD. Una
+    sin commit ni abort (caída entre el fsync y el commit) se inserta solo
+    si el contenido tiene ese data, es decir, si el commit llegó a la BD.
+    La recuperación corre en el hilo y se reintenta hasta completarse.
+
+    La entrega es al menos una vez: una caída justo después del commit de un
+    lote puede repetir ese lote. created_at es el momento del insert, así
+    que va detrás de la edición como mucho el flush_interval (más lo que
+    tarde el lote).
+    """
+
+    def __init__(
+        self,
+        spool_dir: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        recovery_interval: float = 30.0,
+        session_factory: Optional[Callable] = None
+    ):
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.recovery_interval = recovery_interval
+        self._session_factory = session_factory
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._spool = None
+        self._spool_path: Optional[Path] = None
+        # Transacciones escritas en el spool y aún sin abort ni insert
+        self._unresolved = 0
+        # Hora de encolado de cada registro pendiente, en orden
+        self._pending_since: deque = deque()
+        self._recovery_pending = False
+        self._flushed_total = 0
+        self._recovered_total = 0
+        self._failed_flushes = 0
+        self._last_flush_at: Optional[float] = None
+        self._last_flush_lag: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    # ==================== Ciclo de vida ====================
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if self._session_factory is None:
+            from ..db.database import SessionLocal
+            self._session_factory = SessionLocal
+
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        self._spool_path = self.spool_dir / f"spool-{pid}.jsonl"
+        # Spool de un proceso anterior con el mismo pid: se aparta para
+        # recuperarlo desde el hilo, sin mezclarlo con el nuevo
+        try:
+            os.replace(self._spool_path, self._claimed_path(self._spool_path.stem))
+        except FileNotFoundError:
+            pass
+
+        self._spool = open(self._spool_path, "ab")
+        self._unresolved = 0
+        self._recovery_pending = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Detiene el hilo tras vaciar la cola; lo que no llegue a insertarse queda en el spool"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        with self._lock:
+            self._spool.close()
+            self._spool = None
+
+    # ==================== Escritura ====================
+
+    def stage(self, db: Session, entries: List[dict]) -> None:
+        """
+        Registros que se auditan con el próximo commit de `db`: se escriben
+        en el spool antes del commit y se encolan cuando se confirma
+
+        Args:
+            entries: mismo formato que AuditoryRepository.create_logs
+        """
+        if entries:
+            db.info.setdefault(_STAGED, {}).setdefault(self, []).extend(entries)
+
+    def _prepare(self, entries: List[dict]) -> str:
+        tx_id = uuid.uuid4().hex
+        line = self._encode({"tx": tx_id, "entries": [self._encode_entry(entry) for entry in entries]})
+        with self._lock:
+            self._spool.write(line)
+            self._spool.flush()
+            os.fsync(self._spool.fileno())
+            self._unresolved += 1
+        return tx_id
+
+    def _commit(self, tx_id: str, entries: List[dict]) -> None:
+        # Sin fsync: si se pierde, la recuperación comprueba el commit en la BD
+        now = time.monotonic()
+        with self._lock:
+            if self._spool is None:
+                # Detenido entre el spool y el commit: queda para la recuperación
+                return
+            self._spool.write(self._encode({"commit": tx_id}))
+            self._spool.flush()
+            for _ in entries:
+                self._pending_since.append(now)
+            self._queue.put((tx_id, entries))
+
+    def _abort(self, tx_id: str) -> None:
+        with self._lock:
+            if self._spool is None:
+                return
+            self._spool.write(self._encode({"abort": tx_id}))
+            self._spool.flush()
+            self._unresolved -= 1
+            self._truncate_if_idle()
+
+    def _run(self) -> None:
+        # Un lote se cierra al llegar a batch_size o flush_interval después
+        # de su primer registro; al detenerse se vacía lo que quede
+        batch, tx_ids, deadline = [], [], 0.0
+        next_recovery = 0.0
+        while True:
+            if self._recovery_pending and time.monotonic() >= next_recovery:
+                self._recovery_pending = not self._recover()
+                next_recovery = time.monotonic() + self.recovery_interval
+
+            stopping = self._stop.is_set()
+            if stopping:
+                timeout = 0
+            elif batch:
+                timeout = max(0.0, deadline - time.monotonic())
+            else:
+                timeout = self.flush_interval
+            try:
+                tx_id, entries = self._queue.get(timeout=timeout)
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.extend(entries)
+                tx_ids.append(tx_id)
+                if len(batch) < self.batch_size:
+                    continue
+            except Empty:
+                if not batch:
+                    if stopping:
+                        return
+                    continue
+
+            try:
+                flushed = self._flush(batch, tx_ids)
+            except Exception:
+                # Fallo del spool (disco): el lote se reintenta, el hilo sigue
+                logger.exception("Error en el spool de auditoría")
+                flushed = False
+            if flushed:
+                batch, tx_ids = [], []
+            elif stopping:
+                return
+            else:
+                # La BD no responde: se reintenta el mismo lote
+                time.sleep(self.flush_interval)
+                deadline = time.monotonic()
+
+    def _flush(self, batch: List[dict], tx_ids: List[str]) -> bool:
+        if not self._insert(batch):
+            self._failed_flushes += 1
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            self._last_flush_lag = now - self._pending_since[0]
+            for _ in batch:
+                self._pending_since.popleft()
+            self._flushed_total += len(batch)
+            self._last_flush_at = time.time()
+            self._spool.write(self._encode({"done": tx_ids}))
+            self._spool.flush()
+            self._unresolved -= len(tx_ids)
+            self._truncate_if_idle()
+        return True
+
+    def _insert(self, entries: List[dict]) -> bool:
+        db = self._session_factory()
+        try:
+            AuditoryRepository(db).create_logs(entries)
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            logger.exception("Error insertando %d registros de auditoría", len(entries))
+            return False
+        finally:
+            db.close()
+
+    def _truncate_if_idle(self) -> None:
+        # Todo insertado o descartado: el spool vuelve a empezar
+        if self._unresolved == 0:
+            self._spool.truncate(0)
+            self._spool.seek(0)
+
+    # ==================== Spool ====================
+
+    def _encode(self, record: dict) -> bytes:
+        return json.dumps(record, separators=(",", ":"), default=str).encode() + b"\n"
+
+    def _encode_entry(self, entry: dict) -> dict:
+        entry = dict(entry)
+        entry["change_type"] = entry.get("change_type", AuditChangeType.SNAPSHOT).value
+        return entry
+
+    def _decode_entry(self, entry: dict) -> dict:
+        entry["change_type"] = AuditChangeType(entry["change_type"])
+        return entry
+
+    def _claimed_path(self, stem: str) -> Path:
+        return self.spool_dir / f"{stem}.recovering-{os.getpid()}"
+
+    def _recover(self) -> bool:
+        """
+        Inserta lo que quedó en spools de procesos que ya no existen,
+        incluidos los que otro proceso empezó a recuperar y no terminó
+
+        Returns:
+            False si algún spool no se pudo recuperar (se reintenta después)
+        """
+        recovered = True
+        candidates = sorted(self.spool_dir.glob("spool-*.jsonl")) + sorted(self.spool_dir.glob("spool-*.recovering-*"))
+        for spool_path in candidates:
+            try:
+                claimed = self._claim(spool_path)
+                if claimed is not None:
+                    self._recover_spool(claimed)
+            except Exception:
+                recovered = False
+                logger.exception("Error recuperando el spool de auditoría %s", spool_path.name)
+        return recovered
+
+    def _claim(self, spool_path: Path) -> Optional[Path]:
+        """Spool renombrado a `<spool>.recovering-<pid>` o None si es de un proceso vivo"""
+        stem, _, claimer = spool_path.name.partition(".recovering-")
+        if claimer:
+            owner = int(claimer)
+        else:
+            stem = spool_path.stem
+            owner = int(stem.split("-", 1)[1])
+            if owner == os.getpid():
+                # El spool en uso de este proceso
+                return None
+        if owner == os.getpid():
+            return spool_path
+        if _pid_alive(owner):
+            return None
+
+        # rename atómico: si otro worker lo reclamó antes, se salta
+        claimed = self._claimed_path(stem)
+        try:
+            os.replace(spool_path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def _recover_spool(self, claimed: Path) -> None:
+        transactions: Dict[str, List[dict]] = {}
+        committed, finished = set(), set()
+        with open(claimed, "rb") as spool:
+            for line in spool:
+                # Una línea sin "\n" final es una escritura cortada por la caída
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                if "tx" in record:
+                    transactions[record["tx"]] = [self._decode_entry(entry) for entry in record["entries"]]
+                elif "commit" in record:
+                    committed.add(record["commit"])
+                elif "abort" in record:
+                    finished.add(record["abort"])
+                elif "done" in record:
+                    finished.update(record["done"])
+
+        pending = {tx_id: entries for tx_id, entries in transactions.items() if tx_id not in finished}
+        confirmed = committed | self._reached_db({
+            tx_id: entries for tx_id, entries in pending.items() if tx_id not in committed
+        })
+
+        batch, tx_ids = [], []
+        for tx_id, entries in pending.items():
+            if tx_id not in confirmed:
+                continue
+            batch.extend(entries)
+            tx_ids.append(tx_id)
+            if len(batch) >= self.batch_size:
+                self._recover_batch(claimed, batch, tx_ids)
+                batch, tx_ids = [], []
+        if batch:
+            self._recover_batch(claimed, batch, tx_ids)
+
+        claimed.unlink()
+
+    def _recover_batch(self, claimed: Path, batch: List[dict], tx_ids: List[str]) -> None:
+        if not self._insert(batch):
+            raise RuntimeError("La BD no acepta los registros recuperados")
+        # Lo ya insertado no se repite si la recuperación se corta
+        with open(claimed, "ab") as spool:
+            spool.write(self._encode({"done": tx_ids}))
+        self._recovered_total += len(batch)
+
+    def _reached_db(self, transactions: Dict[str, List[dict]]) -> set:
+        """
+        De las transacciones sin commit ni abort en el spool, las que sí se
+        confirmaron: el contenido tiene el data auditado (registros
+        snapshot, que son los únicos que se escriben con write-behind)
+        """
+        if not transactions:
+            return set()
+        content_ids = {entry["content_id"] for entries in transactions.values() for entry in entries}
+        db = self._session_factory()
+        try:
+            current = dict(db.query(Content.id, Content.data).filter(Content.id.in_(content_ids)).all())
+        finally:
+            db.close()
+        return {
+            tx_id for tx_id, entries in transactions.items()
+            if all(
+                entry["change_type"] == AuditChangeType.SNAPSHOT
+                and current.get(entry["content_id"]) == entry["data_snapshot"]
+                for entry in entries
+            )
+        }
+
+    # ==================== Métricas ====================
+
+    def metrics(self) -> dict:
+        with self._lock:
+            oldest = self._pending_since[0] if self._pending_since else None
+            spool_bytes = self._spool.tell() if self._spool else 0
+        return {
+            "enabled": self.enabled,
+            "queue_depth": len(self._pending_since),
+            "oldest_pending_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            "last_flush_lag_seconds": round(self._last_flush_lag, 3) if self._last_flush_lag is not None else None,
+            "last_flush_at": self._last_flush_at,
+            "flushed_total": self._flushed_total,
+            "recovered_total": self._recovered_total,
+            "recovery_pending": self._recovery_pending,
+            "failed_flushes": self._failed_flushes,
+            "spool_bytes": spool_bytes,
+        }
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # En Windows os.kill no sirve para comprobar; solo se recupera el propio spool
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Los registros preparados van al spool dentro del commit de la edición:
+# si el commit llega a la BD, su auditoría ya está en disco
+
+@event.listens_for(Session, "before_commit")
+def _prepare_audit(session):
+    staged = session.info.pop(_STAGED, None)
+    if staged:
+        prepared = session.info.setdefault(_PREPARED, {})
+        for writer, entries in staged.items():
+            if writer.enabled:
+                prepared[writer] = (writer._prepare(entries), entries)
+            else:
+                # Writer detenido (apagado): en la misma transacción
+                AuditoryRepository(session).create_logs(entries)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_audit(session):
+    for writer, (tx_id, entries) in session.info.pop(_PREPARED, {}).items():
+        writer._commit(tx_id, entries)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _abort_audit(session, transaction):
+    # Rollback o close sin commit (after_commit ya retiró lo confirmado)
+    if transaction.parent is not None:
+        return
+    session.info.pop(_STAGED, None)
+    for writer, (tx_id, _) in session.info.pop(_PREPARED, {}).items():
+        writer._abort(tx_id)
+
+
+audit_writer = AuditWriteBehind(
+    settings.CMS_AUDIT_SPOOL_DIR,
+    batch_size=settings.CMS_AUDIT_BATCH_SIZE,
+    flush_interval=settings.CMS_AUDIT_FLUSH_INTERVAL,
+)
@@ -0,0 +1,53 @@
+# app/services/auth_cache.py
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..core.hashing import hash_token
+from ..models.user import User, Session as UserSession, TokenRevocation
+from ..repositories.user_repository import session_cache, user_cache
+from .token_denylist import token_denylist
+
+
+def invalidate_session(token: str) -> None:
+    session_cache.delete(hash_token(token))
+
+
+# Cualquier commit que modifique un usuario o borre una sesión invalida su
+# entrada (logout, UserRepository.update, soft_delete...). Se invalida tras
+# el commit: antes, una petición concurrente volvería a cachear lo anterior.
+# Las revocaciones confirmadas pasan en ese momento al denylist local; los
+# demás procesos las reciben con su sincronización.
+
+@event.listens_for(Session, "after_flush")
+def _track_auth_changes(session, flush_context):
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, User):
+            session.info.setdefault("auth_users_changed", set()).add(obj.id)
+        elif isinstance(obj, UserSession) and obj in session.deleted:
+            session.info.setdefault("auth_sessions_deleted", set()).add(obj.token_hash)
+    for obj in session.new:
+        if isinstance(obj, TokenRevocation):
+            # Los valores ya: tras el commit la instancia está expirada
+            revocation = (obj.jti, obj.user_id, None if obj.jti else obj.created_at, obj.expires_at)
+            session.info.setdefault("auth_revocations", []).append(revocation)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop("auth_users_changed", ()):
+        user_cache.delete(user_id)
+    for token_hash in session.info.pop("auth_sessions_deleted", ()):
+        session_cache.delete(token_hash)
+    for jti, user_id, revoked_at, expires_at in session.info.pop("auth_revocations", ()):
+        if jti:
+            token_denylist.revoke(jti, expires_at)
+        elif user_id is not None:
+            token_denylist.revoke_user(user_id, revoked_at, expires_at)
+            user_cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("auth_users_changed", None)
+    session.info.pop("auth_sessions_deleted", None)
+    session.info.pop("auth_revocations", None)
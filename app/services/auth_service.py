@@ -1,21 +1,23 @@
 # app/services/auth_service.py
 from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime, timedelta
-from passlib.context import CryptContext
+from typing import Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import uuid
 import jwt
 from jwt import PyJWTError
-from ..models.user import User
+from ..core.config import settings
+from ..core.hashing import password_hasher
+from ..models.user import User, UserRole
 from ..repositories.user_repository import UserRepository
 from ..schemas.user import UserCreate, UserLogin, TokenResponse, UserResponse
+from .auth_cache import invalidate_session
+from .token_denylist import token_denylist
 
 # Configuración
 SECRET_KEY = "your-secret-key-here"  # Cambiar en producción
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 horas
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class AuthService:
     """Servicio de autenticación y autorización"""
@@ -36,56 +38,11 @@ class AuthService:
             
         Raises:
             ValueError: Si el email ya existe
+            HashingBusyError: Si la cola de hashing está llena
         """
         print("user_data_service:", user_data)
-        # Verificar si el email ya existe
-        existing_user = self.repository.get_by_email(user_data.email)
-        if existing_user:
-            raise ValueError("Email already registered")
-        print("No existing user found for email:", user_data.email)
-
-
-        # Hash de la contraseña
-        hashed_password = self._hash_password(user_data.password)
-        if not hashed_password:
-            print("Failed to hash password for user:", user_data.email)
-            raise ValueError("Error processing password")
-        print("Password hashed successfully for user:", user_data.email)
-
-        # Crear usuario
-        user = self.repository.create({
-            "email": user_data.email,
-            "name": user_data.name,
-            "lastname": user_data.lastname,
-            "password": hashed_password,
-            "role": user_data.role or "user"
-        })
-
-        if not user:
-            print("Failed to create user in database for email:", user_data.email)
-            raise ValueError("Error creating user")
-        
-        print("User created successfully in database:", user.email)
-        
-        self.db.commit()
-        print("Database commit successful for user:", user.email)
-
-        # Generar token
-        access_token = self._create_access_token(user.id)
-        if not access_token:
-            print("Failed to generate access token for user:", user.id)
-            raise ValueError("Error generating access token")
-        
-        print("Generated access token for user:", user.id)
-        # Crear sesión
-        self._create_session(user.id, access_token)
-        self.db.commit()
-        print("User registered successfully:", user.email)
-        return TokenResponse(
-            access_token=access_token,
-            token_type="bearer",
-            user=self._user_to_response(user)
-        )
+        self._check_email_available(user_data.email)
+        return self._create_user(user_data, self._hash_password(user_data.password))
     
     def login(self, credentials: UserLogin) -> TokenResponse:
         """
@@ -99,38 +56,23 @@ class AuthService:
             
         Raises:
             ValueError: Si las credenciales son inválidas
+            HashingBusyError: Si la cola de hashing está llena
         """
-        # Buscar usuario
-        user = self.repository.get_by_email(credentials.email)
-        
-        if not user:
-            raise ValueError("Invalid credentials")
-        
-        # Verificar contraseña
-        if not self._verify_password(credentials.password, user.password):
-            raise ValueError("Invalid credentials")
-        
-        # Verificar si está activo
-        if not user.is_active:
-            raise ValueError("User account is inactive")
-        
-        # Generar token
-        access_token = self._create_access_token(user.id)
-        
-        # Crear sesión
-        self._create_session(user.id, access_token)
-        self.db.commit()
-        
-        return TokenResponse(
-            access_token=access_token,
-            token_type="bearer",
-            user=self._user_to_response(user)
-        )
+        user = self._get_login_user(credentials.email)
+        valid, new_hash = self._verify_password(credentials.password, user.password)
+        return self._complete_login(user, valid, new_hash)
+
+    def refresh(self, user: User) -> TokenResponse:
+        """Emite un token nuevo (con su sesión) para el usuario actual"""
+        return self._issue_token(user)
     
     def logout(self, token: str) -> bool:
         """
         Cierra sesión eliminando el token
         
+        También registra la revocación del token: en modo sin estado es lo
+        único que impide seguir usándolo hasta que expire.
+        
         Args:
             token: Token de sesión
             
@@ -138,7 +80,12 @@ class AuthService:
             True si se cerró sesión correctamente
         """
         result = self.repository.delete_session(token)
-        if result:
+        payload = self._decode(token)
+        if payload and payload.get("sid"):
+            expires_at = datetime.utcfromtimestamp(payload["exp"])
+            self.repository.create_revocation({"jti": payload["sid"], "expires_at": expires_at})
+            self.db.commit()
+        elif result:
             self.db.commit()
         return result
     
@@ -154,45 +101,165 @@ class AuthService:
             if user_id is None:
                 return None
 
-            session = self.repository.get_session_by_token(token)
+            # Los tokens anteriores a los claims de sesión pasan por la BD
+            if settings.AUTH_STATELESS and "sid" in payload:
+                return self._user_from_claims(payload)
+
+            session = self.repository.get_cached_session_by_token(token)
             if not session:
                 return None
 
             if session.expires_at < datetime.utcnow():
+                invalidate_session(token)
                 self.repository.delete_session(token)
                 self.db.commit()
                 return None
 
-            return self.repository.get_by_id(int(user_id))
+            return self.repository.get_cached_by_id(int(user_id))
 
         except PyJWTError:
             return None
 
     
-    def verify_admin(self, user: User) -> bool:
-        return user.role in ("admin", "master")
+    def load_user(self, user: User) -> Optional[User]:
+        """
+        Usuario completo: en modo sin estado get_current_user solo trae
+        los claims del token
+        """
+        if not settings.AUTH_STATELESS:
+            return user
+        return self.repository.get_by_id(user.id)
+
+    @staticmethod
+    def verify_admin(user: User) -> bool:
+        return user.role in (UserRole.ADMIN, UserRole.MASTER)
 
     
     # ==================== PRIVATE METHODS ====================
     
+    # register y login se parten en pasos alrededor del hashing: la
+    # variante async (AsyncAuthService) espera el hash sin ocupar un hilo
+
+    def _check_email_available(self, email: str) -> None:
+        existing_user = self.repository.get_by_email(email)
+        if existing_user:
+            raise ValueError("Email already registered")
+        print("No existing user found for email:", email)
+
+    def _create_user(self, user_data: UserCreate, hashed_password: str) -> TokenResponse:
+        """Resto de register, con la contraseña ya hasheada"""
+        if not hashed_password:
+            print("Failed to hash password for user:", user_data.email)
+            raise ValueError("Error processing password")
+        print("Password hashed successfully for user:", user_data.email)
+
+        # Crear usuario
+        user = self.repository.create({
+            "email": user_data.email,
+            "name": user_data.name,
+            "lastname": user_data.lastname,
+            "password": hashed_password,
+            "role": user_data.role or "user"
+        })
+
+        if not user:
+            print("Failed to create user in database for email:", user_data.email)
+            raise ValueError("Error creating user")
+        
+        print("User created successfully in database:", user.email)
+        
+        self.db.commit()
+        print("Database commit successful for user:", user.email)
+
+        # Generar token
+        access_token = self._create_access_token(user)
+        if not access_token:
+            print("Failed to generate access token for user:", user.id)
+            raise ValueError("Error generating access token")
+        
+        print("Generated access token for user:", user.id)
+        # Crear sesión
+        self._create_session(user.id, access_token)
+        self.db.commit()
+        print("User registered successfully:", user.email)
+        return TokenResponse(
+            access_token=access_token,
+            token_type="bearer",
+            user=self._user_to_response(user)
+        )
+
+    def _get_login_user(self, email: str) -> User:
+        user = self.repository.get_by_email(email)
+        if not user:
+            raise ValueError("Invalid credentials")
+        return user
+
+    def _complete_login(self, user: User, valid: bool, new_hash: Optional[str]) -> TokenResponse:
+        """Resto de login, con la contraseña ya verificada"""
+        if not valid:
+            raise ValueError("Invalid credentials")
+        
+        # Verificar si está activo
+        if not user.is_active:
+            raise ValueError("User account is inactive")
+        
+        # Hash con otro coste que el configurado: se reemplaza (se guarda con la sesión)
+        if new_hash:
+            self.repository.update(user.id, {"password": new_hash})
+        
+        return self._issue_token(user)
+    
     def _hash_password(self, password: str) -> str:
-        """Hashea una contraseña"""
-        return pwd_context.hash(password)
+        """Hashea una contraseña (en el pool de hashing)"""
+        return password_hasher.hash(password)
     
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verifica una contraseña contra su hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+    def _verify_password(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verifica una contraseña contra su hash; devuelve también el hash nuevo si hay que actualizarlo"""
+        return password_hasher.verify_and_update(plain_password, hashed_password)
     
-    def _create_access_token(self, user_id: int) -> str:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    def _issue_token(self, user: User) -> TokenResponse:
+        access_token = self._create_access_token(user)
+        self._create_session(user.id, access_token)
+        if settings.AUTH_MAX_SESSIONS_PER_USER > 0:
+            self.repository.delete_oldest_sessions(user.id, keep=settings.AUTH_MAX_SESSIONS_PER_USER)
+        self.db.commit()
+
+        return TokenResponse(
+            access_token=access_token,
+            token_type="bearer",
+            user=self._user_to_response(user)
+        )
+
+    def _create_access_token(self, user: User) -> str:
+        now = datetime.utcnow()
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
         payload = {
-            "sub": str(user_id),  # JWT recomienda string
-            "exp": expire
+            "sub": str(user.id),  # JWT recomienda string
+            "exp": expire,
+            # Con fracción de segundo: se compara con la hora de las revocaciones por usuario
+            "iat": now.replace(tzinfo=timezone.utc).timestamp(),
+            # Claims para el modo sin estado (AUTH_STATELESS)
+            "sid": uuid.uuid4().hex,
+            "role": user.role.value,
+            "active": user.is_active,
         }
 
         return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+    def _decode(self, token: str) -> Optional[dict]:
+        try:
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except PyJWTError:
+            return None
+
+    def _user_from_claims(self, payload: dict) -> Optional[User]:
+        """Usuario sin consultar la BD (sin sesión asociada, solo id, rol y estado)"""
+        user_id = int(payload["sub"])
+        if token_denylist.is_revoked(payload["sid"], user_id, payload.get("iat", 0)):
+            return None
+        return User(id=user_id, role=UserRole(payload["role"]), is_active=payload["active"])
+
     
     def _create_session(self, user_id: int, token: str) -> None:
         """Crea una sesión en la BD"""
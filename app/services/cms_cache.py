@@ -0,0 +1,135 @@
+# app/services/cms_cache.py
+import threading
+import time
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..core.cache import AsyncSingleFlight, SingleFlight, SizedLRUCache, SnapshotCache, TTLCache
+from ..core.config import settings
+from ..core.snapshot_store import SnapshotStore
+from ..db import routing
+from ..models.cms import Page, Section, SectionContent, Content, Site, Media
+from ..repositories.cms_repository import site_settings_cache, media_cache
+from .page_resolver import PagePathResolver
+
+# Landing publicada ya serializada, compartida entre workers y reinicios.
+# Su archivo VERSION es la versión del CMS común a todos los procesos
+landing_store = SnapshotStore(settings.CMS_SNAPSHOT_DIR)
+
+# Rutas anidadas -> page_id, se reconstruye cuando cambian las páginas
+page_resolver = PagePathResolver()
+
+# Última versión compartida vista por este proceso y cuándo se miró
+_seen_version = None
+_checked_at = 0.0
+_version_lock = threading.Lock()
+
+
+def cms_version() -> str:
+    """
+    Versión del CMS compartida entre workers
+
+    El archivo se mira como mucho cada CMS_VERSION_CHECK_INTERVAL: los
+    cambios de otros procesos se ven con ese retraso; los propios, al
+    momento (invalidate_cms_caches). Si cambió desde la última lectura,
+    se vacían también las caches locales que no siguen esta versión.
+    """
+    global _seen_version, _checked_at
+    if time.monotonic() - _checked_at < settings.CMS_VERSION_CHECK_INTERVAL:
+        return _seen_version
+    with _version_lock:
+        now = time.monotonic()
+        if now - _checked_at < settings.CMS_VERSION_CHECK_INTERVAL:
+            return _seen_version
+        version = landing_store.version()
+        if version != _seen_version:
+            routing.note_change(landing_store.changed_at(version))
+            page_resolver.invalidate()
+            site_settings_cache.clear()
+            media_cache.clear()
+            _seen_version = version
+        _checked_at = now
+        return version
+
+
+# Snapshots de la landing, clave (slug, site_key)
+landing_cache = SnapshotCache(shared_version=cms_version)
+
+# Contenidos de una sección para edición, clave ("section", section_id)
+section_cache = SnapshotCache(shared_version=cms_version)
+
+# Una sola reconstrucción de la landing en curso por clave
+landing_flights = SingleFlight()
+# Lo mismo para las rutas async (no pueden bloquear el event loop esperando)
+landing_async_flights = AsyncSingleFlight()
+
+# Contenidos de una página reconstruidos desde la auditoría, clave
+# (page_id, inicio del intervalo). El pasado no cambia: sin invalidación
+as_of_cache = TTLCache(ttl=3600, max_entries=128)
+
+# Diffs entre dos registros de auditoría, clave (content_id, from, to).
+# Las versiones auditadas no cambian: sin invalidación
+diff_cache = SizedLRUCache(settings.CMS_DIFF_CACHE_BYTES)
+
+# Modelos que forman parte de la landing
+_CMS_MODELS = (Page, Section, SectionContent, Content, Site, Media)
+
+
+def invalidate_cms_caches() -> None:
+    """Invalida las caches de lectura del CMS, en este proceso y en los demás"""
+    global _seen_version, _checked_at
+    routing.note_change(time.time())
+    with _version_lock:
+        _seen_version = landing_store.bump()
+        _checked_at = time.monotonic()
+    landing_cache.bump()
+    section_cache.bump()
+    # Los snapshots de versiones anteriores ya no se leen: solo ocupan disco
+    landing_store.clear()
+
+
+# Cualquier commit que toque modelos del CMS invalida la cache,
+# sin depender de que cada ruta de escritura lo haga a mano, y hace que el
+# cliente lea del primario (read-your-writes, ver db/routing.py).
+
+@event.listens_for(Session, "after_flush")
+def _track_cms_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _CMS_MODELS):
+            session.info["cms_changed"] = True
+        if isinstance(obj, Page):
+            session.info["cms_pages_changed"] = True
+        elif isinstance(obj, Site):
+            session.info["cms_site_changed"] = True
+        elif isinstance(obj, Media):
+            session.info.setdefault("cms_media_changed", set()).add(obj.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_cms_statements(orm_execute_state):
+    # insert()/update()/delete() con session.execute no pasan por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, _CMS_MODELS):
+            orm_execute_state.session.info["cms_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("cms_pages_changed", False):
+        page_resolver.invalidate()
+    if session.info.pop("cms_site_changed", False):
+        site_settings_cache.clear()
+    for media_id in session.info.pop("cms_media_changed", ()):
+        media_cache.delete(media_id)
+    if session.info.pop("cms_changed", False):
+        invalidate_cms_caches()
+        routing.mark_write()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("cms_changed", None)
+    session.info.pop("cms_pages_changed", None)
+    session.info.pop("cms_site_changed", None)
+    session.info.pop("cms_media_changed", None)
@@ -1,11 +1,49 @@
+import enum
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Set, Tuple
+from datetime import datetime, timedelta, timezone
 from ..models.user import User
-from ..models.cms import Content, Page, Section, Media, ContactMessage, Auditory
-from ..schemas.cms import (ContentUpdate,PageWithContents, ContentResponse,LandingDataResponse)
+from ..models.cms import Content, ContentStatus, Page, Section, Media, ContactMessage, Auditory, Site, AuditChangeType
+from ..schemas.cms import (ContentUpdate, ContentBulkUpdateItem, LandingDataResponse)
 from ..repositories.cms_repository import CMSRepository
 from ..repositories.auditory_repository import AuditoryRepository
+from ..core.config import settings
+from ..core.compression import MIN_COMPRESS_SIZE, available_encodings
+from ..core.conditional import body_validator
+from ..core.json_patch import JsonPatchError, apply_json_patch, apply_merge_patch, make_json_patch
+from ..core.pagination import decode_cursor, encode_cursor
+from ..core.serialization import json_dumps
+from ..core.snapshot_store import Snapshot
+from ..db.routing import can_fill_caches
+from .cms_cache import as_of_cache, diff_cache, landing_cache, landing_flights, landing_store, page_resolver, section_cache
+from .audit_history import encode_version, is_keyframe_due, reconstruct_version
+from .audit_writer import audit_writer
+from .fieldsets import LandingFieldSet
+from .page_resolver import PagePathResolver
+
+
+def collect_media_ids(data: Any) -> Set[int]:
+    """
+    Ids de medios referenciados en Content.data: claves `media_id` /
+    `*_media_id` (un id) y `media_ids` / `*_media_ids` (lista de ids),
+    a cualquier profundidad
+    """
+    found = set()
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "media_id" or key.endswith("_media_id"):
+                if isinstance(value, int):
+                    found.add(value)
+            elif key == "media_ids" or key.endswith("_media_ids"):
+                if isinstance(value, list):
+                    found.update(v for v in value if isinstance(v, int))
+            else:
+                found |= collect_media_ids(value)
+    elif isinstance(data, list):
+        for item in data:
+            found |= collect_media_ids(item)
+    return found
+
 
 class CMSService:
 
@@ -14,42 +52,321 @@ class CMSService:
         self.repository = CMSRepository(db)
         self.auditory_repository = AuditoryRepository(db)
 
-    def get_landing_page(self, slug: str = None) -> LandingDataResponse:
-        page = self.repository.get_homepage()
+    def get_landing_snapshot(
+        self,
+        slug: str = None,
+        site_key: str = "main",
+        fieldset: Optional[LandingFieldSet] = None
+    ) -> Snapshot:
+        """
+        Landing serializada a bytes, lista para enviarse tal cual
 
-        contents = self.repository.get_contents_by_page_id(page.id)
+        Se busca primero en memoria, luego en disco y solo si no existe se
+        construye desde la BD (y se materializa en ambos niveles). Las
+        variantes con un subconjunto de campos se cachean solo en memoria.
 
-        site_settings = self.repository.get_site_settings("main")
-        site = None
+        Tras una invalidación, una sola petición reconstruye la landing; las
+        demás reciben el snapshot anterior de inmediato (stale-while-revalidate)
+        o, si no hay ninguno, esperan esa misma reconstrucción.
 
-        if site_settings:
-            logo = self.repository.get_media_by_id(site_settings.header_logo_id)
-            favicon = self.repository.get_media_by_id(site_settings.favicon_id)
-
-            site = {
-                "site_key": site_settings.site_key,
-                "name": site_settings.meta.get("site_name") if site_settings.meta else None,
-                "branding": {
-                    "logo_url": logo.url if logo else None,
-                    "logo_alt": logo.alt_text if logo else None,
-                    "favicon_url": favicon.url if favicon else None
-                },
-                "theme": {
-                    "primary_color": site_settings.meta.get("primary_color"),
-                    "theme": site_settings.meta.get("theme")
-                },
-                "meta": site_settings.meta
+        Las reconstrucciones se agrupan por clave y versión: una petición
+        posterior a un cambio nunca espera ni recibe una reconstrucción
+        empezada antes de él.
+        """
+        slug = self._normalize_slug(slug)
+        cache_key = self._landing_cache_key(slug, site_key, fieldset)
+        cached = landing_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        return landing_flights.do(
+            (cache_key, landing_cache.version),
+            lambda: self._load_landing_snapshot(slug, site_key, fieldset),
+            fallback=landing_cache.get_stale(cache_key)
+        )
+
+    def materialize_landing(self, slug: str = None, site_key: str = "main") -> Snapshot:
+        """Construye la landing, la serializa una sola vez y la guarda"""
+        slug = self._normalize_slug(slug)
+        return landing_flights.do(
+            ((slug, site_key), landing_cache.version),
+            lambda: self._materialize_landing(slug, site_key)
+        )
+
+    def _load_landing_snapshot(
+        self,
+        slug: Optional[str],
+        site_key: str,
+        fieldset: Optional[LandingFieldSet] = None
+    ) -> Snapshot:
+        # Otra petición pudo terminar la reconstrucción mientras tanto
+        cached = landing_cache.get(self._landing_cache_key(slug, site_key, fieldset))
+        if cached is not None:
+            return cached
+
+        if fieldset is not None:
+            return self._materialize_landing(slug, site_key, fieldset)
+
+        # La versión se toma antes de leer: si hay una escritura en medio,
+        # el snapshot no se guarda
+        version = landing_cache.version
+        snapshot = landing_store.read(self._landing_store_key(slug, site_key))
+        if snapshot is None:
+            return self._materialize_landing(slug, site_key)
+
+        landing_cache.set((slug, site_key), snapshot, version)
+        return snapshot
+
+    def _materialize_landing(
+        self,
+        slug: Optional[str],
+        site_key: str,
+        fieldset: Optional[LandingFieldSet] = None
+    ) -> Snapshot:
+        store_version = landing_store.version()
+        version = landing_cache.version
+        body, last_modified = self._render_landing(slug, site_key, fieldset)
+        snapshot = Snapshot(body, body_validator(body, last_modified))
+        # Variantes comprimidas una sola vez por versión, no por petición
+        if len(snapshot.body) >= MIN_COMPRESS_SIZE:
+            for encoding in available_encodings():
+                snapshot.encoded(encoding)
+
+        cache_key = self._landing_cache_key(slug, site_key, fieldset)
+        if not can_fill_caches(self.db):
+            return snapshot
+        if landing_cache.set(cache_key, snapshot, version) and fieldset is None:
+            # Con la versión de la que se construyó: si otro proceso invalidó
+            # mientras tanto, el archivo no se escribe o ya no se lee
+            landing_store.write(self._landing_store_key(slug, site_key), snapshot, store_version)
+        return snapshot
+
+    def get_landing_page(
+        self,
+        slug: str = None,
+        site_key: str = "main",
+        as_of: Optional[datetime] = None
+    ) -> LandingDataResponse:
+        return LandingDataResponse.model_validate(self.get_landing_payload(slug, site_key, as_of=as_of))
+
+    def get_landing_payload(
+        self,
+        slug: str = None,
+        site_key: str = "main",
+        fieldset: Optional[LandingFieldSet] = None,
+        as_of: Optional[datetime] = None
+    ) -> dict:
+        """
+        Landing como dict plano, con la misma forma que LandingDataResponse
+
+        Con un fieldset solo se cargan (SQL) y se devuelven los campos pedidos.
+        Con as_of, el `data` de cada contenido es el de ese momento (ver
+        _get_contents_as_of); página, sitio y medios son los actuales.
+        """
+        return self._build_landing(slug, site_key, fieldset, as_of)[0]
+
+    def _build_landing(
+        self,
+        slug: Optional[str],
+        site_key: str,
+        fieldset: Optional[LandingFieldSet] = None,
+        as_of: Optional[datetime] = None
+    ) -> Tuple[dict, Optional[datetime]]:
+        """
+        Payload de la landing y su Last-Modified: el updated_at más reciente
+        de todo lo que incluye (página, contenidos, sitio y cada medio)
+        """
+        with_site = fieldset is None or fieldset.includes("site")
+        with_media = fieldset is None or fieldset.includes("media")
+
+        projection = {}
+        if fieldset is not None:
+            content_columns = fieldset.content_fields or ()
+            if with_media and "data" not in content_columns:
+                # Content.data hace falta para resolver los medios referenciados
+                content_columns = (*content_columns, "data")
+            projection = {
+                "page_columns": fieldset.page_fields,
+                "content_columns": content_columns,
+                "with_contents": fieldset.with_contents or with_media,
             }
+        if as_of is not None:
+            projection["with_contents"] = False
 
+        page = self.repository.get_published_page_with_contents(
+            **self._page_lookup(slug), **projection
+        )
         if not page:
             raise ValueError("Page not found")
 
-        page.contents = contents
+        contents = None
+        if as_of is not None:
+            contents = self._get_contents_as_of(page.id, as_of)
 
-        return LandingDataResponse(
-            page=self._page_to_response_with_contents(page),
-            site=site
-        )
+        site_settings = self.repository.get_site_settings(site_key) if with_site or with_media else None
+
+        # Logo, favicon y medios referenciados en Content.data: una sola consulta
+        media_ids = set()
+        if site_settings:
+            media_ids.update((site_settings.header_logo_id, site_settings.favicon_id))
+        if with_media:
+            if contents is not None:
+                datas = (item["data"] for item in contents)
+            else:
+                datas = (content.data for content in page.contents)
+            for data in datas:
+                media_ids.update(collect_media_ids(data))
+        media = self.repository.get_media_by_ids(media_ids)
+
+        modified = [page.updated_at, *(item.updated_at for item in media.values())]
+        if site_settings:
+            modified.append(site_settings.updated_at)
+        if contents is not None:
+            modified.extend(item["updated_at"] for item in contents)
+        elif projection.get("with_contents", True):
+            modified.extend(content.updated_at for content in page.contents)
+        last_modified = max((value for value in modified if value is not None), default=None)
+
+        site = None
+        if site_settings:
+            site = self._site_to_dict(
+                site_settings,
+                media.get(site_settings.header_logo_id),
+                media.get(site_settings.favicon_id)
+            )
+
+        payload = {
+            "page": self._page_to_dict_with_contents(page, fieldset, contents),
+            "site": site,
+            "media": {
+                media_id: self._media_to_dict(item)
+                for media_id, item in media.items()
+            },
+            "meta": None,
+        }
+        if fieldset is not None:
+            payload = {
+                key: value for key, value in payload.items()
+                if key == "page" or fieldset.includes(key)
+            }
+        return payload, last_modified
+
+    def serialize_landing(
+        self,
+        slug: str = None,
+        site_key: str = "main",
+        fieldset: Optional[LandingFieldSet] = None,
+        as_of: Optional[datetime] = None
+    ) -> bytes:
+        """
+        Serializa la landing a JSON
+
+        Con CMS_FAST_SERIALIZATION los dicts se codifican directamente
+        (orjson); si no, se validan con LandingDataResponse antes. Las
+        respuestas parciales (fieldset) siempre van por la vía directa.
+        """
+        return self._render_landing(slug, site_key, fieldset, as_of)[0]
+
+    def _render_landing(
+        self,
+        slug: Optional[str],
+        site_key: str,
+        fieldset: Optional[LandingFieldSet] = None,
+        as_of: Optional[datetime] = None
+    ) -> Tuple[bytes, Optional[datetime]]:
+        """Landing serializada y su Last-Modified (ver _build_landing)"""
+        payload, last_modified = self._build_landing(slug, site_key, fieldset, as_of)
+        if settings.CMS_FAST_SERIALIZATION or fieldset is not None:
+            return json_dumps(payload), last_modified
+        return LandingDataResponse.model_validate(payload).model_dump_json().encode(), last_modified
+
+    def _get_contents_as_of(self, page_id: int, as_of: datetime) -> List[dict]:
+        """
+        Contenidos de la página con el `data` que tenían en `as_of`
+
+        as_of se trunca a CMS_AS_OF_BUCKET_SECONDS y el resultado se cachea
+        por (página, intervalo) cuando ya no puede llegar auditoría anterior
+        a él: pasados CMS_AS_OF_CACHE_DELAY segundos, más el flush_interval
+        con la auditoría write-behind. El historial de todos los contenidos
+        sale de una sola consulta.
+
+        Un contenido sin registros hasta esa fecha conserva su `data` si
+        nunca se editó; si se editó después no se conoce su estado anterior
+        y no se incluye.
+        """
+        if as_of.tzinfo is not None:
+            # Las fechas de la BD son UTC naive
+            as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+        seconds = (as_of - datetime.min) // timedelta(seconds=1)
+        bucket = datetime.min + timedelta(seconds=seconds - seconds % settings.CMS_AS_OF_BUCKET_SECONDS)
+
+        cache_key = (page_id, bucket)
+        cached = as_of_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        contents = self.repository.get_page_contents_as_of(page_id, bucket)
+        content_ids = [content.id for content in contents]
+        chains = self.auditory_repository.get_chains_as_of(content_ids, bucket)
+        logged = self.auditory_repository.get_logged_content_ids(set(content_ids) - chains.keys())
+
+        result = []
+        for content in contents:
+            item = self._content_to_dict(content)
+            chain = chains.get(content.id)
+            if chain:
+                data = reconstruct_version(chain)
+                if data is None:
+                    continue
+                item["data"] = data
+                item["updated_at"] = chain[-1].created_at
+            elif content.id in logged:
+                continue
+            result.append(item)
+
+        settle = settings.CMS_AS_OF_CACHE_DELAY
+        if audit_writer.enabled:
+            settle += audit_writer.flush_interval
+        if bucket <= datetime.utcnow() - timedelta(seconds=settle) and can_fill_caches(self.db):
+            as_of_cache.set(cache_key, result)
+        return result
+
+    def _page_lookup(self, slug: Optional[str]) -> dict:
+        """
+        Criterio de búsqueda de la página:
+        - Sin slug: homepage
+        - Slug simple: página de primer nivel (índice único de Page.slug)
+        - Ruta anidada ("padre/hijo"): resolver en memoria -> page_id
+        """
+        slug = self._normalize_slug(slug)
+        if slug is None:
+            return {}
+        if "/" not in slug:
+            return {"slug": slug}
+
+        page_id = page_resolver.resolve(slug, self.repository.get_page_tree_rows, cache=can_fill_caches(self.db))
+        if page_id is None:
+            raise ValueError("Page not found")
+        return {"page_id": page_id}
+
+    @staticmethod
+    def _normalize_slug(slug: Optional[str]) -> Optional[str]:
+        if slug is None:
+            return None
+        return PagePathResolver.normalize(slug) or None
+
+    @staticmethod
+    def _landing_cache_key(
+        slug: Optional[str],
+        site_key: str,
+        fieldset: Optional[LandingFieldSet]
+    ) -> tuple:
+        if fieldset is None:
+            return (slug, site_key)
+        return (slug, site_key, fieldset.key)
+
+    def _landing_store_key(self, slug: Optional[str], site_key: str) -> str:
+        return f"landing:{site_key}:{slug or ''}"
 
     def get_section_for_editing(self, section_id: int):
         section = self.repository.get_section_with_contents(section_id)
@@ -83,50 +400,221 @@ class CMSService:
             ]
         }
 
+    def get_section_snapshot(self, section_id: int) -> Snapshot:
+        """Contenidos de la sección serializados, cacheados hasta el siguiente cambio"""
+        cache_key = ("section", section_id)
+        cached = section_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        version = section_cache.version
+        body = json_dumps(self.get_section_for_editing(section_id))
+        row = self.repository.get_section_validator_row(section_id)
+        if not row:
+            raise ValueError(f"Section {section_id} not found")
+        snapshot = Snapshot(body, body_validator(body, self._last_modified(row)))
+        if can_fill_caches(self.db):
+            section_cache.set(cache_key, snapshot, version)
+        return snapshot
+
     def update_content_data(self, content_id: int, content_update: ContentUpdate, author_id: Optional[int] = None):
-        content = self.repository.get_content_by_id(content_id)
+        # Fila bloqueada hasta el commit: el patch se aplica sobre la última
+        # versión y dos ediciones concurrentes no se pisan
+        content = self.repository.get_content_by_id(content_id, for_update=True)
 
         if not content:
             raise ValueError(f"Content with id {content_id} not found")
 
-        update_payload = {"data": content_update.data}
+        depth = self._get_chain_depths([content_id]).get(content_id)
+        new_data, change_type, audit_data = self._apply_content_update(content, content_update, depth)
+
+        update_payload = {"data": new_data}
         if content_update.status:
             update_payload["status"] = content_update.status
 
         updated_content = self.repository.update_content(content_id, update_payload)
 
-        #Auditoría
-        self.auditory_repository.create_log(
-            content_id=content_id,
-            data_snapshot=updated_content.data,
-            author_id=author_id,
-            title=f"Contenido Actualizado: {updated_content.slug}",
-        )
+        #Auditoría: solo el cambio (patch o diff), con un snapshot cada N versiones
+        audit_entry = {
+            "content_id": content_id,
+            "data_snapshot": audit_data,
+            "author_id": author_id,
+            "title": f"Contenido Actualizado: {updated_content.slug}",
+            "change_type": change_type,
+        }
+        if audit_writer.enabled:
+            # En el spool antes del commit, a la BD después (ver AuditWriteBehind)
+            audit_writer.stage(self.db, [audit_entry])
+        else:
+            self.auditory_repository.create_log(**audit_entry)
 
         self.repository.db.commit()
 
+        # El commit invalidó los snapshots; al publicar se vuelve a
+        # materializar la landing para que la siguiente lectura no toque la BD
+        if updated_content.status == ContentStatus.PUBLISHED and updated_content.page_id:
+            self._rematerialize_pages([updated_content.page_id])
+
         return {
             "success": True,
             "message": "Content updated successfully",
-            "content": {
-                "id": updated_content.id,
-                "slug": updated_content.slug,
-                "data": updated_content.data,
-                "status": updated_content.status,
-                "updated_at": updated_content.updated_at
-            }
+            "content": self._updated_content_to_dict(updated_content)
         }
-    
-    def get_content_history(self, content_id: int) -> List[dict]:
-        """Devuelve el historial."""
+
+    def bulk_update_contents(self, items: List[ContentBulkUpdateItem], author_id: Optional[int] = None):
+        """
+        Aplica varias actualizaciones en una sola transacción
+
+        Carga (y bloquea) todos los contenidos en una consulta, escribe la
+        auditoría con un solo INSERT multi-fila y hace un único commit (una
+        sola invalidación).
+
+        Raises:
+            ValueError: Si algún contenido no existe (no se aplica ningún cambio)
+        """
+        contents = {
+            content.id: content
+            for content in self.repository.get_contents_by_ids((item.id for item in items), for_update=True)
+        }
+        missing = sorted({item.id for item in items} - contents.keys())
+        if missing:
+            raise ValueError(f"Contents not found: {missing}")
+
+        depths = self._get_chain_depths(contents.keys())
+        now = datetime.utcnow()
+        audit_entries = []
+        for item in items:
+            content = contents[item.id]
+            new_data, change_type, audit_data = self._apply_content_update(
+                content, item, depths.get(content.id)
+            )
+            content.data = new_data
+            if item.status:
+                content.status = ContentStatus(item.status)
+            content.updated_at = now
+            if not audit_writer.enabled:
+                depths[content.id] = 0 if change_type == AuditChangeType.SNAPSHOT else depths[content.id] + 1
+            audit_entries.append({
+                "content_id": content.id,
+                "data_snapshot": audit_data,
+                "change_type": change_type,
+                "author_id": author_id,
+                "title": f"Contenido Actualizado: {content.slug}",
+            })
+
+        self.db.flush()
+        if audit_writer.enabled:
+            audit_writer.stage(self.db, audit_entries)
+        else:
+            self.auditory_repository.create_logs(audit_entries)
+
+        # Respuesta armada antes del commit: evita recargar cada fila expirada
+        updated = [contents[content_id] for content_id in dict.fromkeys(item.id for item in items)]
+        response = [self._updated_content_to_dict(content) for content in updated]
+        published_page_ids = {
+            content.page_id for content in updated
+            if content.status == ContentStatus.PUBLISHED and content.page_id
+        }
+
+        self.db.commit()
+        self._rematerialize_pages(published_page_ids)
+
+        return {
+            "success": True,
+            "message": f"{len(updated)} contents updated successfully",
+            "contents": response
+        }
+
+    def _get_chain_depths(self, content_ids) -> Dict[int, int]:
+        """
+        Con auditoría write-behind se devuelve {}: cada versión se guarda
+        completa, porque los lotes de varios workers pueden llegar a la BD
+        en otro orden y un diff depende de la versión anterior
+        (backfill_audit_deltas los convierte después en diffs)
+        """
+        if audit_writer.enabled:
+            return {}
+        return self.auditory_repository.get_chain_depths(content_ids)
+
+    def _apply_content_update(self, content: Content, content_update: ContentUpdate, depth: Optional[int]):
+        """
+        Calcula el nuevo `data` y lo que se guarda en la auditoría
+
+        En la auditoría va solo el cambio: el patch recibido o, si llegó el
+        documento entero, el diff contra la versión actual. Cada
+        CMS_AUDIT_KEYFRAME_INTERVAL versiones (o si el contenido no tiene
+        ninguno) se guarda el documento completo.
+
+        Args:
+            depth: registros desde el último snapshot (None: no hay ninguno)
+
+        Returns:
+            (nuevo data, AuditChangeType, data para la auditoría)
+
+        Raises:
+            JsonPatchError: Si el patch no se puede aplicar
+        """
+        if content_update.patch is not None:
+            patch = content_update.patch_operations()
+            new_data = apply_json_patch(content.data, patch)
+            change_type = AuditChangeType.JSON_PATCH
+        elif content_update.merge_patch is not None:
+            patch = content_update.merge_patch
+            new_data = apply_merge_patch(content.data, patch)
+            change_type = AuditChangeType.MERGE_PATCH
+        else:
+            new_data = content_update.data
+            change_type, audit_data = encode_version(content.data, new_data, depth)
+            return new_data, change_type, audit_data
+
+        if not isinstance(new_data, dict):
+            raise JsonPatchError("The patched document must be a JSON object")
+        if is_keyframe_due(depth):
+            return new_data, AuditChangeType.SNAPSHOT, new_data
+        return new_data, change_type, patch
+
+    def _rematerialize_pages(self, page_ids) -> None:
+        """Vuelve a materializar (una vez por página) la landing de las páginas dadas"""
+        for page_id in page_ids:
+            page = self.db.get(Page, page_id)
+            if page is None:
+                continue
+            # Las subpáginas se sirven por su ruta completa ("padre/hijo")
+            slug = None
+            if not page.is_homepage:
+                slug = page_resolver.path(page.id, self.repository.get_page_tree_rows)
+                if slug is None:
+                    continue
+            try:
+                self.materialize_landing(slug)
+            except ValueError:
+                pass
+
+    def get_content_history(self, content_id: int, limit: int = 50, cursor: Optional[str] = None) -> dict:
+        """
+        Devuelve una página del historial, sin `data`
+        El documento de cada versión se pide a get_content_history_entry.
+
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        before = decode_cursor(cursor)
         content = self.repository.get_content_by_id(content_id)
         if not content:
             raise ValueError(f"Content with id {content_id} not found")
 
-        logs = self.auditory_repository.get_by_content_id(content_id)
-        return [self._auditory_to_dict(log) for log in logs]
+        # Un registro de más indica si hay otra página
+        rows = self.auditory_repository.get_history_page(content_id, limit + 1, before)
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
 
-    
+        return {
+            "items": [self._auditory_summary_to_dict(row) for row in items],
+            "next_cursor": next_cursor,
+        }
 
     def get_content_history_entry(self, content_id: int, log_id: int) -> dict:
         """Devuelve un registro de auditoría específico de un contenido."""
@@ -134,60 +622,204 @@ class CMSService:
         if not content:
             raise ValueError(f"Content with id {content_id} not found")
 
-        log = self.auditory_repository.get_by_id(log_id)
+        chain = self.auditory_repository.get_replay_chain(content_id, log_id)
+        if chain and chain[-1].id == log_id:
+            log = chain[-1]
+            return self._auditory_to_dict(log, reconstruct_version(chain))
+
+        log = self.auditory_repository.get_by_id(log_id, content_id)
         if not log or log.content_id != content_id:
             raise ValueError(f"Audit log {log_id} not found for content {content_id}")
 
         return self._auditory_to_dict(log)
 
+    def get_content_diff(self, content_id: int, from_id: int, to_id: Optional[int] = None) -> bytes:
+        """
+        Diff estructural (JSON Patch) entre dos registros de auditoría, o
+        entre un registro y el data actual si no se indica `to_id`
+
+        Entre dos registros el resultado no cambia nunca: se guarda ya
+        serializado en diff_cache.
+
+        Returns:
+            JSON con content_id, from, to y patch
+        """
+        cache_key = (content_id, from_id, to_id)
+        if to_id is not None:
+            cached = diff_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        content = self.repository.get_content_by_id(content_id)
+        if not content:
+            raise ValueError(f"Content with id {content_id} not found")
+
+        versions = self._get_versions(content_id, {from_id} | ({to_id} if to_id is not None else set()))
+        target = versions[to_id] if to_id is not None else content.data
+        body = json_dumps({
+            "content_id": content_id,
+            "from": from_id,
+            "to": to_id,
+            "patch": make_json_patch(versions[from_id], target),
+        })
+
+        if to_id is not None:
+            diff_cache.set(cache_key, body)
+        return body
+
+    def _get_versions(self, content_id: int, log_ids: Set[int]) -> Dict[int, Any]:
+        """
+        Documentos de varias versiones de un contenido. Si comparten
+        snapshot se reconstruyen todas con la cadena de la más reciente.
+        """
+        versions, chain, chain_ids = {}, [], []
+        for log_id in sorted(log_ids, reverse=True):
+            if log_id in chain_ids:
+                log_chain = chain[:chain_ids.index(log_id) + 1]
+            else:
+                chain = log_chain = self.auditory_repository.get_replay_chain(content_id, log_id)
+                chain_ids = [log.id for log in chain]
+                if not chain or chain_ids[-1] != log_id:
+                    raise ValueError(f"Audit log {log_id} not found for content {content_id}")
+
+            data = reconstruct_version(log_chain)
+            if data is None:
+                raise ValueError(f"Audit log {log_id} of content {content_id} cannot be reconstructed")
+            versions[log_id] = data
+        return versions
+
     #Serializadores
 
-    def _auditory_to_dict(self, log: Auditory) -> dict:
+    @staticmethod
+    def _last_modified(row) -> Optional[datetime]:
+        return max(
+            (value for value in row if isinstance(value, datetime)),
+            default=None
+        )
+
+    def _auditory_to_dict(self, log: Auditory, data: Any = None) -> dict:
+        """`data` es el documento reconstruido; en registros con patch, `patch` es lo guardado"""
+        change_type = log.change_type or AuditChangeType.SNAPSHOT
+        is_patch = change_type != AuditChangeType.SNAPSHOT
         return {
             "id": log.id,
             "content_id": log.content_id,
             "title": log.title,
             "author_id": log.author_id,
-            "data": log.data,
+            "data": data if data is not None or is_patch else log.data,
+            "change_type": change_type.value,
+            "patch": log.data if is_patch else None,
             "is_visible": log.is_visible,
             "created_at": log.created_at,
             "updated_at": log.updated_at,
         }
 
-    def _content_to_response(self, content: Content) -> ContentResponse:
-        return ContentResponse(
-            id=content.id,
-            page_id=content.page_id,
-            content_type_id=content.content_type_id,
-            slug=content.slug,
-            data=content.data,
-            status=content.status.value,
-            created_at=content.created_at,
-            updated_at=content.updated_at
-        )
-    
-    def _page_to_response_with_contents(self, page: Page) -> PageWithContents:
-        return PageWithContents(
-            id=page.id,
-            title=page.title,
-            slug=page.slug,
-            template=page.template,
-            parent_id=page.parent_id,
-            status=page.status.value,
-            order=page.order,
-            is_homepage=page.is_homepage,
-            settings=page.settings,
-            seo_title=page.seo_title,
-            seo_description=page.seo_description,
-            seo_image=page.seo_image,
-            created_at=page.created_at,
-            updated_at=page.updated_at,
-            contents=[
-                self._content_to_response(content)
+    def _auditory_summary_to_dict(self, row) -> dict:
+        return {
+            "id": row.id,
+            "content_id": row.content_id,
+            "title": row.title,
+            "author_id": row.author_id,
+            "change_type": (row.change_type or AuditChangeType.SNAPSHOT).value,
+            "is_visible": row.is_visible,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+        }
+
+    def _site_to_dict(self, site_settings: Site, logo: Optional[Media], favicon: Optional[Media]) -> dict:
+        meta = site_settings.meta or {}
+        return {
+            "site_key": site_settings.site_key,
+            "name": meta.get("site_name"),
+            "branding": {
+                "logo_url": logo.url if logo else None,
+                "logo_alt": logo.alt_text if logo else None,
+                "favicon_url": favicon.url if favicon else None
+            },
+            "theme": {
+                "primary_color": meta.get("primary_color"),
+                "theme": meta.get("theme")
+            }
+        }
+
+    def _updated_content_to_dict(self, content: Content) -> dict:
+        return {
+            "id": content.id,
+            "slug": content.slug,
+            "data": content.data,
+            "status": content.status,
+            "updated_at": content.updated_at
+        }
+
+    def _media_to_dict(self, media: Media) -> dict:
+        return {
+            "id": media.id,
+            "url": media.url,
+            "mime_type": media.mime_type,
+            "alt_text": media.alt_text,
+            "caption": media.caption,
+            "meta": media.meta,
+        }
+
+    def _content_to_dict(self, content: Content, fields: Optional[tuple] = None) -> dict:
+        if fields is not None:
+            return {name: self._column_value(content, name) for name in fields}
+        return {
+            "slug": content.slug,
+            "data": content.data,
+            "status": content.status.value,
+            "id": content.id,
+            "page_id": content.page_id,
+            "content_type_id": content.content_type_id,
+            "created_at": content.created_at,
+            "updated_at": content.updated_at,
+        }
+
+    def _page_to_dict_with_contents(
+        self,
+        page: Page,
+        fieldset: Optional[LandingFieldSet] = None,
+        contents: Optional[List[dict]] = None
+    ) -> dict:
+        """contents: contenidos ya convertidos a dict (p. ej. reconstruidos); si no, page.contents"""
+        if fieldset is not None:
+            data = {name: self._column_value(page, name) for name in fieldset.page_fields}
+            if fieldset.with_contents:
+                if contents is not None:
+                    data["contents"] = [
+                        {name: item[name] for name in fieldset.content_fields}
+                        for item in contents
+                    ]
+                else:
+                    data["contents"] = [
+                        self._content_to_dict(content, fieldset.content_fields)
+                        for content in sorted(page.contents, key=lambda c: c.sort_order)
+                        if content.is_visible
+                    ]
+            return data
+
+        return {
+            "title": page.title,
+            "slug": page.slug,
+            "template": page.template,
+            "parent_id": page.parent_id,
+            "status": page.status.value,
+            "order": page.order,
+            "is_homepage": page.is_homepage,
+            "settings": page.settings,
+            "seo_title": page.seo_title,
+            "seo_description": page.seo_description,
+            "seo_image": page.seo_image,
+            "id": page.id,
+            "created_at": page.created_at,
+            "updated_at": page.updated_at,
+            "contents": contents if contents is not None else [
+                self._content_to_dict(content)
                 for content in sorted(page.contents, key=lambda c: c.sort_order)
                 if content.is_visible
-            ]
-        )
-
+            ],
+        }
 
-       
\ No newline at end of file
+    def _column_value(self, obj, name: str):
+        value = getattr(obj, name)
+        return value.value if isinstance(value, enum.Enum) else value
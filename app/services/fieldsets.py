@@ -0,0 +1,94 @@
+# app/services/fieldsets.py
+from fnmatch import fnmatchcase
+from typing import FrozenSet, Optional, Tuple
+from ..schemas.cms import ContentResponse, PageWithContents
+
+PAGE_FIELDS: Tuple[str, ...] = tuple(name for name in PageWithContents.model_fields if name != "contents")
+CONTENT_FIELDS: Tuple[str, ...] = tuple(ContentResponse.model_fields)
+LANDING_SECTIONS: Tuple[str, ...] = ("site", "media", "meta")
+
+
+class LandingFieldSet:
+    """
+    Subconjunto de campos pedido para la landing (sparse fieldsets)
+
+    - fields: campos de la página ("slug,seo_*") y de sus contenidos con
+      prefijo "contents." ("contents.data"). "contents" solo = todos.
+    - include: bloques de primer nivel además de la página ("site,media").
+    """
+
+    def __init__(
+        self,
+        page_fields: Tuple[str, ...],
+        content_fields: Optional[Tuple[str, ...]],
+        sections: Tuple[str, ...]
+    ):
+        self.page_fields = page_fields
+        # None: la página sin contenidos
+        self.content_fields = content_fields
+        self.sections = sections
+
+    @property
+    def key(self) -> Tuple:
+        """Clave canónica para cachear la variante"""
+        return (self.page_fields, self.content_fields, self.sections)
+
+    @property
+    def with_contents(self) -> bool:
+        return self.content_fields is not None
+
+    def includes(self, section: str) -> bool:
+        return section in self.sections
+
+    @classmethod
+    def parse(cls, fields: Optional[str], include: Optional[str]) -> Optional["LandingFieldSet"]:
+        """
+        Returns:
+            None si no se pidió ningún subconjunto (respuesta completa)
+
+        Raises:
+            ValueError: Si algún campo o bloque no existe
+        """
+        if not fields and not include:
+            return None
+
+        page_fields, content_fields = set(PAGE_FIELDS), set(CONTENT_FIELDS)
+        with_contents = True
+        if fields:
+            page_fields, content_fields = set(), set()
+            with_contents = False
+            for token in _split(fields):
+                if token == "contents":
+                    content_fields.update(CONTENT_FIELDS)
+                    with_contents = True
+                elif token.startswith("contents."):
+                    content_fields.update(_match(token[len("contents."):], CONTENT_FIELDS))
+                    with_contents = True
+                else:
+                    page_fields.update(_match(token, PAGE_FIELDS))
+
+        sections = set(LANDING_SECTIONS)
+        if include:
+            sections = set()
+            for token in _split(include):
+                if token not in LANDING_SECTIONS:
+                    raise ValueError(f"Unknown include: {token}")
+                sections.add(token)
+
+        # Orden de los schemas, así la misma selección da siempre la misma clave
+        return cls(
+            tuple(name for name in PAGE_FIELDS if name in page_fields),
+            tuple(name for name in CONTENT_FIELDS if name in content_fields) if with_contents else None,
+            tuple(name for name in LANDING_SECTIONS if name in sections)
+        )
+
+
+def _split(value: str):
+    return [token.strip() for token in value.split(",") if token.strip()]
+
+
+def _match(pattern: str, names: Tuple[str, ...]) -> FrozenSet[str]:
+    matched = frozenset(name for name in names if fnmatchcase(name, pattern))
+    if not matched:
+        raise ValueError(f"Unknown field: {pattern}")
+    return matched
@@ -0,0 +1,80 @@
+# app/services/page_resolver.py
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class PagePathResolver:
+    """
+    Resuelve rutas anidadas ("padre/hijo/nieto") a ids de página
+
+    El mapa ruta -> page_id se construye con una sola consulta de todas
+    las páginas y se mantiene en memoria hasta que alguna página cambia
+    (invalidate). Así cada petición no tiene que recorrer parent_id en la BD.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        # (ruta -> page_id, page_id -> ruta)
+        self._maps: Optional[Tuple[Dict[str, int], Dict[int, str]]] = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._maps = None
+
+    def resolve(self, path: str, load_rows: Callable[[], Iterable], cache: bool = True) -> Optional[int]:
+        """
+        Args:
+            path: Ruta de slugs separados por "/"
+            load_rows: Devuelve filas (id, slug, parent_id, is_published)
+            cache: Si False, las filas cargadas no se guardan en el mapa
+
+        Returns:
+            id de la página publicada o None
+        """
+        return self._load(load_rows, cache)[0].get(self.normalize(path))
+
+    def path(self, page_id: int, load_rows: Callable[[], Iterable]) -> Optional[str]:
+        """Ruta completa ("padre/hijo") de una página publicada o None"""
+        return self._load(load_rows)[1].get(page_id)
+
+    def _load(self, load_rows: Callable[[], Iterable], cache: bool = True) -> Tuple[Dict[str, int], Dict[int, str]]:
+        maps = self._maps
+        if maps is None:
+            version = self._version
+            paths = self._build(load_rows())
+            maps = (paths, {page_id: path for path, page_id in paths.items()})
+            with self._lock:
+                if cache and version == self._version:
+                    self._maps = maps
+        return maps
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        return "/".join(segment for segment in path.split("/") if segment)
+
+    def _build(self, rows: Iterable) -> Dict[str, int]:
+        pages = {row.id: row for row in rows}
+        full_paths: Dict[int, Optional[str]] = {}
+
+        def full_path(page_id: int, seen: frozenset = frozenset()) -> Optional[str]:
+            if page_id in full_paths:
+                return full_paths[page_id]
+            page = pages.get(page_id)
+            # Padre borrado o ciclo en parent_id: la ruta no es alcanzable
+            if page is None or page_id in seen:
+                return None
+            if page.parent_id is None:
+                path = page.slug
+            else:
+                parent_path = full_path(page.parent_id, seen | {page_id})
+                path = f"{parent_path}/{page.slug}" if parent_path else None
+            full_paths[page_id] = path
+            return path
+
+        return {
+            path: page_id
+            for page_id, page in pages.items()
+            if page.is_published and (path := full_path(page_id))
+        }
@@ -0,0 +1,103 @@
+# app/services/session_sweeper.py
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from ..core.config import settings
+from ..repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SessionSweeper:
+    """
+    Borra periódicamente las sesiones expiradas de sys_sessions
+
+    Por lotes de `batch_size`, cada uno en su propia transacción, para no
+    bloquear la tabla con un DELETE grande. Con varios workers cada uno
+    barre por su cuenta: borrar dos veces la misma fila no tiene efecto.
+    """
+
+    def __init__(self, interval: float = 300.0, batch_size: int = 1000, session_factory: Optional[Callable] = None):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._deleted_total = 0
+        self._failed_sweeps = 0
+        self._last_sweep_at: Optional[float] = None
+        self._last_sweep_deleted = 0
+
+    # ==================== Ciclo de vida ====================
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        if self._session_factory is None:
+            from ..db.database import SessionLocal
+            self._session_factory = SessionLocal
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        # Un fallo inesperado no puede terminar el hilo: se reintenta en el siguiente intervalo
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                self._failed_sweeps += 1
+                logger.exception("Error en el barrido de sesiones")
+
+    # ==================== Barrido ====================
+
+    def sweep(self) -> int:
+        """Borra las sesiones expiradas hasta no dejar ninguna; devuelve cuántas"""
+        now = datetime.utcnow()
+        deleted = 0
+        while not self._stop.is_set():
+            db = self._session_factory()
+            try:
+                batch = UserRepository(db).delete_expired_sessions(now, self.batch_size)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._failed_sweeps += 1
+                logger.exception("Error borrando sesiones expiradas")
+                break
+            finally:
+                db.close()
+            deleted += batch
+            if batch < self.batch_size:
+                break
+
+        self._deleted_total += deleted
+        self._last_sweep_deleted = deleted
+        self._last_sweep_at = time.time()
+        return deleted
+
+    # ==================== Métricas ====================
+
+    def metrics(self) -> dict:
+        return {
+            "enabled": self._thread is not None,
+            "deleted_total": self._deleted_total,
+            "last_sweep_deleted": self._last_sweep_deleted,
+            "last_sweep_at": self._last_sweep_at,
+            "failed_sweeps": self._failed_sweeps,
+        }
+
+
+session_sweeper = SessionSweeper(
+    interval=settings.AUTH_SESSION_SWEEP_INTERVAL,
+    batch_size=settings.AUTH_SESSION_SWEEP_BATCH_SIZE,
+)
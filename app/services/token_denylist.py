@@ -0,0 +1,141 @@
+# app/services/token_denylist.py
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+from ..core.config import settings
+from ..repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+# Un id menor que el último visto puede confirmarse más tarde (transacciones
+# concurrentes): cada sincronización vuelve a leer este margen de ids
+SYNC_ID_OVERLAP = 1000
+
+
+class TokenDenylist:
+    """
+    Revocaciones de tokens en memoria para la autenticación sin estado
+
+    Cada revocación confirmada en sys_token_revocations se añade aquí al
+    hacer commit (services/auth_cache.py); un hilo trae cada `interval`
+    segundos las revocaciones hechas por otros procesos. Entre
+    procesos, un token revocado puede seguir aceptándose como mucho ese
+    intervalo. Las entradas se descartan cuando el token habría expirado
+    de todos modos.
+    """
+
+    def __init__(self, interval: float = 30.0, session_factory: Optional[Callable] = None):
+        self.interval = interval
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # jti -> expiración (timestamp)
+        self._tokens: Dict[str, float] = {}
+        # user_id -> (revocados los emitidos hasta este timestamp, expiración)
+        self._users: Dict[int, tuple] = {}
+        self._last_id = 0
+        self._last_sync_at: Optional[float] = None
+        self._failed_syncs = 0
+
+    # ==================== Ciclo de vida ====================
+
+    def start(self) -> None:
+        """Carga las revocaciones vigentes y arranca la sincronización periódica"""
+        if self._thread is not None:
+            return
+        if self._session_factory is None:
+            from ..db.database import SessionLocal
+            self._session_factory = SessionLocal
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-denylist-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        # Un fallo inesperado no puede terminar el hilo: se reintenta en el siguiente intervalo
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except Exception:
+                self._failed_syncs += 1
+                logger.exception("Error en la sincronización de revocaciones")
+
+    # ==================== Revocación ====================
+
+    def revoke(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._tokens[jti] = _timestamp(expires_at)
+
+    def revoke_user(self, user_id: int, revoked_at: datetime, expires_at: datetime) -> None:
+        revoked_at, expires_at = _timestamp(revoked_at), _timestamp(expires_at)
+        with self._lock:
+            previous = self._users.get(user_id)
+            if previous is None or previous[0] < revoked_at:
+                self._users[user_id] = (revoked_at, expires_at)
+
+    def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool:
+        with self._lock:
+            if jti in self._tokens:
+                return True
+            user = self._users.get(user_id)
+            return user is not None and issued_at <= user[0]
+
+    def sync(self) -> bool:
+        """Trae las revocaciones nuevas de la BD y descarta las expiradas"""
+        now = datetime.utcnow()
+        db = self._session_factory()
+        try:
+            revocations = UserRepository(db).get_revocations(max(0, self._last_id - SYNC_ID_OVERLAP), now)
+        except Exception:
+            self._failed_syncs += 1
+            logger.exception("Error sincronizando revocaciones de tokens")
+            return False
+        finally:
+            db.close()
+
+        for revocation in revocations:
+            if revocation.jti:
+                self.revoke(revocation.jti, revocation.expires_at)
+            elif revocation.user_id is not None:
+                self.revoke_user(revocation.user_id, revocation.created_at, revocation.expires_at)
+
+        cutoff = _timestamp(now)
+        with self._lock:
+            if revocations:
+                self._last_id = max(self._last_id, revocations[-1].id)
+            self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > cutoff}
+            self._users = {user_id: entry for user_id, entry in self._users.items() if entry[1] > cutoff}
+            self._last_sync_at = time.time()
+        return True
+
+    # ==================== Métricas ====================
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self._thread is not None,
+                "revoked_tokens": len(self._tokens),
+                "revoked_users": len(self._users),
+                "last_sync_at": self._last_sync_at,
+                "failed_syncs": self._failed_syncs,
+            }
+
+
+def _timestamp(value: datetime) -> float:
+    """Timestamp de un datetime naive en UTC (como los guarda la BD)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+token_denylist = TokenDenylist(interval=settings.AUTH_REVOCATION_SYNC_INTERVAL)
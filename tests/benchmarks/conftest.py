@@ -0,0 +1,28 @@
+# tests/benchmarks/conftest.py
+"""
+Benchmarks: corren con el resto de la suite y muestran sus tiempos con
+`pytest tests/benchmarks -s`. Solo afirman relaciones holgadas entre
+variantes, no tiempos absolutos.
+"""
+import time
+import pytest
+
+
+def best_of(fn, repeat: int = 5, number: int = 20) -> float:
+    """Mejor tiempo medio por llamada (segundos) de `repeat` rondas de `number` llamadas"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+@pytest.fixture
+def bench():
+    def run(label: str, fn, **kwargs) -> float:
+        elapsed = best_of(fn, **kwargs)
+        print(f"\n{label}: {elapsed * 1000:.3f} ms")
+        return elapsed
+    return run
@@ -0,0 +1,39 @@
+# tests/benchmarks/test_audit_reconstruction.py
+"""Latencia de reconstrucción de una versión según su profundidad en la cadena"""
+import copy
+from app.models.cms import AuditChangeType, Auditory
+from app.services.audit_history import encode_version, reconstruct_version, replay_history
+
+DEPTHS = (1, 10, 50, 200)
+
+
+def _chain(depth: int):
+    """Un snapshot de ~200 bloques y `depth` versiones con cambios pequeños"""
+    document = {
+        "title": "Documento",
+        "blocks": [{"id": i, "text": "Lorem ipsum " * 20, "tags": ["a", "b"]} for i in range(200)],
+    }
+    logs, previous = [Auditory(id=0, change_type=AuditChangeType.SNAPSHOT, data=document)], document
+    for version in range(1, depth + 1):
+        current = copy.deepcopy(previous)
+        current["title"] = f"Versión {version}"
+        current["blocks"][version % 200]["text"] = f"Editado en {version}"
+        change_type, data = encode_version(previous, current, version - 1, interval=depth + 1)
+        logs.append(Auditory(id=version, change_type=change_type, data=data))
+        previous = current
+    return logs, previous
+
+
+def test_reconstruction_latency_by_depth(bench):
+    timings = {}
+    for depth in DEPTHS:
+        logs, expected = _chain(depth)
+        assert reconstruct_version(logs) == expected
+        timings[depth] = bench(f"reconstruct_version, profundidad {depth}", lambda: reconstruct_version(logs), number=5)
+
+    # Una copia del snapshot y patches en el sitio: profundidad x200 no es x200 en tiempo
+    assert timings[200] < timings[1] * 50
+
+    logs, _ = _chain(50)
+    replay = bench("replay_history (copia por versión), profundidad 50", lambda: replay_history(logs), repeat=3, number=2)
+    assert timings[50] < replay
@@ -0,0 +1,88 @@
+# tests/benchmarks/test_concurrent_landing.py
+"""
+Landing con peticiones concurrentes: pila async (ruta async, AsyncSession
+sobre aiosqlite) frente a la síncrona (ruta `def` en el threadpool con una
+Session), las dos contra el mismo fichero SQLite
+"""
+import asyncio
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from app.api.cms.router import _snapshot_response
+from app.db import database
+from app.db.base import Base
+from app.services.async_services import AsyncCMSService
+from app.services.cms_cache import invalidate_cms_caches
+from app.services.cms_service import CMSService
+
+REQUESTS = 200
+CONCURRENCY = 50
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync")
+def sync_landing(request: Request, db: Session = Depends(database.get_db)):
+    return _snapshot_response(request, CMSService(db).get_landing_snapshot())
+
+
+@bench_app.get("/async")
+async def async_landing(request: Request, db=Depends(database.get_async_db)):
+    return _snapshot_response(request, await AsyncCMSService(db).get_landing_snapshot())
+
+
+@pytest.fixture
+def stacks(tmp_path, monkeypatch, cms_seed):
+    path = tmp_path / "cms.db"
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as db:
+        cms_seed(db)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+    # get_db (ruta sync) y get_async_db (ruta async) leen el mismo fichero
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(sync_engine, autoflush=False))
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    ))
+    yield
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+
+
+def _burst(path: str, cold: bool = False):
+    """REQUESTS peticiones, CONCURRENCY a la vez; en frío se invalida la cache antes"""
+    async def run():
+        if cold:
+            invalidate_cms_caches()
+        limit = asyncio.Semaphore(CONCURRENCY)
+        transport = httpx.ASGITransport(app=bench_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def request():
+                async with limit:
+                    response = await client.get(path)
+                    assert response.status_code == 200
+
+            await asyncio.gather(*(request() for _ in range(REQUESTS)))
+
+    return lambda: asyncio.run(run())
+
+
+def test_concurrent_landing_benchmark(stacks, bench):
+    # Calentamiento: la landing queda cacheada
+    _burst("/sync")()
+    _burst("/async")()
+
+    label = f"{REQUESTS} peticiones, concurrencia {CONCURRENCY}"
+    warm_sync = bench(f"landing cacheada, ruta sync: {label}", _burst("/sync"), repeat=3, number=2)
+    warm_async = bench(f"landing cacheada, ruta async: {label}", _burst("/async"), repeat=3, number=2)
+    bench(f"landing tras invalidar, pila sync: {label}", _burst("/sync", cold=True), repeat=3, number=2)
+    bench(f"landing tras invalidar, pila async: {label}", _burst("/async", cold=True), repeat=3, number=2)
+
+    # Con la landing cacheada la ruta async responde en el event loop, sin
+    # pasar por el threadpool
+    assert warm_async < warm_sync
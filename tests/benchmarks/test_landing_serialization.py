@@ -0,0 +1,46 @@
+# tests/benchmarks/test_landing_serialization.py
+"""Serialización directa (dict -> orjson) frente a la vía Pydantic + response_model"""
+import json
+from fastapi.encoders import jsonable_encoder
+from app.models.cms import Content, ContentStatus
+from app.schemas.cms import LandingDataResponse
+from app.services.cms_service import CMSService
+from app.core.serialization import json_dumps
+
+CONTENTS = 500
+
+
+def _add_contents(db):
+    for content_id in range(1000, 1000 + CONTENTS):
+        db.add(Content(
+            id=content_id, page_id=1, content_type_id=1, slug=f"bloque-{content_id}",
+            admin_label=f"Bloque {content_id}", status=ContentStatus.PUBLISHED, sort_order=content_id,
+            data={
+                "title": f"Bloque {content_id}",
+                "description": "Texto de ejemplo " * 10,
+                "items": [{"label": f"Item {i}", "value": i} for i in range(10)],
+                "media_id": 3,
+            },
+        ))
+    db.commit()
+
+
+def _pydantic_response(payload: dict) -> bytes:
+    # Modelo construido por el servicio, revalidado por response_model y
+    # codificado por JSONResponse
+    model = LandingDataResponse.model_validate(payload)
+    model = LandingDataResponse.model_validate(model.model_dump())
+    return json.dumps(jsonable_encoder(model), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def test_fast_serialization_benchmark(cms_data, bench):
+    _add_contents(cms_data)
+    payload = CMSService(cms_data).get_landing_payload()
+    assert len(payload["page"]["contents"]) == CONTENTS + 3
+
+    # Mismo documento por las dos vías
+    assert json.loads(json_dumps(payload)) == json.loads(_pydantic_response(payload))
+
+    fast = bench(f"json_dumps, {CONTENTS} contenidos", lambda: json_dumps(payload))
+    slow = bench(f"Pydantic + response_model, {CONTENTS} contenidos", lambda: _pydantic_response(payload), repeat=3, number=2)
+    assert fast < slow
@@ -0,0 +1,158 @@
+# tests/conftest.py
+"""
+Pruebas contra SQLite en memoria (no necesitan MySQL)
+
+La configuración se fija por variables de entorno antes de importar la
+aplicación: los directorios de storage van a un temporal propio.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+_STORAGE = tempfile.mkdtemp(prefix="cms-tests-")
+os.environ.setdefault("DATABASE_USER", "test")
+os.environ.setdefault("DATABASE_PASSWORD", "test")
+os.environ.setdefault("DATABASE_NAME", "test")
+os.environ["CMS_SNAPSHOT_DIR"] = os.path.join(_STORAGE, "cms_snapshots")
+os.environ["CMS_AUDIT_SPOOL_DIR"] = os.path.join(_STORAGE, "audit_spool")
+os.environ["CMS_AUDIT_ARCHIVE_DIR"] = os.path.join(_STORAGE, "audit_archive")
+os.environ["AUTH_SESSION_SWEEP_INTERVAL"] = "0"
+os.environ["AUTH_BCRYPT_ROUNDS"] = "4"
+# Los cambios de "otros workers" (bump directo del store) se ven al momento
+os.environ["CMS_VERSION_CHECK_INTERVAL"] = "0"
+
+import pytest
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+
+# SQLite solo autoincrementa INTEGER PRIMARY KEY
+@compiles(BigInteger, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw):
+    return "INTEGER"
+
+
+from app.db import database
+from app.db.base import Base
+from app.models import cms, user  # noqa: F401  (registra los modelos)
+from app.models.cms import (
+    Content, ContentStatus, ContentType, Media, Page, PageStatus, Section, SectionContent, Site
+)
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+database.SessionLocal.configure(bind=engine)
+
+
+class QueryCounter:
+    """Sentencias SQL ejecutadas contra el engine de pruebas"""
+
+    def __init__(self):
+        self.statements = []
+        self._active = False
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self._active:
+            self.statements.append(statement)
+
+    @contextmanager
+    def count(self):
+        self.statements = []
+        self._active = True
+        try:
+            yield self
+        finally:
+            self._active = False
+
+    def __len__(self):
+        return len(self.statements)
+
+
+_query_counter = QueryCounter()
+
+
+def reset_caches() -> None:
+    from app.repositories.user_repository import session_cache, user_cache
+    from app.services.cms_cache import as_of_cache, diff_cache, invalidate_cms_caches
+
+    invalidate_cms_caches()
+    as_of_cache.clear()
+    diff_cache.clear()
+    session_cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_database():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    reset_caches()
+    yield
+    reset_caches()
+
+
+@pytest.fixture
+def db():
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def queries():
+    return _query_counter
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+CONTENTS = 3
+
+
+@pytest.fixture
+def cms_data(db):
+    seed_cms(db)
+    return db
+
+
+@pytest.fixture
+def cms_seed():
+    """seed_cms, para sembrar los mismos datos en otra BD"""
+    return seed_cms
+
+
+def seed_cms(db) -> None:
+    """
+    Sitio con logo y favicon, la home (page 1) con `CONTENTS` contenidos
+    que usan la imagen 3, about (page 2) y about/team (page 3)
+    """
+    db.add(ContentType(id=1, name="hero", label="Hero"))
+    for media_id, name in ((1, "logo.png"), (2, "favicon.ico"), (3, "hero.png")):
+        db.add(Media(
+            id=media_id, filename=name, original_name=name, mime_type="image/png",
+            url=f"/media/{name}", storage_path=f"media/{name}", alt_text=name,
+        ))
+    db.add(Site(id=1, site_key="main", header_logo_id=1, favicon_id=2, meta={"site_name": "Finanzas"}))
+    db.add(Page(id=1, title="Inicio", slug="home", status=PageStatus.PUBLISHED, is_homepage=True))
+    db.add(Page(id=2, title="Nosotros", slug="about", status=PageStatus.PUBLISHED))
+    db.add(Page(id=3, title="Equipo", slug="team", parent_id=2, status=PageStatus.PUBLISHED))
+    for content_id in range(1, CONTENTS + 1):
+        db.add(Content(
+            id=content_id, page_id=1, content_type_id=1, slug=f"bloque-{content_id}",
+            admin_label=f"Bloque {content_id}", data={"title": f"Bloque {content_id}", "media_id": 3},
+            status=ContentStatus.PUBLISHED, sort_order=content_id,
+        ))
+    db.add(Content(
+        id=100, page_id=3, content_type_id=1, slug="equipo", admin_label="Equipo",
+        data={"title": "Equipo"}, status=ContentStatus.PUBLISHED,
+    ))
+    db.add(Section(id=1, page_id=1, name="Hero", component="Hero"))
+    db.add(SectionContent(id=1, section_id=1, content_id=1))
+    db.commit()
@@ -0,0 +1,129 @@
+# tests/test_as_of.py
+"""Landing "as of": contenidos reconstruidos desde la auditoría"""
+from datetime import datetime, timedelta
+import pytest
+from app.core.audit_archive import AuditArchive
+from app.core.config import settings
+from app.models.cms import AuditChangeType, Auditory, Content
+from app.repositories import auditory_repository
+from app.services import audit_archiver
+from app.services.audit_writer import audit_writer
+from app.services.cms_cache import as_of_cache
+from app.services.cms_service import CMSService
+
+BUCKET = timedelta(seconds=settings.CMS_AS_OF_BUCKET_SECONDS)
+
+
+def _bucket_start(moment: datetime) -> datetime:
+    seconds = (moment - datetime.min) // timedelta(seconds=1)
+    return datetime.min + timedelta(seconds=seconds - seconds % settings.CMS_AS_OF_BUCKET_SECONDS)
+
+
+def _log(db, content_id: int, title: str, created_at: datetime) -> None:
+    db.add(Auditory(
+        content_id=content_id, title=title, data={"title": title},
+        change_type=AuditChangeType.SNAPSHOT, created_at=created_at,
+    ))
+
+
+def _cached(as_of: datetime) -> bool:
+    return as_of_cache.get((1, _bucket_start(as_of))) is not None
+
+
+def _titles(db, as_of: datetime) -> dict:
+    return {item["id"]: item["data"]["title"] for item in CMSService(db)._get_contents_as_of(1, as_of)}
+
+
+@pytest.fixture
+def history(cms_data):
+    """Contenidos de la home creados hace un año"""
+    created = datetime.utcnow() - timedelta(days=365)
+    cms_data.query(Content).update({Content.created_at: created})
+    cms_data.commit()
+    return cms_data
+
+
+def test_as_of_is_truncated_to_its_bucket(history):
+    start = _bucket_start(datetime.utcnow() - timedelta(days=1))
+    _log(history, 1, "v1", start - BUCKET)
+    _log(history, 1, "v2", start + timedelta(seconds=10))
+    history.commit()
+
+    # Cualquier momento del intervalo ve el estado de su inicio
+    assert _titles(history, start + timedelta(seconds=30))[1] == "v1"
+    assert _titles(history, start + BUCKET)[1] == "v2"
+
+
+def test_never_edited_contents_keep_their_data_and_unknown_ones_are_left_out(history):
+    as_of = datetime.utcnow() - timedelta(days=1)
+    _log(history, 1, "antes", as_of - timedelta(hours=1))
+    # Editado solo después: no se sabe qué tenía en as_of
+    _log(history, 2, "después", as_of + timedelta(hours=1))
+    history.commit()
+
+    # El 3 nunca se editó
+    assert _titles(history, as_of) == {1: "antes", 3: "Bloque 3"}
+
+
+def test_archived_history_is_used_when_the_table_has_nothing_older(history, tmp_path, monkeypatch):
+    archive = AuditArchive(str(tmp_path))
+    monkeypatch.setattr(auditory_repository, "audit_archive", archive)
+    monkeypatch.setattr(audit_archiver, "audit_archive", archive)
+    now = datetime.utcnow()
+    _log(history, 1, "v1", now - timedelta(days=100))
+    _log(history, 1, "v2", now - timedelta(days=50))
+    history.commit()
+
+    # v1 se archiva; v2 queda en la tabla como inicio de la cadena
+    assert audit_archiver.archive_audit_logs(history, older_than_days=30)["archived"] == 1
+    assert history.query(Auditory).count() == 1
+
+    assert _titles(history, now - timedelta(days=70))[1] == "v1"
+    assert _titles(history, now - timedelta(days=10))[1] == "v2"
+
+
+def test_query_count_does_not_grow_with_contents(history, queries):
+    as_of = _bucket_start(datetime.utcnow() - timedelta(days=1))
+    for content_id in (1, 2, 3):
+        _log(history, content_id, f"v{content_id}", as_of - timedelta(hours=1))
+    history.commit()
+
+    with queries.count():
+        CMSService(history)._get_contents_as_of(1, as_of)
+    # Contenidos, cadenas (una ventana para todos) y contenidos con registros
+    assert len(queries) <= 3, queries.statements
+
+    with queries.count():
+        CMSService(history)._get_contents_as_of(1, as_of + BUCKET / 2)
+    assert len(queries) == 0, queries.statements
+
+
+def test_recent_buckets_are_not_cached_while_audit_can_still_arrive(history, monkeypatch):
+    # Intervalos de un segundo: el de ahora empezó hace menos de CMS_AS_OF_CACHE_DELAY
+    monkeypatch.setattr(settings, "CMS_AS_OF_BUCKET_SECONDS", 1)
+    now = datetime.utcnow()
+    _log(history, 1, "v1", now - timedelta(days=1))
+    history.commit()
+
+    assert _titles(history, now)[1] == "v1"
+    assert not _cached(now)
+
+    # La auditoría write-behind de una edición anterior llega con retraso
+    _log(history, 1, "v2", _bucket_start(now) - timedelta(milliseconds=500))
+    history.commit()
+    assert _titles(history, now)[1] == "v2"
+
+
+def test_write_behind_flush_interval_delays_caching(history, monkeypatch):
+    monkeypatch.setattr(settings, "CMS_AS_OF_BUCKET_SECONDS", 1)
+    as_of = datetime.utcnow() - timedelta(seconds=settings.CMS_AS_OF_CACHE_DELAY + 5)
+
+    # Con el writer activo el margen incluye su flush_interval
+    monkeypatch.setattr(audit_writer, "_thread", object())
+    monkeypatch.setattr(audit_writer, "flush_interval", 30.0)
+    CMSService(history)._get_contents_as_of(1, as_of)
+    assert not _cached(as_of)
+
+    monkeypatch.setattr(audit_writer, "_thread", None)
+    CMSService(history)._get_contents_as_of(1, as_of)
+    assert _cached(as_of)
@@ -0,0 +1,86 @@
+# tests/test_async_endpoints.py
+"""
+Rutas async con DATABASE_ASYNC: AsyncSession sobre aiosqlite contra un
+fichero SQLite (la BD en memoria de las demás pruebas es solo síncrona)
+"""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.db import database
+from app.db.base import Base
+from app.models.cms import AuditChangeType, Auditory
+
+
+@pytest.fixture
+def async_db(tmp_path, monkeypatch, cms_seed):
+    path = tmp_path / "cms.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as db:
+        cms_seed(db)
+        created_at = datetime.utcnow() - timedelta(hours=1)
+        for version in range(1, 4):
+            db.add(Auditory(
+                content_id=1, title=f"v{version}", data={"title": f"v{version}", "media_id": 3},
+                change_type=AuditChangeType.SNAPSHOT, created_at=created_at + timedelta(minutes=version),
+            ))
+        db.commit()
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    ))
+    monkeypatch.setattr(database, "async_replica_engines", [], raising=False)
+
+    # Cada llamada de los servicios async a la BD pasa por run_sync
+    calls = []
+    run_sync = AsyncSession.run_sync
+    monkeypatch.setattr(AsyncSession, "run_sync", lambda self, fn, *a, **kw: calls.append(fn) or run_sync(self, fn, *a, **kw))
+    return calls
+
+
+def test_landing(client, async_db):
+    response = client.get("/api/v1/cms/landing")
+    assert response.status_code == 200
+    assert len(response.json()["page"]["contents"]) == 3
+    assert async_db
+
+    nested = client.get("/api/v1/cms/landing", params={"slug": "about/team"})
+    assert nested.status_code == 200
+    assert nested.json()["page"]["slug"] == "team"
+    assert client.get("/api/v1/cms/landing", params={"slug": "nope"}).status_code == 404
+
+
+def test_landing_from_cache_skips_the_database(client, async_db):
+    first = client.get("/api/v1/cms/landing")
+    calls = len(async_db)
+
+    again = client.get("/api/v1/cms/landing")
+    assert again.content == first.content
+    assert len(async_db) == calls
+
+    etag = first.headers["etag"]
+    assert client.get("/api/v1/cms/landing", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_section_contents(client, async_db):
+    response = client.get("/api/v1/cms/sections/1/contents")
+    assert response.status_code == 200
+    assert async_db
+    assert client.get("/api/v1/cms/sections/99/contents").status_code == 404
+
+
+def test_content_history(client, async_db):
+    response = client.get("/api/v1/cms/contents/1/history", params={"limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert [entry["title"] for entry in body["items"]] == ["v3", "v2"]
+    assert async_db
+
+    rest = client.get("/api/v1/cms/contents/1/history", params={"limit": 2, "cursor": body["next_cursor"]}).json()
+    assert [entry["title"] for entry in rest["items"]] == ["v1"]
+    assert client.get("/api/v1/cms/contents/999/history").status_code == 404
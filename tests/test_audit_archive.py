@@ -0,0 +1,70 @@
+# tests/test_audit_archive.py
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+from app.core.audit_archive import AuditArchive
+from app.models.cms import AuditChangeType, Auditory
+from app.services.audit_archiver import archive_audit_logs
+
+
+def _records(content_id: int, ids):
+    return [{"id": log_id, "content_id": content_id, "data": {"v": log_id}} for log_id in ids]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = AuditArchive(str(tmp_path))
+    archive.write_segment({1: _records(1, [1, 5]), 2: _records(2, [2, 3, 4])})
+    return archive
+
+
+def test_find_with_content_reads_one_member(archive, monkeypatch):
+    reads = []
+    read_member = archive._read_member
+    monkeypatch.setattr(archive, "_read_member", lambda *args: reads.append(args) or read_member(*args))
+
+    assert archive.find(3, content_id=2)["data"] == {"v": 3}
+    assert len(reads) == 1
+    assert archive.find(3, content_id=1) is None
+    assert archive.find(4)["content_id"] == 2
+
+
+def test_segment_list_is_cached_until_the_directory_changes(archive, monkeypatch):
+    globs = []
+    glob = Path.glob
+    monkeypatch.setattr(Path, "glob", lambda self, pattern: globs.append(pattern) or glob(self, pattern))
+    # Directorio "viejo": su mtime ya es fiable
+    old = time.time_ns() - 10 * AuditArchive.MTIME_SETTLE_NS
+    os.utime(archive.directory, ns=(old, old))
+
+    assert archive.has_content(1)
+    assert archive.has_content(2)
+    assert archive.find(5, content_id=1) is not None
+    assert len(globs) == 1
+
+    # Otro proceso archiva un segmento nuevo
+    archive.write_segment({7: _records(7, [9])})
+    assert archive.has_content(7)
+    assert len(globs) == 2
+
+
+def test_archiver_cutoff_is_utc(cms_data, monkeypatch):
+    """Con la hora local por delante de UTC el corte no se adelanta"""
+    now = datetime.utcnow()
+    for created_at in (now - timedelta(days=60), now - timedelta(days=30) + timedelta(hours=1), now):
+        cms_data.add(Auditory(
+            content_id=1, title="x", data={"t": str(created_at)},
+            change_type=AuditChangeType.SNAPSHOT, created_at=created_at,
+        ))
+    cms_data.commit()
+
+    monkeypatch.setenv("TZ", "Etc/GMT-12")
+    time.tzset()
+    try:
+        stats = archive_audit_logs(cms_data, older_than_days=30)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert stats["archived"] == 0
@@ -0,0 +1,81 @@
+# tests/test_audit_history.py
+import copy
+from app.models.cms import AuditChangeType, Auditory, Content
+from app.schemas.cms import ContentUpdate
+from app.services.audit_history import backfill_audit_deltas, encode_version, reconstruct_version
+from app.services.cms_service import CMSService
+
+
+def _documents(count: int):
+    document = {"title": "v0", "items": [], "meta": {"tags": ["a"]}}
+    for version in range(count):
+        document = copy.deepcopy(document)
+        document["title"] = f"v{version}"
+        document["items"].append({"n": version})
+        if version % 3 == 0:
+            document["meta"]["tags"].append(f"t{version}")
+        if version % 7 == 0 and document["items"]:
+            document["items"].pop(0)
+        yield document
+
+
+def _encode_chain(documents, interval: int):
+    logs, previous, depth = [], None, None
+    for log_id, document in enumerate(documents, start=1):
+        change_type, data = encode_version(previous, document, depth, interval)
+        logs.append(Auditory(id=log_id, change_type=change_type, data=copy.deepcopy(data)))
+        depth = 0 if change_type == AuditChangeType.SNAPSHOT else depth + 1
+        previous = document
+    return logs
+
+
+def test_every_version_reconstructs_from_its_keyframe():
+    documents = list(_documents(30))
+    logs = _encode_chain(documents, interval=5)
+
+    keyframes = [log.id for log in logs if log.change_type == AuditChangeType.SNAPSHOT]
+    assert keyframes == [1, 6, 11, 16, 21, 26]
+
+    for index, document in enumerate(documents):
+        start = max(k for k in keyframes if k <= index + 1) - 1
+        chain = logs[start:index + 1]
+        assert reconstruct_version(chain) == document
+    # La reconstrucción no modifica los registros
+    assert logs[0].data == documents[0]
+
+
+def test_service_history_matches_every_edit(cms_data):
+    service = CMSService(cms_data)
+    expected = {}
+    updates = [
+        ContentUpdate(merge_patch={"subtitle": "uno"}),
+        ContentUpdate(patch=[{"op": "add", "path": "/tags", "value": ["x"]}]),
+        ContentUpdate(data={"title": "Reescrito", "media_id": 3}),
+    ] * 10
+
+    for content_update in updates:
+        service.update_content_data(1, content_update)
+        log_id = max(log.id for log in cms_data.query(Auditory).filter_by(content_id=1))
+        expected[log_id] = copy.deepcopy(cms_data.get(Content, 1).data)
+
+    for log_id, data in expected.items():
+        assert service.get_content_history_entry(1, log_id)["data"] == data
+
+    change_types = [log.change_type for log in cms_data.query(Auditory).order_by(Auditory.id)]
+    assert change_types.count(AuditChangeType.SNAPSHOT) < len(change_types)
+
+
+def test_backfill_keeps_every_version(cms_data):
+    documents = list(_documents(12))
+    for document in documents:
+        cms_data.add(Auditory(content_id=1, title="x", data=document, change_type=AuditChangeType.SNAPSHOT))
+    cms_data.commit()
+
+    stats = backfill_audit_deltas(cms_data, interval=4)
+    assert stats["rewritten"] == 9
+
+    logs = cms_data.query(Auditory).filter_by(content_id=1).order_by(Auditory.id).all()
+    assert [log.change_type == AuditChangeType.SNAPSHOT for log in logs].count(True) == 3
+    for index, document in enumerate(documents):
+        start = index - index % 4
+        assert reconstruct_version(logs[start:index + 1]) == document
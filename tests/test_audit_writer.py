@@ -0,0 +1,191 @@
+# tests/test_audit_writer.py
+import json
+import os
+import subprocess
+import sys
+import time
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.db.database import SessionLocal
+from app.models.cms import AuditChangeType, Auditory, Content
+from app.services.audit_writer import AuditWriteBehind
+
+
+def _entry(content_id: int, data: dict) -> dict:
+    return {
+        "content_id": content_id,
+        "data_snapshot": data,
+        "author_id": None,
+        "title": "Contenido Actualizado",
+        "change_type": AuditChangeType.SNAPSHOT,
+    }
+
+
+def _line(record: dict) -> str:
+    return json.dumps(record) + "\n"
+
+
+def _spooled(content_id: int, data: dict) -> dict:
+    return {**_entry(content_id, data), "change_type": AuditChangeType.SNAPSHOT.value}
+
+
+@pytest.fixture
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = AuditWriteBehind(
+        str(tmp_path), flush_interval=0.02, recovery_interval=0.02, session_factory=SessionLocal
+    )
+    yield writer
+    writer.stop()
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.01)
+
+
+def _audited_titles(db, content_id: int):
+    db.expire_all()
+    return [log.data.get("title") for log in db.query(Auditory).filter_by(content_id=content_id).order_by(Auditory.id)]
+
+
+def test_staged_entries_reach_spool_before_commit(cms_data, writer, tmp_path):
+    writer.start()
+    content = cms_data.get(Content, 1)
+    content.data = {"title": "Editado"}
+    writer.stage(cms_data, [_entry(1, content.data)])
+    cms_data.flush()
+
+    spool = next(tmp_path.glob("spool-*.jsonl"))
+    assert spool.read_text() == ""
+    cms_data.commit()
+    _wait_for(lambda: writer.metrics()["flushed_total"] == 1)
+    writer.stop()
+
+    assert _audited_titles(cms_data, 1) == ["Editado"]
+    # Todo insertado: el spool vuelve a empezar
+    assert spool.stat().st_size == 0
+
+
+def test_rollback_discards_staged_entries(cms_data, writer, tmp_path):
+    writer.start()
+    cms_data.get(Content, 1).data = {"title": "Nunca"}
+    writer.stage(cms_data, [_entry(1, {"title": "Nunca"})])
+    cms_data.flush()
+    cms_data.rollback()
+    cms_data.commit()
+    time.sleep(0.1)
+    writer.stop()
+    assert _audited_titles(cms_data, 1) == []
+
+
+def test_failed_commit_marks_the_transaction_aborted(cms_data, writer, tmp_path):
+    writer.start()
+    cms_data.get(Content, 1).data = {"title": "Falla"}
+    writer.stage(cms_data, [_entry(1, {"title": "Falla"})])
+    cms_data.flush()
+    # El flush del commit falla (NOT NULL) después de escribir el spool
+    cms_data.add(Content(id=999, page_id=1))
+    with pytest.raises(IntegrityError):
+        cms_data.commit()
+    spool = next(tmp_path.glob("spool-*.jsonl"))
+    assert '"tx"' in spool.read_text()
+    cms_data.close()
+
+    # El abort deja el spool sin nada pendiente
+    assert spool.stat().st_size == 0
+    assert writer.metrics()["queue_depth"] == 0
+
+
+def test_recovers_spool_of_dead_process(cms_data, writer, tmp_path, dead_pid):
+    (tmp_path / f"spool-{dead_pid}.jsonl").write_text(
+        _line({"tx": "a", "entries": [_spooled(1, {"title": "Confirmado"})]})
+        + _line({"commit": "a"})
+        + _line({"tx": "b", "entries": [_spooled(2, {"title": "Insertado"})]})
+        + _line({"commit": "b"})
+        + _line({"done": ["b"]})
+        + _line({"tx": "c", "entries": [_spooled(3, {"title": "Abortado"})]})
+        + _line({"abort": "c"})
+        + '{"tx": "d", "entr'
+    )
+    writer.start()
+    _wait_for(lambda: not writer.metrics()["recovery_pending"])
+    writer.stop()
+
+    assert _audited_titles(cms_data, 1) == ["Confirmado"]
+    assert _audited_titles(cms_data, 2) == []
+    assert _audited_titles(cms_data, 3) == []
+    assert list(tmp_path.glob(f"spool-{dead_pid}*")) == []
+
+
+def test_transaction_without_outcome_checks_the_database(cms_data, writer, tmp_path, dead_pid):
+    """Caída entre el fsync del spool y el registro del commit"""
+    committed = dict(cms_data.get(Content, 1).data)
+    (tmp_path / f"spool-{dead_pid}.jsonl").write_text(
+        _line({"tx": "a", "entries": [_spooled(1, committed)]})
+        + _line({"tx": "b", "entries": [_spooled(2, {"title": "No llegó a la BD"})]})
+    )
+    writer.start()
+    _wait_for(lambda: not writer.metrics()["recovery_pending"])
+    writer.stop()
+
+    assert _audited_titles(cms_data, 1) == [committed["title"]]
+    assert _audited_titles(cms_data, 2) == []
+
+
+def test_reclaims_stranded_recovery(cms_data, writer, tmp_path, dead_pid):
+    """Otro proceso empezó a recuperar el spool y murió a medias"""
+    (tmp_path / f"spool-1.recovering-{dead_pid}").write_text(
+        _line({"tx": "a", "entries": [_spooled(1, {"title": "Recuperado"})]})
+        + _line({"commit": "a"})
+    )
+    writer.start()
+    _wait_for(lambda: not writer.metrics()["recovery_pending"])
+    writer.stop()
+
+    assert _audited_titles(cms_data, 1) == ["Recuperado"]
+    assert list(tmp_path.iterdir()) == [tmp_path / f"spool-{os.getpid()}.jsonl"]
+
+
+def test_recovery_failure_does_not_break_start(cms_data, tmp_path, dead_pid):
+    (tmp_path / f"spool-{dead_pid}.jsonl").write_text(
+        _line({"tx": "a", "entries": [_spooled(1, {"title": "Tarde"})]}) + _line({"commit": "a"})
+    )
+    attempts = []
+
+    def flaky_session():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("BD caída")
+        return SessionLocal()
+
+    writer = AuditWriteBehind(str(tmp_path), flush_interval=0.02, recovery_interval=0.02, session_factory=flaky_session)
+    writer.start()
+    try:
+        _wait_for(lambda: not writer.metrics()["recovery_pending"])
+    finally:
+        writer.stop()
+
+    assert len(attempts) >= 2
+    assert _audited_titles(cms_data, 1) == ["Tarde"]
+
+
+def test_service_edit_is_audited_through_the_writer(cms_data, writer, monkeypatch):
+    from app.schemas.cms import ContentUpdate
+    from app.services import cms_service
+
+    monkeypatch.setattr(cms_service, "audit_writer", writer)
+    writer.start()
+    cms_service.CMSService(cms_data).update_content_data(1, ContentUpdate(merge_patch={"title": "Por el spool"}))
+    _wait_for(lambda: writer.metrics()["flushed_total"] == 1)
+    writer.stop()
+
+    assert _audited_titles(cms_data, 1) == ["Por el spool"]
@@ -0,0 +1,68 @@
+# tests/test_auth_cache.py
+"""Sesiones y usuarios cacheados en la dependencia de autenticación"""
+import pytest
+from app.core.hashing import hash_token
+from app.models.user import UserRole
+from app.repositories.user_repository import UserRepository, session_cache, user_cache
+from app.schemas.user import UserCreate
+from app.services.auth_service import AuthService
+
+
+@pytest.fixture
+def registered(db):
+    response = AuthService(db).register(UserCreate(email="ana@example.com", name="Ana", password="secreto1"))
+    return response.user.id, {"Authorization": f"Bearer {response.access_token}"}
+
+
+def test_warm_me_skips_the_database(client, registered, queries):
+    _, headers = registered
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    with queries.count():
+        response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert len(queries) == 0, queries.statements
+
+
+def test_logout_drops_the_cached_session(client, registered):
+    _, headers = registered
+    token = headers["Authorization"].split()[1]
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert session_cache.get(hash_token(token)) is not None
+
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+    assert session_cache.get(hash_token(token)) is None
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_update_drops_the_cached_user(client, db, registered):
+    user_id, headers = registered
+    assert client.get("/api/v1/auth/me", headers=headers).json()["role"] != UserRole.ADMIN.value
+
+    UserRepository(db).update(user_id, {"name": "Ana María", "role": UserRole.ADMIN})
+    db.commit()
+
+    assert user_cache.get(user_id) is None
+    me = client.get("/api/v1/auth/me", headers=headers).json()
+    assert (me["name"], me["role"]) == ("Ana María", UserRole.ADMIN.value)
+
+
+def test_update_without_commit_keeps_the_cached_user(client, db, registered):
+    user_id, headers = registered
+    client.get("/api/v1/auth/me", headers=headers)
+
+    UserRepository(db).update(user_id, {"name": "Ana María"})
+    db.rollback()
+
+    assert user_cache.get(user_id).name == "Ana"
+
+
+def test_soft_delete_drops_the_cached_user(client, db, registered):
+    user_id, headers = registered
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    UserRepository(db).soft_delete(user_id)
+    db.commit()
+
+    assert user_cache.get(user_id) is None
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
@@ -0,0 +1,52 @@
+# tests/test_auth_hashing.py
+import asyncio
+import pytest
+from app.core.hashing import HashingBusyError, PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(rounds=4, workers=1, queue_limit=0)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_async_hash_and_verify(hasher):
+    async def scenario():
+        hashed = await hasher.hash_async("secreto1")
+        return hashed, await hasher.verify_and_update_async("secreto1", hashed)
+
+    hashed, (valid, new_hash) = asyncio.run(scenario())
+    assert valid and new_hash is None
+    assert hasher.verify_and_update("otra", hashed) == (False, None)
+    metrics = hasher.metrics()
+    assert metrics["completed"] == 3 and metrics["in_flight"] == 0
+
+
+def test_full_queue_is_rejected_and_slot_released(hasher):
+    async def scenario():
+        pending = asyncio.ensure_future(hasher.hash_async("secreto1"))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingBusyError):
+            await hasher.hash_async("secreto2")
+        await pending
+        # El hueco se libera al terminar el hash
+        return await hasher.hash_async("secreto3")
+
+    assert asyncio.run(scenario())
+    assert hasher.metrics()["rejected"] == 1
+
+
+def test_register_and_login_routes(client):
+    user = {"email": "ana@example.com", "name": "Ana", "password": "secreto1"}
+    response = client.post("/api/v1/auth/register", json=user)
+    assert response.status_code == 201
+    assert client.post("/api/v1/auth/register", json=user).status_code == 400
+
+    response = client.post("/api/v1/auth/login", json={"email": user["email"], "password": "secreto1"})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}).json()["email"] == user["email"]
+
+    assert client.post("/api/v1/auth/login", json={"email": user["email"], "password": "otra123"}).status_code == 401
+    assert client.post("/api/v1/auth/login", json={"email": "x@example.com", "password": "secreto1"}).status_code == 401
@@ -0,0 +1,112 @@
+# tests/test_cms_cache.py
+from pathlib import Path
+from app.core.cache import SnapshotCache
+from app.core.conditional import body_validator
+from app.core.snapshot_store import Snapshot
+from app.repositories.cms_repository import site_settings_cache
+from app.core.config import settings
+from app.services.cms_cache import cms_version, invalidate_cms_caches, landing_cache, landing_store
+from app.services.cms_service import CMSService
+
+
+def test_snapshot_cache_follows_shared_version():
+    shared = {"version": "a"}
+    cache = SnapshotCache(shared_version=lambda: shared["version"])
+    cache.set("landing", "v1", cache.version)
+    assert cache.get("landing") == "v1"
+
+    # Otro proceso cambia la versión compartida: sin bump local
+    shared["version"] = "b"
+    assert cache.get("landing") is None
+    assert cache.get_stale("landing") == "v1"
+
+
+def test_snapshot_cache_rejects_build_from_other_version():
+    shared = {"version": "a"}
+    cache = SnapshotCache(shared_version=lambda: shared["version"])
+    version = cache.version
+    shared["version"] = "b"
+    assert cache.set("landing", "viejo", version) is False
+    assert cache.get("landing") is None
+
+
+def test_landing_invalidated_by_another_worker(cms_data, client, queries):
+    first = client.get("/api/v1/cms/landing")
+    assert first.status_code == 200
+    with queries.count():
+        assert client.get("/api/v1/cms/landing").status_code == 200
+    assert len(queries) == 0
+
+    # Un commit en otro worker solo cambia el archivo VERSION compartido
+    site_settings_cache.set("main", "cache de este proceso")
+    landing_store.bump()
+
+    assert landing_cache.get((None, "main")) is None
+    assert site_settings_cache.get("main") is None
+    with queries.count():
+        assert client.get("/api/v1/cms/landing").json() == first.json()
+    assert len(queries) > 0
+
+
+def test_store_rejects_other_versions():
+    snapshot = Snapshot(b"{}", body_validator(b"{}"))
+    old = landing_store.version()
+    landing_store.bump()
+    assert landing_store.write("landing:main:", snapshot, old) is False
+    assert landing_store.read("landing:main:") is None
+
+    current = landing_store.version()
+    assert landing_store.write("landing:main:", snapshot, current) is True
+    assert landing_store.read("landing:main:").body == b"{}"
+
+    # Escrito con la versión vigente, pero otro proceso invalidó después
+    landing_store.bump()
+    assert landing_store.read("landing:main:") is None
+
+
+def test_stale_render_is_not_materialized(cms_data, monkeypatch):
+    """Otro worker invalida mientras esta reconstrucción está en curso"""
+    service = CMSService(cms_data)
+    render = service._render_landing
+
+    def render_then_invalidate(*args, **kwargs):
+        rendered = render(*args, **kwargs)
+        landing_store.clear()
+        landing_store.bump()
+        return rendered
+
+    monkeypatch.setattr(service, "_render_landing", render_then_invalidate)
+    service.materialize_landing()
+
+    assert landing_store.read(service._landing_store_key(None, "main")) is None
+    assert landing_cache.get((None, "main")) is None
+
+
+def test_shared_version_check_is_throttled(cms_data, client, monkeypatch):
+    client.get("/api/v1/cms/landing")
+    monkeypatch.setattr(settings, "CMS_VERSION_CHECK_INTERVAL", 60.0)
+    cms_version()
+    stats = []
+    stat = Path.stat
+    monkeypatch.setattr(Path, "stat", lambda self, *a, **kw: stats.append(self) or stat(self, *a, **kw))
+
+    for _ in range(20):
+        assert landing_cache.get((None, "main")) is not None
+    assert stats == []
+
+    # Los cambios de este proceso se ven sin esperar al intervalo
+    invalidate_cms_caches()
+    assert landing_cache.get((None, "main")) is None
+
+
+def test_version_file_is_reread_only_when_replaced(monkeypatch):
+    landing_store.bump()
+    version = landing_store.version()
+    reads = []
+    read_text = Path.read_text
+    monkeypatch.setattr(Path, "read_text", lambda self, *a, **kw: reads.append(self) or read_text(self, *a, **kw))
+
+    assert landing_store.version() == version
+    assert reads == []
+    assert landing_store.bump() == landing_store.version()
+    assert len(reads) == 1
@@ -0,0 +1,74 @@
+# tests/test_compression.py
+import gzip
+import brotli
+import pytest
+from app.core.compression import MIN_COMPRESS_SIZE, negotiate_encoding
+from app.models.cms import Content
+
+URL = "/api/v1/cms/landing"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("br;q=0, *", "gzip"),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("GZIP;q=0.8", "gzip"),
+    ("br;q=abc, gzip;q=0.1", "gzip"),
+])
+def test_negotiate_encoding(accept, expected):
+    assert negotiate_encoding(accept) == expected
+
+
+@pytest.fixture
+def large_landing(cms_data):
+    content = cms_data.get(Content, 1)
+    content.data = {**content.data, "body": "Texto largo de la landing. " * 100}
+    cms_data.commit()
+    return cms_data
+
+
+def test_large_landing_is_compressed_per_client(client, large_landing):
+    plain = client.get(URL, headers={"Accept-Encoding": "identity"})
+    assert len(plain.content) >= MIN_COMPRESS_SIZE
+    assert "content-encoding" not in plain.headers
+
+    responses = {}
+    for encoding, decompress in (("gzip", gzip.decompress), ("br", brotli.decompress)):
+        response = client.get(URL, headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        # httpx ya descomprime: el cuerpo es el mismo JSON
+        assert response.content == plain.content
+        responses[encoding] = response
+
+    etags = {plain.headers["etag"], responses["gzip"].headers["etag"], responses["br"].headers["etag"]}
+    assert len(etags) == 3
+
+
+def test_not_modified_matches_the_encoded_variant(client, large_landing):
+    gzip_etag = client.get(URL, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    response = client.get(URL, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == gzip_etag
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    # Otra codificación: el cliente no tiene esos bytes
+    assert client.get(URL, headers={"Accept-Encoding": "br", "If-None-Match": gzip_etag}).status_code == 200
+
+
+def test_small_body_is_sent_uncompressed(client, cms_data):
+    response = client.get("/api/v1/cms/sections/1/contents", headers={"Accept-Encoding": "gzip, br"})
+    assert len(response.content) < MIN_COMPRESS_SIZE
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    identity = client.get("/api/v1/cms/sections/1/contents", headers={"Accept-Encoding": "identity"})
+    assert identity.headers["etag"] == response.headers["etag"]
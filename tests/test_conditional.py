@@ -0,0 +1,55 @@
+# tests/test_conditional.py
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from app.core.conditional import body_validator
+from app.models.cms import Media
+
+
+def test_etag_follows_body():
+    assert body_validator(b'{"a":1}').etag == body_validator(b'{"a":1}').etag
+    assert body_validator(b'{"a":1}').etag != body_validator(b'{"a":2}').etag
+
+
+def test_edits_in_the_same_second_change_etag(cms_data, client):
+    first = client.get("/api/v1/cms/landing")
+    etag = first.headers["etag"]
+
+    # Dos escrituras seguidas: updated_at (segundos) puede no cambiar
+    for title in ("Primero", "Segundo"):
+        assert client.put("/api/v1/cms/contents/1", json={"data": {"title": title}}).status_code == 200
+        response = client.get("/api/v1/cms/landing", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        etag = response.headers["etag"]
+
+    assert client.get("/api/v1/cms/landing", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_section_not_modified(cms_data, client):
+    first = client.get("/api/v1/cms/sections/1/contents")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get("/api/v1/cms/sections/1/contents", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put("/api/v1/cms/contents/1", json={"data": {"title": "Otro"}})
+    assert client.get("/api/v1/cms/sections/1/contents", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_missing_section_is_404(cms_data, client):
+    assert client.get("/api/v1/cms/sections/99/contents").status_code == 404
+
+
+def test_content_media_change_advances_last_modified(cms_data, client):
+    """La imagen 3 solo está referenciada en Content.data, no en el sitio"""
+    first = client.get("/api/v1/cms/landing")
+    last_modified = first.headers["last-modified"]
+
+    media = cms_data.get(Media, 3)
+    media.alt_text = "Nueva descripción"
+    media.updated_at = datetime(2100, 1, 1)
+    cms_data.commit()
+
+    response = client.get("/api/v1/cms/landing", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 200
+    assert response.json()["media"]["3"]["alt_text"] == "Nueva descripción"
+    assert parsedate_to_datetime(response.headers["last-modified"]).year == 2100
@@ -0,0 +1,85 @@
+# tests/test_content_diff.py
+from app.core.cache import SizedLRUCache
+from app.core.json_patch import apply_json_patch
+from app.models.cms import Auditory, Content
+from app.schemas.cms import ContentUpdate
+from app.services.cms_cache import diff_cache
+from app.services.cms_service import CMSService
+
+
+def _edit(db, *updates):
+    service = CMSService(db)
+    log_ids = []
+    for content_update in updates:
+        service.update_content_data(1, content_update)
+        log_ids.append(max(log.id for log in db.query(Auditory).filter_by(content_id=1)))
+    return log_ids
+
+
+def test_diff_between_versions(client, cms_data):
+    first, second = _edit(
+        cms_data,
+        ContentUpdate(merge_patch={"subtitle": "uno"}),
+        ContentUpdate(merge_patch={"subtitle": "dos", "tags": ["x"]}),
+    )
+    service = CMSService(cms_data)
+    before = service.get_content_history_entry(1, first)["data"]
+    after = service.get_content_history_entry(1, second)["data"]
+
+    response = client.get(f"/api/v1/cms/contents/1/diff?from={first}&to={second}")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["content_id"], body["from"], body["to"]) == (1, first, second)
+    assert apply_json_patch(before, body["patch"]) == after
+
+
+def test_diff_against_current_data(client, cms_data):
+    first, _ = _edit(
+        cms_data,
+        ContentUpdate(merge_patch={"subtitle": "uno"}),
+        ContentUpdate(merge_patch={"subtitle": "dos"}),
+    )
+    before = CMSService(cms_data).get_content_history_entry(1, first)["data"]
+
+    body = client.get(f"/api/v1/cms/contents/1/diff?from={first}").json()
+    assert body["to"] is None
+    assert apply_json_patch(before, body["patch"]) == cms_data.get(Content, 1).data
+
+
+def test_diff_between_versions_is_cached(client, cms_data, queries):
+    first, second = _edit(
+        cms_data,
+        ContentUpdate(merge_patch={"subtitle": "uno"}),
+        ContentUpdate(merge_patch={"subtitle": "dos"}),
+    )
+    url = f"/api/v1/cms/contents/1/diff?from={first}&to={second}"
+    expected = client.get(url).content
+
+    with queries.count():
+        assert client.get(url).content == expected
+    assert len(queries) == 0
+    assert diff_cache.size == len(expected)
+
+
+def test_diff_unknown_version_is_404(client, cms_data):
+    (first,) = _edit(cms_data, ContentUpdate(merge_patch={"subtitle": "uno"}))
+    assert client.get(f"/api/v1/cms/contents/1/diff?from={first}&to=9999").status_code == 404
+    assert client.get(f"/api/v1/cms/contents/999/diff?from={first}").status_code == 404
+
+
+def test_sized_lru_evicts_least_recently_used():
+    cache = SizedLRUCache(max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.size == 8
+
+    cache.set("big", b"x" * 11)
+    assert cache.get("big") is None
+
+    cache.clear()
+    assert cache.size == 0 and cache.get("a") is None
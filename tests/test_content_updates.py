@@ -0,0 +1,83 @@
+# tests/test_content_updates.py
+from sqlalchemy import event, update
+from sqlalchemy.dialects import mysql
+from app.models.cms import Auditory, Content
+from app.schemas.cms import ContentBulkUpdateItem, ContentUpdate
+from app.services import cms_cache
+from app.services.cms_service import CMSService
+
+
+def _locking_reads(db):
+    """Lecturas de Content compiladas para MySQL que llevan FOR UPDATE"""
+    statements = []
+
+    @event.listens_for(db, "do_orm_execute")
+    def _capture(state):
+        if state.is_select:
+            sql = str(state.statement.compile(dialect=mysql.dialect()))
+            if "FROM cms_contents" in sql and "FOR UPDATE" in sql:
+                statements.append(sql)
+
+    return statements
+
+
+def test_update_locks_the_row(cms_data):
+    locked = _locking_reads(cms_data)
+    CMSService(cms_data).update_content_data(1, ContentUpdate(merge_patch={"subtitle": "x"}))
+    assert len(locked) == 1
+
+
+def test_bulk_update_locks_the_rows(cms_data):
+    locked = _locking_reads(cms_data)
+    CMSService(cms_data).bulk_update_contents([
+        ContentBulkUpdateItem(id=2, merge_patch={"subtitle": "b"}),
+        ContentBulkUpdateItem(id=1, merge_patch={"subtitle": "a"}),
+    ])
+    assert len(locked) == 1
+    assert "ORDER BY cms_contents.id" in locked[0]
+
+
+def test_patch_applies_to_the_locked_version(cms_data):
+    """Otra transacción confirmó un cambio después de que la sesión cargara la fila"""
+    content = cms_data.get(Content, 1)
+    assert "subtitle" not in content.data
+
+    cms_data.execute(
+        update(Content)
+        .where(Content.id == 1)
+        .values(data={**content.data, "subtitle": "concurrente"})
+        .execution_options(synchronize_session=False)
+    )
+    CMSService(cms_data).update_content_data(1, ContentUpdate(merge_patch={"cta": "nuevo"}))
+
+    cms_data.expire_all()
+    data = cms_data.get(Content, 1).data
+    assert data["subtitle"] == "concurrente"
+    assert data["cta"] == "nuevo"
+    assert cms_data.query(Auditory).filter_by(content_id=1).count() == 1
+
+
+def test_bulk_update_is_one_audit_insert_and_one_invalidation(cms_data, queries, monkeypatch):
+    invalidations = []
+    invalidate = cms_cache.invalidate_cms_caches
+    monkeypatch.setattr(cms_cache, "invalidate_cms_caches", lambda: invalidations.append(1) or invalidate())
+
+    with queries.count():
+        CMSService(cms_data).bulk_update_contents([
+            ContentBulkUpdateItem(id=content_id, merge_patch={"subtitle": str(content_id)}, status="published")
+            for content_id in (1, 2, 3)
+        ])
+
+    audit_inserts = [sql for sql in queries.statements if sql.startswith("INSERT INTO cms_auditory_logs")]
+    assert len(audit_inserts) == 1
+    assert audit_inserts[0].count("?, ?, ?, ?, ?, ?") == 3
+    assert invalidations == [1]
+    assert cms_data.query(Auditory).count() == 3
+
+
+def test_bulk_update_rejects_invalid_status(client, cms_data):
+    response = client.put("/api/v1/cms/contents/bulk", json={
+        "items": [{"id": 1, "merge_patch": {"subtitle": "x"}, "status": "borrado"}]
+    })
+    assert response.status_code == 422
+    assert cms_data.get(Content, 1).data.get("subtitle") is None
@@ -0,0 +1,88 @@
+# tests/test_db_routing.py
+"""
+Réplica de lectura simulada con un fichero SQLite que no recibe las
+escrituras (una réplica con retraso)
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from app.api.auth.router import router as auth_router
+from app.api.cms.router import router as cms_router
+from app.core.config import settings
+from app.db import database, routing
+from app.db.base import Base
+from app.main import database_routing
+from app.services.cms_cache import invalidate_cms_caches
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch, cms_data, cms_seed):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        cms_seed(db)
+    monkeypatch.setattr(database, "replica_engines", [engine])
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    yield statements
+    engine.dispose()
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.middleware("http")(database_routing)
+    app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
+    app.include_router(cms_router, prefix=settings.API_V1_PREFIX)
+    return app
+
+
+def _landing_title(client) -> str:
+    response = client.get(f"{settings.API_V1_PREFIX}/cms/landing")
+    assert response.status_code == 200
+    return response.json()["page"]["contents"][0]["data"]["title"]
+
+
+def test_unrelated_writes_keep_reading_from_replica(app, replica):
+    client = TestClient(app)
+    user = {"email": "ana@example.com", "name": "Ana", "password": "secreto1"}
+    assert client.post(f"{settings.API_V1_PREFIX}/auth/register", json=user).status_code == 201
+    response = client.post(f"{settings.API_V1_PREFIX}/auth/login", json={"email": user["email"], "password": "secreto1"})
+    assert response.status_code == 200
+    assert routing.STICKY_COOKIE not in client.cookies
+
+    _landing_title(client)
+    assert replica
+
+
+def test_cms_edit_sticks_only_its_client_to_primary(app, replica):
+    editor, other = TestClient(app), TestClient(app)
+    response = editor.put(f"{settings.API_V1_PREFIX}/cms/contents/1", json={"merge_patch": {"title": "Editado"}})
+    assert response.status_code == 200
+    assert routing.STICKY_COOKIE in editor.cookies
+
+    # La landing se rematerializa desde el primario al editar
+    assert _landing_title(other) == "Editado"
+    assert replica == []
+
+    # Nueva invalidación: el otro cliente lee de la réplica, que aún no
+    # tiene el cambio...
+    invalidate_cms_caches()
+    assert _landing_title(other) == "Bloque 1"
+    assert replica
+    # ...pero lo leído no queda en la cache: el editor ve su cambio
+    assert _landing_title(editor) == "Editado"
+    assert _landing_title(other) == "Editado"
+
+
+def test_replica_reads_fill_caches_after_the_lag_window(app, replica, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_STICKY_SECONDS", 0.0)
+    client = TestClient(app)
+    _landing_title(client)
+    replica.clear()
+
+    assert _landing_title(client) == "Bloque 1"
+    assert replica == []
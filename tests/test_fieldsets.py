@@ -0,0 +1,82 @@
+# tests/test_fieldsets.py
+import pytest
+from app.services.cms_cache import landing_cache
+from app.services.fieldsets import CONTENT_FIELDS, LANDING_SECTIONS, PAGE_FIELDS, LandingFieldSet
+
+URL = "/api/v1/cms/landing"
+
+
+def test_no_selection_is_the_full_landing():
+    assert LandingFieldSet.parse(None, None) is None
+    assert LandingFieldSet.parse("", "") is None
+
+
+def test_globs_and_content_fields():
+    fieldset = LandingFieldSet.parse("seo_*,slug,contents.data", None)
+    assert fieldset.page_fields == ("slug", "seo_title", "seo_description", "seo_image")
+    assert fieldset.content_fields == ("data",)
+    assert fieldset.sections == LANDING_SECTIONS
+
+
+def test_contents_wildcards():
+    assert LandingFieldSet.parse("id,contents", None).content_fields == CONTENT_FIELDS
+    assert LandingFieldSet.parse("id,contents.*", None).content_fields == CONTENT_FIELDS
+    # Sin "contents": la página sin sus contenidos
+    fieldset = LandingFieldSet.parse("id", None)
+    assert fieldset.content_fields is None and not fieldset.with_contents
+
+
+def test_include_only():
+    fieldset = LandingFieldSet.parse(None, "media, site")
+    assert fieldset.page_fields == PAGE_FIELDS
+    assert fieldset.content_fields == CONTENT_FIELDS
+    assert fieldset.sections == ("site", "media")
+
+
+def test_key_is_canonical():
+    assert LandingFieldSet.parse("slug,id", "media,site").key == LandingFieldSet.parse(" id ,slug", "site,media").key
+    assert LandingFieldSet.parse("slug", None).key != LandingFieldSet.parse("slug", "site").key
+
+
+@pytest.mark.parametrize("fields, include", [
+    ("nope", None),
+    ("contents.nope", None),
+    ("seo_x*", None),
+    (None, "pages"),
+])
+def test_unknown_names_are_rejected(fields, include):
+    with pytest.raises(ValueError):
+        LandingFieldSet.parse(fields, include)
+
+
+def test_route_projects_fields(client, cms_data):
+    body = client.get(URL, params={"fields": "slug,seo_*,contents.data", "include": "site"}).json()
+    assert set(body["page"]) == {"slug", "seo_title", "seo_description", "seo_image", "contents"}
+    assert all(set(content) == {"data"} for content in body["page"]["contents"])
+    assert "site" in body and "media" not in body and "meta" not in body
+
+    body = client.get(URL, params={"fields": "id,title"}).json()
+    assert body["page"] == {"id": 1, "title": "Inicio"}
+
+
+def test_route_rejects_unknown_fields(client, cms_data):
+    assert client.get(URL, params={"fields": "password"}).status_code == 400
+    assert client.get(URL, params={"include": "users"}).status_code == 400
+
+
+def test_each_selection_is_its_own_variant(client, cms_data):
+    selections = [
+        {},
+        {"fields": "slug"},
+        {"fields": "slug", "include": "site"},
+        {"fields": "slug,contents.data"},
+    ]
+    etags = {client.get(URL, params=params).headers["etag"] for params in selections}
+    assert len(etags) == len(selections)
+
+    # Misma selección con otra escritura: misma variante en cache
+    first = client.get(URL, params={"fields": "id,slug", "include": "media,site"})
+    again = client.get(URL, params={"fields": "slug, id", "include": "site,media"})
+    assert again.headers["etag"] == first.headers["etag"]
+    fieldset = LandingFieldSet.parse("id,slug", "site,media")
+    assert landing_cache.get((None, "main", fieldset.key)) is not None
@@ -0,0 +1,45 @@
+# tests/test_landing_queries.py
+"""Presupuesto de consultas de la landing (before_cursor_execute)"""
+
+# Página, contenidos, sitio y medios
+COLD_LANDING_QUERIES = 4
+
+
+def test_cold_landing_query_budget(cms_data, client, queries):
+    with queries.count():
+        assert client.get("/api/v1/cms/landing").status_code == 200
+    assert len(queries) <= COLD_LANDING_QUERIES, queries.statements
+
+
+def test_warm_landing_runs_no_queries(cms_data, client, queries):
+    client.get("/api/v1/cms/landing")
+    with queries.count():
+        assert client.get("/api/v1/cms/landing").status_code == 200
+    assert len(queries) == 0, queries.statements
+
+
+def test_not_modified_runs_no_queries(cms_data, client, queries):
+    etag = client.get("/api/v1/cms/landing").headers["etag"]
+    with queries.count():
+        response = client.get("/api/v1/cms/landing", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(queries) == 0, queries.statements
+
+
+def test_landing_from_disk_runs_no_queries(cms_data, client, queries):
+    """Otro worker (o un reinicio) con la landing ya materializada en disco"""
+    from app.services.cms_cache import landing_cache
+
+    client.get("/api/v1/cms/landing")
+    landing_cache.bump()
+    with queries.count():
+        assert client.get("/api/v1/cms/landing").status_code == 200
+    assert len(queries) == 0, queries.statements
+
+
+def test_nested_page_query_budget(cms_data, client, queries):
+    client.get("/api/v1/cms/landing")
+    # El sitio y los medios ya están en cache; la ruta se resuelve una vez
+    with queries.count():
+        assert client.get("/api/v1/cms/landing", params={"slug": "about/team"}).status_code == 200
+    assert len(queries) <= COLD_LANDING_QUERIES - 1, queries.statements
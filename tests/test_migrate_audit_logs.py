@@ -0,0 +1,50 @@
+# tests/test_migrate_audit_logs.py
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+from app.models.cms import AuditChangeType, Auditory
+from app.scripts.migrate_audit_logs import INDEX, migrate_audit_logs
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    """cms_auditory_logs tal como estaba antes del historial por diffs"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE cms_auditory_logs ("
+            " id INTEGER PRIMARY KEY, content_id INTEGER, title VARCHAR(255) NOT NULL,"
+            " author_id INTEGER, data JSON NOT NULL, is_visible BOOLEAN,"
+            " created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text("CREATE INDEX ix_cms_auditory_logs_content_id ON cms_auditory_logs (content_id)"))
+        conn.execute(text(
+            "INSERT INTO cms_auditory_logs (id, content_id, title, data, is_visible, created_at, updated_at)"
+            " VALUES (1, 1, 'v1', '{\"title\": \"v1\"}', 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        ))
+    yield engine
+    engine.dispose()
+
+
+def test_adds_change_type_and_existing_rows_are_snapshots(old_engine):
+    assert migrate_audit_logs(old_engine)["added_change_type"] is True
+
+    with Session(old_engine) as db:
+        log = db.scalars(select(Auditory)).one()
+        assert log.change_type == AuditChangeType.SNAPSHOT
+        assert log.data == {"title": "v1"}
+
+    column = next(c for c in inspect(old_engine).get_columns("cms_auditory_logs") if c["name"] == "change_type")
+    assert column["nullable"] is False
+
+
+def test_creates_history_cursor_index(old_engine):
+    assert migrate_audit_logs(old_engine)["created_index"] is True
+
+    index = next(i for i in inspect(old_engine).get_indexes("cms_auditory_logs") if i["name"] == INDEX)
+    assert index["column_names"] == ["content_id", "created_at", "id"]
+
+
+def test_rerun_is_a_no_op(old_engine):
+    migrate_audit_logs(old_engine)
+    assert migrate_audit_logs(old_engine) == {"added_change_type": False, "created_index": False}
@@ -0,0 +1,57 @@
+# tests/test_migrate_session_tokens.py
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from app.core.hashing import hash_token
+from app.scripts.migrate_session_tokens import EXPIRES_INDEX, INDEX, OLD_INDEX, TABLE, migrate_session_tokens
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    """sys_sessions con el token en claro"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE sys_sessions ("
+            " id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, token VARCHAR(500) NOT NULL,"
+            " ip_address VARCHAR(45), user_agent TEXT,"
+            " expires_at DATETIME NOT NULL, created_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(f"CREATE INDEX {OLD_INDEX} ON sys_sessions (token)"))
+        # El índice de token no era único: "a" está dos veces
+        for session_id, token in ((1, "a"), (2, "b"), (3, "a"), (4, "c"), (5, "d")):
+            conn.execute(text(
+                "INSERT INTO sys_sessions (id, user_id, token, expires_at, created_at)"
+                " VALUES (:id, 1, :token, '2030-01-01 00:00:00', '2024-01-01 00:00:00')"
+            ), {"id": session_id, "token": token})
+    yield engine
+    engine.dispose()
+
+
+def test_hashes_tokens_and_drops_duplicates(old_engine):
+    updates = []
+
+    @event.listens_for(old_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            updates.append(executemany)
+
+    assert migrate_session_tokens(old_engine, batch_size=2) == {"hashed": 5, "duplicates": 1}
+    # Un UPDATE por lote: 2 + 2 + 1 sesiones
+    assert updates == [True, True, False]
+
+    with old_engine.connect() as conn:
+        rows = dict(conn.execute(text("SELECT id, token_hash FROM sys_sessions")).all())
+    # De las duplicadas se conserva la más reciente
+    assert rows == {2: hash_token("b"), 3: hash_token("a"), 4: hash_token("c"), 5: hash_token("d")}
+
+    schema = inspect(old_engine)
+    assert "token" not in {column["name"] for column in schema.get_columns(TABLE)}
+    indexes = {index["name"]: index for index in schema.get_indexes(TABLE)}
+    assert OLD_INDEX not in indexes
+    assert indexes[INDEX]["unique"]
+    assert indexes[EXPIRES_INDEX]["column_names"] == ["expires_at"]
+
+
+def test_rerun_is_a_no_op(old_engine):
+    migrate_session_tokens(old_engine)
+    assert migrate_session_tokens(old_engine) == {"hashed": 0, "duplicates": 0}
@@ -0,0 +1,15 @@
+# tests/test_migrate_token_revocations.py
+from sqlalchemy import create_engine, inspect
+from app.scripts.migrate_token_revocations import TABLE, migrate_token_revocations
+
+
+def test_creates_the_table_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    try:
+        assert migrate_token_revocations(engine) == {"created_table": True}
+        assert migrate_token_revocations(engine) == {"created_table": False}
+
+        indexed = {tuple(index["column_names"]) for index in inspect(engine).get_indexes(TABLE)}
+        assert {("jti",), ("user_id",), ("expires_at",)} <= indexed
+    finally:
+        engine.dispose()
@@ -0,0 +1,39 @@
+# tests/test_page_paths.py
+from collections import namedtuple
+from app.services.cms_cache import landing_cache, landing_store
+from app.services.page_resolver import PagePathResolver
+
+Row = namedtuple("Row", "id slug parent_id is_published")
+
+ROWS = [
+    Row(1, "about", None, True),
+    Row(2, "team", 1, True),
+    Row(3, "draft", 1, False),
+    Row(4, "orphan", 99, True),
+]
+
+
+def test_resolver_maps_both_ways():
+    resolver = PagePathResolver()
+    assert resolver.resolve("/about/team/", lambda: ROWS) == 2
+    assert resolver.path(2, lambda: ROWS) == "about/team"
+    assert resolver.path(3, lambda: ROWS) is None
+    assert resolver.path(4, lambda: ROWS) is None
+
+
+def test_subpage_is_not_reachable_by_its_own_slug(cms_data, client):
+    assert client.get("/api/v1/cms/landing", params={"slug": "team"}).status_code == 404
+    response = client.get("/api/v1/cms/landing", params={"slug": "about/team"})
+    assert response.status_code == 200
+    assert response.json()["page"]["id"] == 3
+
+
+def test_edit_rematerializes_subpage_under_its_path(cms_data, client):
+    response = client.put("/api/v1/cms/contents/100", json={"data": {"title": "Nuevo equipo"}})
+    assert response.status_code == 200
+
+    snapshot = landing_cache.get(("about/team", "main"))
+    assert snapshot is not None
+    assert b"Nuevo equipo" in snapshot.body
+    assert landing_store.read("landing:main:about/team").body == snapshot.body
+    assert landing_cache.get(("team", "main")) is None
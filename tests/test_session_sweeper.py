@@ -0,0 +1,45 @@
+# tests/test_session_sweeper.py
+import logging
+import time
+from datetime import datetime, timedelta
+from app.db.database import SessionLocal
+from app.models.user import Session as UserSession
+from app.services.session_sweeper import SessionSweeper
+
+
+def _add_sessions(db, expires_at, count):
+    for n in range(count):
+        db.add(UserSession(user_id=1, token_hash=f"{expires_at.timestamp()}-{n}", expires_at=expires_at))
+    db.commit()
+
+
+def test_sweep_deletes_only_expired_sessions(db):
+    _add_sessions(db, datetime.utcnow() - timedelta(hours=1), 5)
+    _add_sessions(db, datetime.utcnow() + timedelta(hours=1), 2)
+
+    assert SessionSweeper(batch_size=2, session_factory=SessionLocal).sweep() == 5
+    assert db.query(UserSession).count() == 2
+
+
+def test_sweeper_thread_survives_errors(db, caplog):
+    calls = []
+
+    def failing_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("BD caída")
+        return SessionLocal()
+
+    _add_sessions(db, datetime.utcnow() - timedelta(hours=1), 3)
+    sweeper = SessionSweeper(interval=0.02, session_factory=failing_factory)
+    with caplog.at_level(logging.ERROR, logger="app.services.session_sweeper"):
+        sweeper.start()
+        deadline = time.monotonic() + 5
+        while db.query(UserSession).count() and time.monotonic() < deadline:
+            time.sleep(0.02)
+            db.expire_all()
+        sweeper.stop()
+
+    assert db.query(UserSession).count() == 0
+    assert sweeper.metrics()["failed_sweeps"] == 1
+    assert "Error en el barrido de sesiones" in caplog.text
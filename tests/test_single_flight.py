@@ -0,0 +1,109 @@
+# tests/test_single_flight.py
+import threading
+import time
+import pytest
+from app.core.cache import SingleFlight
+from app.db.database import SessionLocal
+from app.schemas.cms import ContentUpdate
+from app.services.cms_cache import landing_cache
+from app.services.cms_service import CMSService
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_concurrent_calls_share_one_execution():
+    flights, release, calls, results = SingleFlight(), threading.Event(), [], []
+
+    def build():
+        calls.append(1)
+        release.wait(5)
+        return "snapshot"
+
+    threads = [_start(lambda: results.append(flights.do("landing", build))) for _ in range(8)]
+    while not flights.in_flight("landing"):
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["snapshot"] * 8
+    assert not flights.in_flight("landing")
+
+
+def test_fallback_is_served_while_rebuilding():
+    flights, started, release = SingleFlight(), threading.Event(), threading.Event()
+    leader = _start(flights.do, "landing", lambda: started.set() or release.wait(5) or "nuevo")
+    started.wait(5)
+
+    assert flights.do("landing", lambda: pytest.fail("no debe reconstruir"), fallback="viejo") == "viejo"
+    release.set()
+    leader.join(5)
+
+
+def test_leader_failure_reaches_waiters_and_next_call_retries():
+    flights, started, release, errors = SingleFlight(), threading.Event(), threading.Event(), []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("BD caída")
+
+    def call(fn):
+        try:
+            flights.do("landing", fn)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = _start(call, failing)
+    started.wait(5)
+    waiter = _start(call, lambda: pytest.fail("debe esperar al líder"))
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert [str(e) for e in errors] == ["BD caída", "BD caída"]
+    assert flights.do("landing", lambda: "ok") == "ok"
+
+
+def test_publish_does_not_join_a_rebuild_started_before_the_change(cms_data, monkeypatch):
+    """Una lectura anterior al commit sigue reconstruyendo cuando se publica"""
+    render = CMSService._render_landing
+    started, release = threading.Event(), threading.Event()
+
+    def slow_first_render(self, *args, **kwargs):
+        if not started.is_set():
+            started.set()
+            release.wait(5)
+        return render(self, *args, **kwargs)
+
+    monkeypatch.setattr(CMSService, "_render_landing", slow_first_render)
+
+    def read_before_commit():
+        db = SessionLocal()
+        try:
+            CMSService(db).get_landing_snapshot()
+        finally:
+            db.close()
+
+    reader = _start(read_before_commit)
+    started.wait(5)
+    timer = threading.Timer(2, release.set)
+    timer.start()
+    try:
+        began = time.monotonic()
+        CMSService(cms_data).update_content_data(1, ContentUpdate(merge_patch={"title": "Publicado"}))
+        assert time.monotonic() - began < 1.5
+    finally:
+        release.set()
+        timer.cancel()
+        reader.join(5)
+
+    snapshot = landing_cache.get((None, "main"))
+    assert snapshot is not None and b"Publicado" in snapshot.body
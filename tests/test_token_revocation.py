@@ -0,0 +1,92 @@
+# tests/test_token_revocation.py
+import logging
+import threading
+import time
+import pytest
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.user import Session as UserSession, UserRole
+from app.repositories.user_repository import UserRepository, user_cache
+from app.schemas.user import UserCreate
+from app.services.auth_service import AuthService
+from app.services.token_denylist import TokenDenylist
+
+
+@pytest.fixture
+def registered(db):
+    response = AuthService(db).register(UserCreate(email="ana@example.com", name="Ana", password="secreto1"))
+    return response.user.id, response.access_token
+
+
+@pytest.mark.parametrize("stateless", [True, False])
+def test_logout_rejects_token_without_sync(db, registered, monkeypatch, stateless):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", stateless)
+    _, token = registered
+    assert AuthService(db).get_current_user(token) is not None
+
+    assert AuthService(db).logout(token)
+    assert AuthService(db).get_current_user(token) is None
+
+
+def test_role_change_revokes_stateless_tokens_locally(db, registered, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+    user_id, token = registered
+    assert AuthService(db).get_current_user(token) is not None
+
+    UserRepository(db).update(user_id, {"role": UserRole.ADMIN})
+    db.commit()
+
+    assert AuthService(db).get_current_user(token) is None
+
+
+def test_role_change_keeps_stateful_sessions(db, registered, monkeypatch):
+    """Con estado el usuario se recarga: el token sigue valiendo con el rol nuevo"""
+    monkeypatch.setattr(settings, "AUTH_STATELESS", False)
+    user_id, token = registered
+    assert AuthService(db).get_current_user(token).role != UserRole.ADMIN
+    assert user_cache.get(user_id) is not None
+
+    UserRepository(db).update(user_id, {"role": UserRole.ADMIN})
+    db.commit()
+
+    assert user_cache.get(user_id) is None
+    assert db.query(UserSession).filter_by(user_id=user_id).count() == 1
+    assert AuthService(db).get_current_user(token).role == UserRole.ADMIN
+
+
+@pytest.mark.parametrize("stateless", [True, False])
+def test_soft_delete_rejects_tokens(db, registered, monkeypatch, stateless):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", stateless)
+    user_id, token = registered
+    assert AuthService(db).get_current_user(token) is not None
+
+    UserRepository(db).soft_delete(user_id)
+    db.commit()
+
+    assert user_cache.get(user_id) is None
+    assert AuthService(db).get_current_user(token) is None
+
+
+def test_denylist_sync_thread_survives_errors(caplog, monkeypatch):
+    denylist = TokenDenylist(interval=0.02, session_factory=SessionLocal)
+    denylist.sync()
+    failures = iter([RuntimeError("fallo inesperado")])
+
+    def flaky_sync(sync=denylist.sync):
+        for error in failures:
+            raise error
+        return sync()
+
+    monkeypatch.setattr(denylist, "sync", flaky_sync)
+    with caplog.at_level(logging.ERROR, logger="app.services.token_denylist"):
+        denylist._thread = threading.Thread(target=denylist._run, daemon=True)
+        denylist._thread.start()
+        last_sync = denylist.metrics()["last_sync_at"]
+        deadline = time.monotonic() + 5
+        while denylist.metrics()["last_sync_at"] == last_sync and time.monotonic() < deadline:
+            time.sleep(0.02)
+        denylist.stop()
+
+    assert denylist.metrics()["last_sync_at"] != last_sync
+    assert denylist.metrics()["failed_syncs"] == 1
+    assert "Error en la sincronización de revocaciones" in caplog.text